@@ -1,5 +1,6 @@
 # Balanceate.py - Archivo principal optimizado para Reflex 0.8.23
 import reflex as rx
+from datetime import datetime, time
 from Balanceate.state import State
 from Balanceate.view.balance import balance
 from Balanceate.view.navbar import navbar
@@ -12,10 +13,104 @@ from Balanceate.view.registro_page import registro_page
 from Balanceate.view.config_page_simple import config_page
 from Balanceate.view.test_localstorage import test_localstorage_page
 from Balanceate.styles import styles
+from Balanceate.logs import configurar_logging
+from Balanceate.db.db import verificar_conexion
+from Balanceate.db.cache import metricas_cache
+from Balanceate.db.movimiento_repository import MovimientoRepositoryAsync
+from Balanceate.services import auth_service, exportacion_service, metricas_service
 from rxconfig import config
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+
+# JSON lines escritos desde un hilo aparte (ver Balanceate/logs.py)
+configurar_logging()
+
+
+async def ready(request) -> JSONResponse:
+    """Readiness probe: responde 200 solo si MongoDB contesta al ping."""
+    if await verificar_conexion():
+        return JSONResponse({"status": "ok"})
+    return JSONResponse({"status": "unavailable"}, status_code=503)
+
+
+async def metricas_prometheus(request) -> PlainTextResponse:
+    """
+    Métricas de este proceso en formato Prometheus: histogramas de latencia
+    por handler y por operación de DB, contadores de la caché de Redis
+    (hits, misses, ...) y estado del pool de bcrypt.
+    """
+    cache = metricas_cache()
+    tasa_hits = cache.pop("tasa_hits")
+    texto = metricas_service.exportar_prometheus(
+        contadores={
+            "balanceate_cache": {"tasa_hits": tasa_hits},
+            "balanceate_bcrypt": auth_service.metricas_bcrypt(),
+        },
+        totales={"balanceate_cache": cache},
+    )
+    return PlainTextResponse(texto, media_type="text/plain; version=0.0.4")
+
+
+async def _fragmentos_exportacion(cursor, formato: str):
+    """
+    Fragmentos de la exportación que cierran el cursor al terminar.
+    
+    Si el cliente abandona la descarga, Starlette deja de iterar y el
+    finally libera el cursor del servidor en vez de esperar a su timeout.
+    """
+    try:
+        async for fragmento in exportacion_service.generar_fragmentos_async(cursor, formato):
+            yield fragmento
+    finally:
+        await cursor.close()
+
+
+async def exportar(request) -> StreamingResponse | JSONResponse:
+    """
+    Descarga el historial de movimientos del usuario como CSV o NDJSON.
+    
+    Parámetros: token (de exportación), formato (csv|ndjson) y, opcionalmente,
+    desde y/o hasta en ISO (con uno solo el rango queda abierto). Las filas se envían por fragmentos según se leen del
+    cursor, sin cargar el historial completo en memoria.
+    """
+    usuario_id = auth_service.verificar_token_exportacion(request.query_params.get("token", ""))
+    if not usuario_id:
+        return JSONResponse({"error": "Token inválido o expirado"}, status_code=401)
+    
+    formato = request.query_params.get("formato", "csv")
+    if formato not in exportacion_service.FORMATOS:
+        return JSONResponse({"error": f"Formato no soportado: {formato}"}, status_code=400)
+    
+    try:
+        desde = request.query_params.get("desde") or None
+        hasta = request.query_params.get("hasta") or None
+        desde = datetime.fromisoformat(desde) if desde else None
+        hasta = datetime.fromisoformat(hasta) if hasta else None
+        if hasta and hasta.time() == time.min:
+            hasta = datetime.combine(hasta.date(), time.max)  # día completo
+    except ValueError:
+        return JSONResponse({"error": "Fechas inválidas, usar ISO YYYY-MM-DD"}, status_code=400)
+    
+    cursor = MovimientoRepositoryAsync.iterar_movimientos_exportacion(usuario_id, desde, hasta)
+    tipo_contenido, extension = exportacion_service.FORMATOS[formato]
+    return StreamingResponse(
+        _fragmentos_exportacion(cursor, formato),
+        media_type=tipo_contenido,
+        headers={"Content-Disposition": f'attachment; filename="movimientos.{extension}"'},
+    )
+
+
+# Endpoints propios del backend (montados junto a los de Reflex)
+api = Starlette(routes=[
+    Route("/ready", ready),
+    Route("/metrics", metricas_prometheus),
+    Route("/exportar", exportar),
+])
 
 # Configuración optimizada para Reflex 0.8.23
 app = rx.App(
+    api_transformer=api,
     stylesheets=styles.STYLESHEETS,
     style=styles.BASE_STYLE,
     theme=rx.theme(
@@ -95,7 +190,8 @@ app.add_page(
     route="/config",
     title="Configuración - Balanceate",
     description="Configuraciones de la cuenta",
-    on_load=State.on_load  # ← También verificar sesión en configuración
+    # Verificar sesión y luego leer el resumen mensual
+    on_load=[State.on_load, State.cargar_resumenes]
 )
 
 app.add_page(
@@ -106,5 +202,3 @@ app.add_page(
     on_load=State.on_load  # ← Verificar sesión también en página de pruebas
 )
 
-# Carga datos iniciales antes de arrancar
-State.iniciar()
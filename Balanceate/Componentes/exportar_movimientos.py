@@ -0,0 +1,27 @@
+import reflex as rx
+from Balanceate.state import State
+
+def exportar_movimientos() -> rx.Component:
+    return rx.vstack(
+        rx.text(
+            "Exportar historial",
+            font_size="1rem",
+            font_weight="600",
+        ),
+        rx.hstack(
+            rx.button(
+                "CSV",
+                on_click=State.exportar_movimientos("csv"),
+                flex="1",
+            ),
+            rx.button(
+                "NDJSON",
+                on_click=State.exportar_movimientos("ndjson"),
+                flex="1",
+                variant="outline",
+            ),
+            width="100%",
+        ),
+        width="100%",
+        spacing="3",
+    )
@@ -0,0 +1,58 @@
+import reflex as rx
+from Balanceate.state import State
+from Balanceate.styles.colors import Colors
+
+ID_UPLOAD = "importar_movimientos"
+
+def importar_movimientos() -> rx.Component:
+    return rx.vstack(
+        rx.text(
+            "Importar extracto bancario",
+            font_size="1rem",
+            font_weight="600",
+        ),
+        rx.text(
+            "CSV (fecha, descripción, importe) u OFX",
+            font_size="0.8rem",
+            color="gray",
+        ),
+        rx.upload(
+            rx.text(
+                rx.cond(
+                    rx.selected_files(ID_UPLOAD),
+                    rx.selected_files(ID_UPLOAD).join(", "),
+                    "Arrastra un archivo o haz clic para elegirlo",
+                ),
+                font_size="0.85rem",
+                color="gray",
+            ),
+            id=ID_UPLOAD,
+            accept={
+                "text/csv": [".csv"],
+                "application/x-ofx": [".ofx", ".qfx"],
+            },
+            multiple=True,
+            border="1px dashed #cbd5e1",
+            border_radius="10px",
+            padding="20px",
+            width="100%",
+            cursor="pointer",
+        ),
+        rx.button(
+            "Importar",
+            on_click=State.importar_movimientos(rx.upload_files(upload_id=ID_UPLOAD)),
+            width="100%",
+            bg=Colors.SUCCESS.value,
+            color="white",
+        ),
+        rx.cond(
+            State.importacion_mensaje != "",
+            rx.text(State.importacion_mensaje, font_size="0.85rem"),
+        ),
+        rx.cond(
+            State.error_mensaje != "",
+            rx.text(State.error_mensaje, font_size="0.8rem", color=Colors.ERROR.value),
+        ),
+        width="100%",
+        spacing="3",
+    )
@@ -0,0 +1,51 @@
+import reflex as rx
+from Balanceate.state import State
+from Balanceate.styles.colors import Colors
+
+def fila_resumen(resumen) -> rx.Component:
+    return rx.table.row(
+        rx.table.cell(resumen.mes),
+        rx.table.cell(f"${resumen.ingresos}", color=Colors.SUCCESS.value),
+        rx.table.cell(f"${resumen.gastos}", color=Colors.ERROR.value),
+        rx.table.cell(f"${resumen.deudas}"),
+        rx.table.cell(
+            f"${resumen.neto}",
+            color=rx.cond(resumen.neto >= 0, Colors.SUCCESS.value, Colors.ERROR.value),
+            font_weight="600",
+        ),
+    )
+
+def resumen_mensual() -> rx.Component:
+    return rx.vstack(
+        rx.text(
+            "Resumen mensual",
+            font_size="1rem",
+            font_weight="600",
+        ),
+        rx.cond(
+            State.resumenes_mensuales,
+            rx.table.root(
+                rx.table.header(
+                    rx.table.row(
+                        rx.table.column_header_cell("Mes"),
+                        rx.table.column_header_cell("Ingresos"),
+                        rx.table.column_header_cell("Gastos"),
+                        rx.table.column_header_cell("Deudas"),
+                        rx.table.column_header_cell("Neto"),
+                    ),
+                ),
+                rx.table.body(
+                    rx.foreach(State.resumenes_mensuales, fila_resumen),
+                ),
+                size="1",
+                width="100%",
+            ),
+            rx.text(
+                "Aún no hay movimientos",
+                font_size="0.85rem",
+                color="gray",
+            ),
+        ),
+        width="100%",
+        spacing="3",
+    )
@@ -8,9 +8,55 @@ de la implementación específica de la base de datos.
 """
 from datetime import datetime
 from bson import ObjectId
-from .db import balances_collection
-
-
+from pymongo.errors import DuplicateKeyError
+from . import cache
+from .consultas import Consulta
+from .db import balances_collection, balances_collection_async
+from ..services.balance_service import calcular_aporte_movimiento
+from ..services.metricas_service import medir_repository
+
+
+def _update_delta(
+    delta_disponible: float,
+    delta_deudas: float,
+    delta_movimientos: int,
+    ultimo_movimiento_id: str
+) -> dict:
+    """Construye el update $inc/$set que aplica un delta al ledger."""
+    cambios = {
+        "ultima_actualizacion": datetime.now().isoformat()
+    }
+    if ultimo_movimiento_id:
+        cambios["ultimo_movimiento_id"] = ultimo_movimiento_id
+
+    return {
+        "$inc": {
+            "total": delta_disponible,
+            "disponible": delta_disponible,
+            "deudas_pendientes": delta_deudas,
+            "balance_real": delta_disponible - delta_deudas,
+            "total_movimientos": delta_movimientos,
+            # Cada delta cambia la versión: la reconciliación la usa para
+            # detectar escrituras concurrentes (ver reemplazar_si_version)
+            "version": 1,
+        },
+        "$set": cambios,
+    }
+
+
+def consulta_balance(usuario_id: str) -> Consulta:
+    """El ledger de un usuario (índice único usuario_unico)."""
+    return Consulta({"usuario_id": usuario_id}, limite=1)
+
+
+def _filtro_version(usuario_id: str, version: int | None) -> dict:
+    """Filtro del ledger en la versión leída (None: ledger sin versión o inexistente)."""
+    if version is None:
+        return {"usuario_id": usuario_id, "version": {"$exists": False}}
+    return {"usuario_id": usuario_id, "version": version}
+
+
+@medir_repository
 class BalanceRepository:
     """
     Repository para gestionar operaciones de balances en MongoDB.
@@ -33,6 +79,10 @@ class BalanceRepository:
         Returns:
             Documento del balance si existe, None si no se encuentra
 
+        Nota:
+            Lectura read-through: se sirve desde la caché de Redis si está
+            (ver db/cache.py); cualquier escritura del ledger la invalida.
+
         Uso común:
             - Cargar balance al iniciar sesión
             - Mostrar balance actual en la interfaz
@@ -40,7 +90,11 @@ class BalanceRepository:
         if not usuario_id:
             return None
 
-        return balances_collection.find_one({"usuario_id": usuario_id})
+        balance, generacion = cache.leer(usuario_id, cache.CAMPO_BALANCE)
+        if balance is None:
+            balance = balances_collection.find_one(consulta_balance(usuario_id).filtro)
+            cache.guardar(usuario_id, cache.CAMPO_BALANCE, balance, generacion)
+        return balance
 
     @staticmethod
     def actualizar_balance_por_usuario(usuario_id: str, balance_data: dict) -> bool:
@@ -66,10 +120,139 @@ class BalanceRepository:
                 {"$set": balance_data},
                 upsert=True
             )
-            return result.acknowledged
         except:
             return False
 
+        cache.invalidar_usuario(usuario_id)
+        return result.acknowledged
+
+    @staticmethod
+    def obtener_version(usuario_id: str) -> int | None:
+        """
+        Lee la versión actual del ledger directamente de MongoDB (sin caché).
+
+        Returns:
+            La versión, o None si el ledger no existe o es anterior a las versiones
+        """
+        if not usuario_id:
+            return None
+
+        doc = balances_collection.find_one(consulta_balance(usuario_id).filtro, {"version": 1})
+        return doc.get("version") if doc else None
+
+    @staticmethod
+    def reemplazar_si_version(usuario_id: str, balance_data: dict, version: int | None) -> bool:
+        """
+        Guarda los acumulados del ledger solo si nadie lo modificó desde que
+        se leyó su versión.
+
+        Args:
+            usuario_id: ID del usuario
+            balance_data: Campos del ledger recalculados
+            version: Versión leída con obtener_version antes de recalcular
+
+        Returns:
+            True si se guardó; False si el ledger cambió entretanto (un $inc
+            concurrente), en cuyo caso hay que volver a calcular
+
+        Uso común:
+            - Reconciliación (reconciliacion_service), que recalcula
+              leyendo un cursor y no debe pisar deltas aplicados durante la lectura
+        """
+        if not usuario_id or not balance_data:
+            return False
+
+        try:
+            result = balances_collection.update_one(
+                _filtro_version(usuario_id, version),
+                {"$set": balance_data, "$inc": {"version": 1}},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            # El ledger existe con otra versión: el upsert chocó con usuario_unico
+            return False
+
+        cache.invalidar_usuario(usuario_id)
+        return result.matched_count > 0 or result.upserted_id is not None
+
+    @staticmethod
+    def aplicar_movimiento(
+        usuario_id: str,
+        movimiento: dict,
+        signo: int = 1,
+        movimiento_id: str = ""
+    ) -> bool:
+        """
+        Aplica (o revierte) el aporte de un movimiento al ledger del usuario.
+
+        Args:
+            usuario_id: ID del usuario
+            movimiento: Documento del movimiento a aplicar
+            signo: 1 para sumar el movimiento, -1 para revertirlo
+            movimiento_id: ID del movimiento; si se indica se guarda como
+                ultimo_movimiento_id
+
+        Returns:
+            True si se actualizó/creó el ledger, False en caso de error
+
+        Nota:
+            Usa un único update_one con $inc, que MongoDB aplica de forma
+            atómica sobre el documento; varios movimientos concurrentes del
+            mismo usuario no se pisan entre sí.
+
+        Uso común:
+            - Mantener el balance al crear, editar o eliminar movimientos
+        """
+        if not usuario_id or not movimiento:
+            return False
+
+        delta_disponible, delta_deudas = calcular_aporte_movimiento(movimiento)
+        return BalanceRepository.aplicar_delta(
+            usuario_id,
+            delta_disponible=signo * delta_disponible,
+            delta_deudas=signo * delta_deudas,
+            delta_movimientos=signo,
+            ultimo_movimiento_id=movimiento_id
+        )
+
+    @staticmethod
+    def aplicar_delta(
+        usuario_id: str,
+        delta_disponible: float = 0.0,
+        delta_deudas: float = 0.0,
+        delta_movimientos: int = 0,
+        ultimo_movimiento_id: str = ""
+    ) -> bool:
+        """
+        Incrementa atómicamente los acumulados del ledger de un usuario.
+
+        Args:
+            usuario_id: ID del usuario
+            delta_disponible: Variación del balance disponible
+            delta_deudas: Variación de las deudas pendientes
+            delta_movimientos: Variación del número de movimientos
+            ultimo_movimiento_id: ID del último movimiento (opcional)
+
+        Returns:
+            True si se actualizó/creó el ledger, False en caso de error
+        """
+        if not usuario_id:
+            return False
+
+        try:
+            result = balances_collection.update_one(
+                {"usuario_id": usuario_id},
+                _update_delta(
+                    delta_disponible, delta_deudas, delta_movimientos, ultimo_movimiento_id
+                ),
+                upsert=True
+            )
+        except:
+            return False
+
+        cache.invalidar_usuario(usuario_id)
+        return result.acknowledged
+
     @staticmethod
     def crear_balance_inicial(balance_data: dict) -> str:
         """
@@ -92,6 +275,7 @@ class BalanceRepository:
             raise ValueError("El balance debe tener un usuario_id")
 
         result = balances_collection.insert_one(balance_data)
+        cache.invalidar_usuario(balance_data["usuario_id"])
         return str(result.inserted_id)
 
     @staticmethod
@@ -112,6 +296,7 @@ class BalanceRepository:
             return False
 
         result = balances_collection.delete_one({"usuario_id": usuario_id})
+        cache.invalidar_usuario(usuario_id)
         return result.deleted_count > 0
 
     @staticmethod
@@ -144,4 +329,156 @@ class BalanceRepository:
         Returns:
             Lista de documentos de balances
         """
-        return list(balances_collection.find().limit(limit))
\ No newline at end of file
+        return list(balances_collection.find().limit(limit))
+
+
+@medir_repository
+class BalanceRepositoryAsync:
+    """
+    Versión async de BalanceRepository.
+
+    Mismos métodos y semántica, pero cada operación es awaitable y usa el
+    cliente async, de modo que los handlers de Reflex no bloquean el event loop.
+    """
+
+    @staticmethod
+    async def obtener_balance_por_usuario(usuario_id: str) -> dict | None:
+        """Obtiene el balance de un usuario."""
+        if not usuario_id:
+            return None
+
+        balance, generacion = await cache.leer_async(usuario_id, cache.CAMPO_BALANCE)
+        if balance is None:
+            balance = await balances_collection_async.find_one(consulta_balance(usuario_id).filtro)
+            await cache.guardar_async(usuario_id, cache.CAMPO_BALANCE, balance, generacion)
+        return balance
+
+    @staticmethod
+    async def actualizar_balance_por_usuario(usuario_id: str, balance_data: dict) -> bool:
+        """Actualiza (o crea) el balance de un usuario."""
+        if not usuario_id or not balance_data:
+            return False
+
+        try:
+            result = await balances_collection_async.update_one(
+                {"usuario_id": usuario_id},
+                {"$set": balance_data},
+                upsert=True
+            )
+        except:
+            return False
+
+        await cache.invalidar_usuario_async(usuario_id)
+        return result.acknowledged
+
+    @staticmethod
+    async def obtener_version(usuario_id: str) -> int | None:
+        """Lee la versión actual del ledger directamente de MongoDB (sin caché)."""
+        if not usuario_id:
+            return None
+
+        doc = await balances_collection_async.find_one(consulta_balance(usuario_id).filtro, {"version": 1})
+        return doc.get("version") if doc else None
+
+    @staticmethod
+    async def reemplazar_si_version(usuario_id: str, balance_data: dict, version: int | None) -> bool:
+        """Guarda los acumulados del ledger solo si sigue en la versión leída."""
+        if not usuario_id or not balance_data:
+            return False
+
+        try:
+            result = await balances_collection_async.update_one(
+                _filtro_version(usuario_id, version),
+                {"$set": balance_data, "$inc": {"version": 1}},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            return False
+
+        await cache.invalidar_usuario_async(usuario_id)
+        return result.matched_count > 0 or result.upserted_id is not None
+
+    @staticmethod
+    async def aplicar_movimiento(
+        usuario_id: str,
+        movimiento: dict,
+        signo: int = 1,
+        movimiento_id: str = ""
+    ) -> bool:
+        """Aplica (o revierte) el aporte de un movimiento al ledger del usuario."""
+        if not usuario_id or not movimiento:
+            return False
+
+        delta_disponible, delta_deudas = calcular_aporte_movimiento(movimiento)
+        return await BalanceRepositoryAsync.aplicar_delta(
+            usuario_id,
+            delta_disponible=signo * delta_disponible,
+            delta_deudas=signo * delta_deudas,
+            delta_movimientos=signo,
+            ultimo_movimiento_id=movimiento_id
+        )
+
+    @staticmethod
+    async def aplicar_delta(
+        usuario_id: str,
+        delta_disponible: float = 0.0,
+        delta_deudas: float = 0.0,
+        delta_movimientos: int = 0,
+        ultimo_movimiento_id: str = ""
+    ) -> bool:
+        """Incrementa atómicamente los acumulados del ledger de un usuario."""
+        if not usuario_id:
+            return False
+
+        try:
+            result = await balances_collection_async.update_one(
+                {"usuario_id": usuario_id},
+                _update_delta(
+                    delta_disponible, delta_deudas, delta_movimientos, ultimo_movimiento_id
+                ),
+                upsert=True
+            )
+        except:
+            return False
+
+        await cache.invalidar_usuario_async(usuario_id)
+        return result.acknowledged
+
+    @staticmethod
+    async def crear_balance_inicial(balance_data: dict) -> str:
+        """Crea un balance inicial para un usuario."""
+        if not balance_data:
+            raise ValueError("Los datos del balance no pueden estar vacíos")
+
+        if "usuario_id" not in balance_data:
+            raise ValueError("El balance debe tener un usuario_id")
+
+        result = await balances_collection_async.insert_one(balance_data)
+        await cache.invalidar_usuario_async(balance_data["usuario_id"])
+        return str(result.inserted_id)
+
+    @staticmethod
+    async def eliminar_balance_por_usuario(usuario_id: str) -> bool:
+        """Elimina el balance de un usuario."""
+        if not usuario_id:
+            return False
+
+        result = await balances_collection_async.delete_one({"usuario_id": usuario_id})
+        await cache.invalidar_usuario_async(usuario_id)
+        return result.deleted_count > 0
+
+    @staticmethod
+    async def buscar_balance_por_id(balance_id: str) -> dict | None:
+        """Busca un balance específico por su ID."""
+        if not balance_id:
+            return None
+
+        try:
+            return await balances_collection_async.find_one({"_id": ObjectId(balance_id)})
+        except:
+            return None
+
+    @staticmethod
+    async def obtener_todos_los_balances(limit: int = 1000) -> list[dict]:
+        """Obtiene todos los balances (para administración)."""
+        return await balances_collection_async.find().limit(limit).to_list()
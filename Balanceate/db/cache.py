@@ -0,0 +1,291 @@
+"""
+Caché read-through en Redis para las lecturas más repetidas por usuario.
+
+Cada usuario tiene un hash en Redis (balanceate:usuario:<id>) cuyos campos
+son lecturas ya resueltas: el ledger de balance, la primera página del feed
+y el documento de sesión. Los repositories leen primero del hash y, si no
+está, consultan MongoDB y guardan el resultado.
+
+Cualquier escritura de un usuario (movimientos, ledger, datos de usuario)
+borra su hash completo e incrementa su generación
+(balanceate:usuario:<id>:generacion). leer devuelve la generación vista
+antes de ir a MongoDB, y guardar solo escribe si sigue siendo la misma
+(comparación atómica en un script Lua): una lectura lenta que se cruza con
+una escritura no deja un dato viejo en la caché.
+
+Configuración:
+    CACHE_REDIS_URL: URL de Redis (por defecto REDIS_URL, la de Reflex).
+        Sin URL la caché queda desactivada y todo va a MongoDB.
+    CACHE_TTL_SEGUNDOS: Vida máxima de cada hash (default 300)
+    CACHE_MAX_BYTES_ENTRADA: Las lecturas más grandes no se guardan (default 256 KiB)
+
+Si Redis falla, la caché se comporta como un miss y la app sigue
+leyendo de MongoDB.
+"""
+import logging
+import os
+import threading
+import bson
+from dotenv import load_dotenv
+from redis import Redis
+from redis.asyncio import Redis as RedisAsync
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL") or os.getenv("REDIS_URL") or ""
+CACHE_TTL_SEGUNDOS = int(os.getenv("CACHE_TTL_SEGUNDOS", 300))
+CACHE_MAX_BYTES_ENTRADA = int(os.getenv("CACHE_MAX_BYTES_ENTRADA", 256 * 1024))
+
+# La generación dura mucho más que el hash: si expirara durante una lectura
+# lenta, guardar podría aceptar un dato anterior a la última invalidación
+TTL_GENERACION_SEGUNDOS = 24 * 3600
+
+# Guarda el campo solo si la generación no cambió desde la lectura
+_GUARDAR_SI_GENERACION = """
+if (redis.call('GET', KEYS[2]) or '') ~= ARGV[1] then
+    return 0
+end
+redis.call('HSET', KEYS[1], ARGV[2], ARGV[3])
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+return 1
+"""
+
+# Campos del hash de cada usuario
+CAMPO_BALANCE = "balance"
+CAMPO_SESION = "sesion:{limit}:{mes}"
+CAMPO_PAGINA = "pagina:{limit}"
+CAMPO_LISTA = "lista:{limit}"
+
+# Timeouts cortos: la caché nunca debe ser más lenta que ir a MongoDB
+_OPCIONES_REDIS = {"socket_timeout": 0.5, "socket_connect_timeout": 0.5}
+
+_clientes_lock = threading.Lock()
+_cliente: Redis | None = None
+_cliente_async: RedisAsync | None = None
+
+_metricas_lock = threading.Lock()
+_metricas = {
+    "hits": 0,
+    "misses": 0,
+    "guardados": 0,
+    "descartados_por_tamano": 0,
+    "descartados_por_generacion": 0,
+    "invalidaciones": 0,
+    "errores": 0,
+}
+
+
+def _clave(usuario_id: str) -> str:
+    return f"balanceate:usuario:{usuario_id}"
+
+
+def _clave_generacion(usuario_id: str) -> str:
+    return f"balanceate:usuario:{usuario_id}:generacion"
+
+
+def _contar(metrica: str) -> None:
+    with _metricas_lock:
+        _metricas[metrica] += 1
+
+
+def _codificar(valor) -> bytes:
+    """Serializa con BSON para conservar ObjectId y datetime."""
+    return bson.encode({"v": valor})
+
+
+def _decodificar(datos: bytes):
+    return bson.decode(datos)["v"]
+
+
+def cache_activa() -> bool:
+    """True si hay una URL de Redis configurada para la caché."""
+    return bool(CACHE_REDIS_URL)
+
+
+def _obtener_cliente() -> Redis:
+    """Devuelve el cliente sync de Redis, creándolo en el primer uso."""
+    global _cliente
+    if _cliente is None:
+        with _clientes_lock:
+            if _cliente is None:
+                _cliente = Redis.from_url(CACHE_REDIS_URL, **_OPCIONES_REDIS)
+    return _cliente
+
+
+def _obtener_cliente_async() -> RedisAsync:
+    """Devuelve el cliente async de Redis, creándolo en el primer uso."""
+    global _cliente_async
+    if _cliente_async is None:
+        with _clientes_lock:
+            if _cliente_async is None:
+                _cliente_async = RedisAsync.from_url(CACHE_REDIS_URL, **_OPCIONES_REDIS)
+    return _cliente_async
+
+
+def _preparar_guardado(valor) -> bytes | None:
+    """Serializa un valor para guardarlo, o None si no debe guardarse."""
+    if valor is None:
+        return None
+    datos = _codificar(valor)
+    if len(datos) > CACHE_MAX_BYTES_ENTRADA:
+        _contar("descartados_por_tamano")
+        return None
+    return datos
+
+
+def _resultado_lectura(datos: bytes | None, generacion: bytes | None) -> tuple:
+    """Decodifica una lectura del hash y cuenta el hit o el miss."""
+    generacion = (generacion or b"").decode()
+    if datos is None:
+        _contar("misses")
+        return None, generacion
+    _contar("hits")
+    return _decodificar(datos), generacion
+
+
+def _resultado_guardado(guardado: int) -> None:
+    """Cuenta un guardado o un descarte porque la generación cambió."""
+    _contar("guardados" if guardado else "descartados_por_generacion")
+
+
+def leer(usuario_id: str, campo: str) -> tuple:
+    """
+    Lee una entrada de la caché de un usuario.
+
+    Args:
+        usuario_id: ID del usuario
+        campo: Campo del hash (p. ej. CAMPO_BALANCE)
+
+    Returns:
+        Tupla (valor, generación). valor es None si no está (miss), la
+        caché está desactivada o Redis no responde; la generación se pasa
+        a guardar tras leer de MongoDB.
+    """
+    if not cache_activa() or not usuario_id:
+        return None, None
+    try:
+        pipe = _obtener_cliente().pipeline(transaction=False)
+        pipe.hget(_clave(usuario_id), campo)
+        pipe.get(_clave_generacion(usuario_id))
+        return _resultado_lectura(*pipe.execute())
+    except Exception as e:
+        _contar("errores")
+        logger.warning("Caché no disponible: %s", e)
+        return None, None
+
+
+def guardar(usuario_id: str, campo: str, valor, generacion: str | None) -> None:
+    """
+    Guarda una entrada en la caché de un usuario y renueva el TTL del hash.
+
+    Args:
+        usuario_id: ID del usuario
+        campo: Campo del hash
+        valor: Valor leído de MongoDB
+        generacion: Generación devuelta por leer antes de esa lectura
+
+    Nota:
+        No guarda None ni valores mayores que CACHE_MAX_BYTES_ENTRADA, ni
+        nada si el usuario se invalidó desde la lectura (generación distinta).
+    """
+    if not cache_activa() or not usuario_id or generacion is None:
+        return
+    datos = _preparar_guardado(valor)
+    if datos is None:
+        return
+    try:
+        guardar_si_generacion = _obtener_cliente().register_script(_GUARDAR_SI_GENERACION)
+        _resultado_guardado(guardar_si_generacion(
+            keys=[_clave(usuario_id), _clave_generacion(usuario_id)],
+            args=[generacion, campo, datos, CACHE_TTL_SEGUNDOS],
+        ))
+    except Exception as e:
+        _contar("errores")
+        logger.warning("Caché no disponible: %s", e)
+
+
+def invalidar_usuario(usuario_id: str) -> None:
+    """
+    Borra todas las entradas de la caché de un usuario y avanza su generación.
+
+    Uso común:
+        - Tras cualquier escritura de movimientos, ledger o datos del usuario
+    """
+    if not cache_activa() or not usuario_id:
+        return
+    try:
+        pipe = _obtener_cliente().pipeline(transaction=True)
+        pipe.delete(_clave(usuario_id))
+        pipe.incr(_clave_generacion(usuario_id))
+        pipe.expire(_clave_generacion(usuario_id), TTL_GENERACION_SEGUNDOS)
+        pipe.execute()
+        _contar("invalidaciones")
+    except Exception as e:
+        _contar("errores")
+        logger.warning("No se pudo invalidar la caché de %s: %s", usuario_id, e)
+
+
+async def leer_async(usuario_id: str, campo: str) -> tuple:
+    """Versión async de leer."""
+    if not cache_activa() or not usuario_id:
+        return None, None
+    try:
+        pipe = _obtener_cliente_async().pipeline(transaction=False)
+        pipe.hget(_clave(usuario_id), campo)
+        pipe.get(_clave_generacion(usuario_id))
+        return _resultado_lectura(*await pipe.execute())
+    except Exception as e:
+        _contar("errores")
+        logger.warning("Caché no disponible: %s", e)
+        return None, None
+
+
+async def guardar_async(usuario_id: str, campo: str, valor, generacion: str | None) -> None:
+    """Versión async de guardar."""
+    if not cache_activa() or not usuario_id or generacion is None:
+        return
+    datos = _preparar_guardado(valor)
+    if datos is None:
+        return
+    try:
+        guardar_si_generacion = _obtener_cliente_async().register_script(_GUARDAR_SI_GENERACION)
+        _resultado_guardado(await guardar_si_generacion(
+            keys=[_clave(usuario_id), _clave_generacion(usuario_id)],
+            args=[generacion, campo, datos, CACHE_TTL_SEGUNDOS],
+        ))
+    except Exception as e:
+        _contar("errores")
+        logger.warning("Caché no disponible: %s", e)
+
+
+async def invalidar_usuario_async(usuario_id: str) -> None:
+    """Versión async de invalidar_usuario."""
+    if not cache_activa() or not usuario_id:
+        return
+    try:
+        pipe = _obtener_cliente_async().pipeline(transaction=True)
+        pipe.delete(_clave(usuario_id))
+        pipe.incr(_clave_generacion(usuario_id))
+        pipe.expire(_clave_generacion(usuario_id), TTL_GENERACION_SEGUNDOS)
+        await pipe.execute()
+        _contar("invalidaciones")
+    except Exception as e:
+        _contar("errores")
+        logger.warning("No se pudo invalidar la caché de %s: %s", usuario_id, e)
+
+
+def metricas_cache() -> dict:
+    """
+    Devuelve los contadores de la caché de este proceso.
+
+    Returns:
+        Diccionario con hits, misses, guardados, descartados_por_tamano,
+        descartados_por_generacion, invalidaciones, errores y tasa_hits (0-1)
+    """
+    with _metricas_lock:
+        metricas = dict(_metricas)
+    lecturas = metricas["hits"] + metricas["misses"]
+    metricas["tasa_hits"] = metricas["hits"] / lecturas if lecturas else 0.0
+    return metricas
@@ -0,0 +1,382 @@
+"""
+Repository para el calendario de pagos de las deudas.
+Encapsula el acceso a la colección calendario_deudas.
+
+Cada deuda guarda su calendario al crearse (ver amortizacion_service): una
+entrada "alta" con delta +monto_total y una entrada "pago" por cuota con
+delta -pago. Con el índice (usuario_id, fecha, delta):
+    - Deuda pendiente a una fecha: suma de delta con fecha <= X
+    - Pagos del mes: entradas "pago" con fecha dentro del mes
+Ninguna de las dos recalcula calendarios al leer.
+
+Regenerar un calendario inserta primero las entradas nuevas y después borra
+las viejas de esa deuda: un lector nunca ve la deuda sin calendario.
+"""
+from datetime import datetime
+from bson import ObjectId
+from . import cache
+from .consultas import Consulta
+from .db import (
+    movimientos_collection,
+    calendario_deudas_collection,
+    calendario_deudas_collection_async,
+)
+from ..services.amortizacion_service import calendario_de_movimiento, rango_mes
+from ..services.metricas_service import medir_repository
+
+
+# Campos de un pago que se devuelven a la UI
+PROYECCION_PAGO = {"_id": 0, "deuda_id": 1, "fecha": 1, "cuota": 1, "monto": 1, "saldo": 1}
+
+# Campos de las entradas del mes que viajan con la sesión
+PROYECCION_ENTRADA_MES = {"_id": 0, "tipo": 1, "fecha": 1, "delta": 1, "monto": 1}
+
+
+def pipeline_pendiente(usuario_id: str, fecha: datetime) -> list[dict]:
+    """Agregación que suma los deltas del calendario hasta una fecha (cubierta por el índice)."""
+    return [
+        {"$match": {"usuario_id": usuario_id, "fecha": {"$lte": fecha}}},
+        {"$group": {"_id": None, "pendiente": {"$sum": "$delta"}}},
+    ]
+
+
+def query_pagos_mes(usuario_id: str, fecha: datetime) -> dict:
+    """Filtro de los pagos que vencen en el mes de fecha."""
+    inicio, fin = rango_mes(fecha)
+    return {"usuario_id": usuario_id, "fecha": {"$gte": inicio, "$lt": fin}, "tipo": "pago"}
+
+
+def consulta_pagos_mes(usuario_id: str, fecha: datetime) -> Consulta:
+    """Pagos que vencen en el mes de fecha, ordenados por fecha."""
+    return Consulta(query_pagos_mes(usuario_id, fecha), PROYECCION_PAGO, [("fecha", 1)])
+
+
+def consulta_calendario_deuda(deuda_id: str) -> Consulta:
+    """Entradas del calendario de una deuda (índice deuda)."""
+    return Consulta({"deuda_id": deuda_id})
+
+
+def consulta_deudas(usuario_id: str) -> Consulta:
+    """Movimientos de tipo deuda de un usuario (sobre movimientos)."""
+    return Consulta({"usuario_id": usuario_id, "tipo": "deuda"})
+
+
+def lookups_deudas_sesion(usuario_id: str, fecha: datetime) -> list[dict]:
+    """
+    Etapas $lookup que traen las deudas de un usuario junto con su sesión.
+
+    En lugar de la deuda pendiente a una hora exacta, traen lo que no cambia
+    durante el mes: la suma de deltas anteriores al mes ("deuda_previa") y
+    las entradas del mes ("calendario_mes"). Así la sesión cacheada sirve
+    todo el mes y deudas_de_sesion resuelve el pendiente a la hora de leer.
+    """
+    inicio, fin = rango_mes(fecha)
+    return [
+        {"$lookup": {
+            "from": "calendario_deudas",
+            "pipeline": [
+                {"$match": {"usuario_id": usuario_id, "fecha": {"$lt": inicio}}},
+                {"$group": {"_id": None, "pendiente": {"$sum": "$delta"}}},
+            ],
+            "as": "deuda_previa",
+        }},
+        {"$lookup": {
+            "from": "calendario_deudas",
+            "pipeline": [
+                {"$match": {"usuario_id": usuario_id, "fecha": {"$gte": inicio, "$lt": fin}}},
+                {"$project": PROYECCION_ENTRADA_MES},
+            ],
+            "as": "calendario_mes",
+        }},
+    ]
+
+
+def deudas_de_sesion(deuda_previa: float, calendario_mes: list[dict], fecha: datetime) -> tuple[float, float]:
+    """
+    Resuelve la deuda pendiente y los pagos del mes desde lo que trae la sesión.
+
+    Args:
+        deuda_previa: Suma de deltas anteriores al mes
+        calendario_mes: Entradas del mes (campos de PROYECCION_ENTRADA_MES)
+        fecha: Fecha de corte de la deuda pendiente
+
+    Returns:
+        Tupla (deuda pendiente a fecha, total de pagos del mes), igual que
+        obtener_deuda_pendiente y obtener_pagos_del_mes
+    """
+    pendiente = deuda_previa + sum(
+        entrada.get("delta", 0) for entrada in calendario_mes if entrada["fecha"] <= fecha
+    )
+    pagos = sum(entrada.get("monto", 0) for entrada in calendario_mes if entrada.get("tipo") == "pago")
+    return round(pendiente, 2), round(pagos, 2)
+
+
+def _filtro_entradas_viejas(deuda_id: str, nuevas: list) -> dict:
+    """Filtro de las entradas de una deuda que no están entre las recién insertadas."""
+    return {"deuda_id": deuda_id, "_id": {"$nin": nuevas}}
+
+
+def _deuda_existe(deuda_id: str) -> bool:
+    """Indica si deuda_id es un movimiento de tipo deuda (p. ej. creado durante una reconstrucción)."""
+    if not ObjectId.is_valid(deuda_id):
+        return False
+    return movimientos_collection.find_one({"_id": ObjectId(deuda_id), "tipo": "deuda"}, {"_id": 1}) is not None
+
+
+def _entradas_de_movimientos(movimientos: list[dict]) -> list[dict]:
+    """Entradas de calendario de todas las deudas de una lista de movimientos."""
+    entradas = []
+    for movimiento in movimientos:
+        entradas.extend(calendario_de_movimiento(movimiento))
+    return entradas
+
+
+@medir_repository
+class CalendarioRepository:
+    """
+    Repository para gestionar el calendario de deudas en MongoDB.
+
+    Responsabilidades:
+        - Guardar el calendario de cada deuda al crearla
+        - Regenerarlo o eliminarlo cuando la deuda cambia o se borra
+        - Responder deuda pendiente y pagos del mes con lecturas indexadas
+    """
+
+    @staticmethod
+    def crear_calendario(movimiento: dict) -> int:
+        """
+        Guarda el calendario de un movimiento de tipo deuda.
+
+        Args:
+            movimiento: Documento del movimiento ya insertado (con _id)
+
+        Returns:
+            Número de entradas guardadas (0 si no es una deuda)
+        """
+        return CalendarioRepository.crear_calendarios_lote([movimiento])
+
+    @staticmethod
+    def crear_calendarios_lote(movimientos: list[dict]) -> int:
+        """
+        Guarda los calendarios de las deudas de un lote de movimientos.
+
+        Args:
+            movimientos: Documentos ya insertados (con _id)
+
+        Returns:
+            Número de entradas guardadas
+
+        Nota:
+            Un único insert_many para todo el lote.
+        """
+        entradas = _entradas_de_movimientos(movimientos)
+        if not entradas:
+            return 0
+
+        try:
+            return len(calendario_deudas_collection.insert_many(entradas, ordered=False).inserted_ids)
+        except:
+            return 0
+
+    @staticmethod
+    def eliminar_calendario(deuda_id: str) -> int:
+        """
+        Elimina el calendario de una deuda.
+
+        Args:
+            deuda_id: ID del movimiento de tipo deuda
+
+        Returns:
+            Número de entradas eliminadas
+        """
+        if not deuda_id:
+            return 0
+
+        return calendario_deudas_collection.delete_many(consulta_calendario_deuda(deuda_id).filtro).deleted_count
+
+    @staticmethod
+    def regenerar_calendario(movimiento: dict) -> int:
+        """
+        Reemplaza el calendario de una deuda tras editarla.
+
+        Args:
+            movimiento: Documento actualizado del movimiento (con _id)
+
+        Returns:
+            Número de entradas guardadas (0 si ya no es una deuda)
+
+        Nota:
+            Inserta las entradas nuevas y después borra las viejas de la
+            deuda. Si el insert falla, el calendario anterior se conserva.
+        """
+        deuda_id = str(movimiento.get("_id", ""))
+        if not deuda_id:
+            return 0
+
+        entradas = calendario_de_movimiento(movimiento)
+        nuevas = []
+        if entradas:
+            try:
+                nuevas = calendario_deudas_collection.insert_many(entradas, ordered=False).inserted_ids
+            except:
+                return 0
+
+        calendario_deudas_collection.delete_many(_filtro_entradas_viejas(deuda_id, nuevas))
+        return len(nuevas)
+
+    @staticmethod
+    def reconstruir_por_usuario(usuario_id: str) -> int:
+        """
+        Regenera los calendarios de todas las deudas de un usuario.
+
+        Args:
+            usuario_id: ID del usuario
+
+        Returns:
+            Número de entradas guardadas
+
+        Nota:
+            Va deuda por deuda con regenerar_calendario, así que durante la
+            reconstrucción la deuda pendiente nunca baja a cero. Al final
+            borra los calendarios de deudas que ya no existen.
+
+        Uso común:
+            - Reconciliación y deudas creadas antes de existir el calendario
+        """
+        if not usuario_id:
+            return 0
+
+        guardadas = 0
+        deudas = set()
+        for deuda in consulta_deudas(usuario_id).cursor(movimientos_collection):
+            guardadas += CalendarioRepository.regenerar_calendario(deuda)
+            deudas.add(str(deuda["_id"]))
+
+        huerfanas = [
+            deuda_id
+            for deuda_id in calendario_deudas_collection.distinct("deuda_id", {"usuario_id": usuario_id})
+            if deuda_id not in deudas and not _deuda_existe(deuda_id)
+        ]
+        if huerfanas:
+            calendario_deudas_collection.delete_many({"usuario_id": usuario_id, "deuda_id": {"$in": huerfanas}})
+
+        cache.invalidar_usuario(usuario_id)
+        return guardadas
+
+    @staticmethod
+    def obtener_deuda_pendiente(usuario_id: str, fecha: datetime | None = None) -> float:
+        """
+        Calcula la deuda pendiente de un usuario a una fecha.
+
+        Args:
+            usuario_id: ID del usuario
+            fecha: Fecha de corte (default: ahora)
+
+        Returns:
+            Suma de los saldos de todas sus deudas a esa fecha
+        """
+        if not usuario_id:
+            return 0.0
+
+        resultado = list(calendario_deudas_collection.aggregate(
+            pipeline_pendiente(usuario_id, fecha or datetime.now())
+        ))
+        return round(resultado[0]["pendiente"], 2) if resultado else 0.0
+
+    @staticmethod
+    def obtener_pagos_del_mes(usuario_id: str, fecha: datetime | None = None) -> list[dict]:
+        """
+        Obtiene los pagos de deudas que vencen en un mes.
+
+        Args:
+            usuario_id: ID del usuario
+            fecha: Cualquier fecha del mes (default: ahora)
+
+        Returns:
+            Lista de pagos ordenados por fecha (campos de PROYECCION_PAGO)
+        """
+        if not usuario_id:
+            return []
+
+        return list(consulta_pagos_mes(usuario_id, fecha or datetime.now()).cursor(calendario_deudas_collection))
+
+
+@medir_repository
+class CalendarioRepositoryAsync:
+    """
+    Versión async de CalendarioRepository.
+
+    Mismos métodos y semántica, pero cada operación es awaitable y usa el
+    cliente async. La reconstrucción completa solo existe en la versión sync
+    (reconciliación).
+    """
+
+    @staticmethod
+    async def crear_calendario(movimiento: dict) -> int:
+        """Guarda el calendario de un movimiento de tipo deuda."""
+        return await CalendarioRepositoryAsync.crear_calendarios_lote([movimiento])
+
+    @staticmethod
+    async def crear_calendarios_lote(movimientos: list[dict]) -> int:
+        """Guarda los calendarios de las deudas de un lote de movimientos."""
+        entradas = _entradas_de_movimientos(movimientos)
+        if not entradas:
+            return 0
+
+        try:
+            resultado = await calendario_deudas_collection_async.insert_many(entradas, ordered=False)
+            return len(resultado.inserted_ids)
+        except:
+            return 0
+
+    @staticmethod
+    async def eliminar_calendario(deuda_id: str) -> int:
+        """Elimina el calendario de una deuda."""
+        if not deuda_id:
+            return 0
+
+        resultado = await calendario_deudas_collection_async.delete_many(consulta_calendario_deuda(deuda_id).filtro)
+        return resultado.deleted_count
+
+    @staticmethod
+    async def regenerar_calendario(movimiento: dict) -> int:
+        """Reemplaza el calendario de una deuda: inserta las entradas nuevas y luego borra las viejas."""
+        deuda_id = str(movimiento.get("_id", ""))
+        if not deuda_id:
+            return 0
+
+        entradas = calendario_de_movimiento(movimiento)
+        nuevas = []
+        if entradas:
+            try:
+                resultado = await calendario_deudas_collection_async.insert_many(entradas, ordered=False)
+                nuevas = resultado.inserted_ids
+            except:
+                return 0
+
+        await calendario_deudas_collection_async.delete_many(_filtro_entradas_viejas(deuda_id, nuevas))
+        return len(nuevas)
+
+    @staticmethod
+    async def obtener_deuda_pendiente(usuario_id: str, fecha: datetime | None = None) -> float:
+        """Calcula la deuda pendiente de un usuario a una fecha."""
+        if not usuario_id:
+            return 0.0
+
+        cursor = await calendario_deudas_collection_async.aggregate(
+            pipeline_pendiente(usuario_id, fecha or datetime.now())
+        )
+        resultado = await cursor.to_list()
+        return round(resultado[0]["pendiente"], 2) if resultado else 0.0
+
+    @staticmethod
+    async def obtener_pagos_del_mes(usuario_id: str, fecha: datetime | None = None) -> list[dict]:
+        """Obtiene los pagos de deudas que vencen en un mes."""
+        if not usuario_id:
+            return []
+
+        return await (
+            consulta_pagos_mes(usuario_id, fecha or datetime.now())
+            .cursor(calendario_deudas_collection_async)
+            .to_list()
+        )
@@ -0,0 +1,34 @@
+"""
+Descripción de las queries de lectura de los repositories.
+
+Cada repository construye sus queries con funciones consulta_* a nivel de
+módulo que devuelven una Consulta (filtro, proyección, orden y límite). El
+repository la ejecuta y la verificación de planes de db/indices.py la
+explica con explain(), así que ambos usan exactamente la misma query.
+"""
+from typing import NamedTuple
+
+
+class Consulta(NamedTuple):
+    """Query find() de un repository, sin ejecutar."""
+    filtro: dict
+    proyeccion: dict | None = None
+    orden: list[tuple[str, int]] | None = None
+    limite: int = 0
+
+    def cursor(self, coleccion):
+        """
+        Construye el cursor find() de la consulta sobre una colección.
+
+        Args:
+            coleccion: Colección sync o async (el cursor es del mismo tipo)
+
+        Returns:
+            Cursor sin iterar: se puede leer, ajustar (batch_size) o explicar
+        """
+        cursor = coleccion.find(self.filtro, self.proyeccion)
+        if self.orden:
+            cursor = cursor.sort(self.orden)
+        if self.limite:
+            cursor = cursor.limit(self.limite)
+        return cursor
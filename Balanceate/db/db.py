@@ -1,26 +1,184 @@
-from pymongo import MongoClient
+import logging
+import threading
+from pymongo import AsyncMongoClient, MongoClient
+from pymongo.read_preferences import read_pref_mode_from_name, make_read_preference
 from pymongo.server_api import ServerApi
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 uri = os.getenv("MONGO_URI")
 
-client = MongoClient(
-    uri,
-    server_api=ServerApi('1'),
-    serverSelectionTimeoutMS=10000,  # 10s para detectar problemas rápido
+
+def _env_int(nombre: str, default: int) -> int:
+    """Lee un entero de las variables de entorno."""
+    return int(os.getenv(nombre, default))
+
+
+def _env_bool(nombre: str, default: bool) -> bool:
+    """Lee un booleano de las variables de entorno ("true"/"false", "1"/"0")."""
+    return os.getenv(nombre, str(default)).strip().lower() in ("1", "true", "yes", "si")
+
+
+# Configuración del pool y timeouts, ajustable por entorno.
+# maxPoolSize es por proceso: con N workers de Reflex el cluster ve hasta
+# N * maxPoolSize conexiones por cliente (hay un cliente sync y uno async).
+OPCIONES_CLIENTE = {
+    "maxPoolSize": _env_int("MONGO_MAX_POOL_SIZE", 100),
+    "minPoolSize": _env_int("MONGO_MIN_POOL_SIZE", 0),
+    "maxIdleTimeMS": _env_int("MONGO_MAX_IDLE_TIME_MS", 0) or None,
+    "waitQueueTimeoutMS": _env_int("MONGO_WAIT_QUEUE_TIMEOUT_MS", 0) or None,
+    "connectTimeoutMS": _env_int("MONGO_CONNECT_TIMEOUT_MS", 20000),
+    "socketTimeoutMS": _env_int("MONGO_SOCKET_TIMEOUT_MS", 0) or None,
+    "serverSelectionTimeoutMS": _env_int("MONGO_SERVER_SELECTION_TIMEOUT_MS", 10000),  # 10s para detectar problemas rápido
+    "retryReads": _env_bool("MONGO_RETRY_READS", True),
+    "retryWrites": _env_bool("MONGO_RETRY_WRITES", True),
+}
+
+# Compresión de red, p. ej. "zstd,snappy,zlib" (zstd requiere zstandard y
+# snappy requiere python-snappy; PyMongo ignora los que no estén instalados)
+_compresores = os.getenv("MONGO_COMPRESSORS", "").strip()
+if _compresores:
+    OPCIONES_CLIENTE["compressors"] = _compresores
+
+# Preferencia de lectura para consultas de reportes (resúmenes): permite
+# enviarlas a secundarios sin afectar al resto de la app, que lee del primario
+READ_PREFERENCE_REPORTES = make_read_preference(
+    read_pref_mode_from_name(os.getenv("MONGO_REPORTES_READ_PREFERENCE", "primary")),
+    None
 )
 
-db = client["balanceate"]
+_clientes_lock = threading.Lock()
+_client: MongoClient | None = None
+_async_client: AsyncMongoClient | None = None
+_configuracion_registrada = False
+
+
+def _log_configuracion():
+    """
+    Muestra la configuración efectiva del cliente (sin credenciales).
+    
+    Se registra una sola vez por proceso, al crear el primer cliente de
+    cualquiera de los dos tipos (la app solo usa el async). Se llama con
+    _clientes_lock tomado.
+    """
+    global _configuracion_registrada
+    if _configuracion_registrada:
+        return
+    _configuracion_registrada = True
+    logger.info(
+        "Cliente MongoDB creado",
+        extra={
+            "opciones": {clave: str(valor) for clave, valor in OPCIONES_CLIENTE.items()},
+            "read_preference_reportes": READ_PREFERENCE_REPORTES.name,
+        }
+    )
+
+
+def obtener_cliente() -> MongoClient:
+    """
+    Devuelve el cliente sync, creándolo en el primer uso.
+    
+    Nota:
+        Crear el cliente puede resolver DNS (mongodb+srv://), por eso no se
+        hace al importar el módulo: el arranque solo paga el import de Python.
+    """
+    global _client
+    if _client is None:
+        with _clientes_lock:
+            if _client is None:
+                _log_configuracion()
+                _client = MongoClient(
+                    uri,
+                    server_api=ServerApi('1'),
+                    **OPCIONES_CLIENTE,
+                )
+    return _client
+
+
+def obtener_cliente_async() -> AsyncMongoClient:
+    """
+    Devuelve el cliente async (API nativa de PyMongo), creándolo en el primer uso.
+    
+    Los handlers de Reflex lo usan con await para no bloquear el event loop
+    del worker.
+    """
+    global _async_client
+    if _async_client is None:
+        with _clientes_lock:
+            if _async_client is None:
+                _log_configuracion()
+                _async_client = AsyncMongoClient(
+                    uri,
+                    server_api=ServerApi('1'),
+                    **OPCIONES_CLIENTE,
+                )
+    return _async_client
+
+
+class ColeccionPerezosa:
+    """
+    Referencia a una colección que crea el cliente en su primer uso.
+    
+    Delega todos los atributos en la colección real, así que los
+    repositories la usan igual que una Collection de PyMongo.
+    """
+    
+    def __init__(self, obtener_cliente_fn, nombre: str, **opciones):
+        self._obtener_cliente = obtener_cliente_fn
+        self._nombre = nombre
+        self._opciones = opciones
+        self._coleccion = None
+    
+    def _obtener(self):
+        if self._coleccion is None:
+            coleccion = self._obtener_cliente()["balanceate"][self._nombre]
+            if self._opciones:
+                coleccion = coleccion.with_options(**self._opciones)
+            self._coleccion = coleccion
+        return self._coleccion
+    
+    def __getattr__(self, atributo):
+        return getattr(self._obtener(), atributo)
+
+
+movimientos_collection = ColeccionPerezosa(obtener_cliente, "movimientos")
+usuarios_collection = ColeccionPerezosa(obtener_cliente, "usuarios")
+balances_collection = ColeccionPerezosa(obtener_cliente, "balances")
+resumenes_collection = ColeccionPerezosa(obtener_cliente, "resumenes_mensuales")
+calendario_deudas_collection = ColeccionPerezosa(obtener_cliente, "calendario_deudas")
+
+movimientos_collection_async = ColeccionPerezosa(obtener_cliente_async, "movimientos")
+usuarios_collection_async = ColeccionPerezosa(obtener_cliente_async, "usuarios")
+balances_collection_async = ColeccionPerezosa(obtener_cliente_async, "balances")
+resumenes_collection_async = ColeccionPerezosa(obtener_cliente_async, "resumenes_mensuales")
+calendario_deudas_collection_async = ColeccionPerezosa(obtener_cliente_async, "calendario_deudas")
+
+# Vistas de colección para reportes, con su propia preferencia de lectura
+resumenes_collection_reportes = ColeccionPerezosa(
+    obtener_cliente, "resumenes_mensuales", read_preference=READ_PREFERENCE_REPORTES
+)
+resumenes_collection_reportes_async = ColeccionPerezosa(
+    obtener_cliente_async, "resumenes_mensuales", read_preference=READ_PREFERENCE_REPORTES
+)
 
-movimientos_collection = db["movimientos"]
-usuarios_collection = db["usuarios"]
-balances_collection = db["balances"]
 
-try:
-    client.admin.command('ping')
-    print("✅ Conectado exitosamente a MongoDB Atlas.")
-except Exception as e:
-    print("❌ Error de conexión con MongoDB:", e)
+async def verificar_conexion() -> bool:
+    """
+    Hace ping a MongoDB con el cliente async.
+    
+    Returns:
+        True si el servidor responde, False en caso contrario
+        
+    Uso común:
+        - Endpoint de readiness (/ready); no se ejecuta al importar
+    """
+    try:
+        await obtener_cliente_async().admin.command('ping')
+        return True
+    except Exception as e:
+        logger.error("Error de conexión con MongoDB: %s", e)
+        return False
@@ -0,0 +1,311 @@
+"""
+Gestión de índices de MongoDB.
+
+Declara los índices que necesitan las queries de los repositories y permite
+aplicarlos de forma idempotente (create_index no hace nada si el índice ya
+existe con la misma definición). También incluye una verificación de planes
+de ejecución: corre explain() sobre cada query y agregación de los
+repositories (incluidos los sub-pipelines de cada $lookup) y falla si alguna
+hace un COLLSCAN o un SORT en memoria.
+
+Uso:
+    python -m Balanceate.db.indices              # aplicar índices (deploy)
+    python -m Balanceate.db.indices --verificar  # aplicar y verificar planes
+"""
+import sys
+from datetime import datetime
+from typing import NamedTuple
+from pymongo import ASCENDING, DESCENDING
+from .db import (
+    movimientos_collection,
+    usuarios_collection,
+    balances_collection,
+    resumenes_collection,
+    calendario_deudas_collection,
+)
+from .balance_repository import consulta_balance
+from .calendario_repository import (
+    consulta_calendario_deuda,
+    consulta_deudas,
+    consulta_pagos_mes,
+    pipeline_pendiente,
+)
+from .movimiento_repository import (
+    consulta_conteo,
+    consulta_exportacion,
+    consulta_historial,
+    consulta_movimiento_por_id,
+    consulta_movimientos,
+    consulta_pagina,
+    consulta_rango,
+)
+from .resumen_repository import consulta_resumenes, pipeline_resumenes
+from .usuario_repository import consulta_por_email, consulta_usuario_por_id, pipeline_sesion
+
+
+# Índices por colección: (colección, claves, opciones)
+INDICES = [
+    # Feed y rangos de fechas: filtro por usuario_id, orden por fecha desc.
+    # _id desempata movimientos con la misma fecha.
+    (
+        movimientos_collection,
+        [("usuario_id", ASCENDING), ("fecha", DESCENDING), ("_id", DESCENDING)],
+        {"name": "usuario_fecha"},
+    ),
+    # Login y registro: búsqueda por email normalizado
+    (
+        usuarios_collection,
+        [("email", ASCENDING)],
+        {"name": "email_unico", "unique": True},
+    ),
+    # Ledger de balance: un documento por usuario
+    (
+        balances_collection,
+        [("usuario_id", ASCENDING)],
+        {"name": "usuario_unico", "unique": True},
+    ),
+    # Resúmenes mensuales: un documento por usuario y mes (clave de $merge)
+    (
+        resumenes_collection,
+        [("usuario_id", ASCENDING), ("mes", DESCENDING)],
+        {"name": "usuario_mes", "unique": True},
+    ),
+    # Calendario de deudas: deuda pendiente a una fecha (suma de delta,
+    # cubierta por el índice) y pagos del mes por rango de fechas
+    (
+        calendario_deudas_collection,
+        [("usuario_id", ASCENDING), ("fecha", ASCENDING), ("delta", ASCENDING)],
+        {"name": "usuario_fecha_delta"},
+    ),
+    # Regenerar o eliminar el calendario de una deuda
+    (
+        calendario_deudas_collection,
+        [("deuda_id", ASCENDING)],
+        {"name": "deuda"},
+    ),
+]
+
+# Etapas de plan que delatan una query sin índice adecuado
+ETAPAS_PROHIBIDAS = {"COLLSCAN", "SORT"}
+
+# Etapas de agregación que escriben; explain() las ignora en la verificación
+ETAPAS_ESCRITURA = ("$merge", "$out")
+
+
+class Agregacion(NamedTuple):
+    """Agregación de un repository para explicar con el comando aggregate."""
+    coleccion: object
+    pipeline: list[dict]
+
+
+def asegurar_indices() -> list[str]:
+    """
+    Crea los índices declarados si aún no existen.
+    
+    Returns:
+        Lista con los nombres de índices asegurados ("coleccion.indice")
+        
+    Nota:
+        Es seguro ejecutarla en cada deploy. Si ya existe un índice con el
+        mismo nombre pero distinta definición, MongoDB lanza OperationFailure.
+    """
+    asegurados = []
+    for coleccion, claves, opciones in INDICES:
+        nombre = coleccion.create_index(claves, **opciones)
+        asegurados.append(f"{coleccion.name}.{nombre}")
+    return asegurados
+
+
+def _consultas_repositories() -> dict:
+    """
+    Construye las queries de los repositories sin ejecutarlas.
+    
+    Usa los mismos builders (consulta_*, pipeline_*) que los repositories,
+    así que cualquier cambio de filtro, orden o límite llega a la verificación.
+    
+    Returns:
+        Diccionario {descripción: cursor o Agregacion} listo para explain()
+    """
+    usuario_id = "000000000000000000000000"
+    fecha = datetime(2000, 1, 1)
+    
+    return {
+        "MovimientoRepository.buscar_movimientos_por_usuario": (
+            consulta_movimientos(usuario_id, 100).cursor(movimientos_collection)
+        ),
+        "MovimientoRepository.buscar_pagina_movimientos_por_usuario": (
+            consulta_pagina(usuario_id, 50, fecha, usuario_id).cursor(movimientos_collection)
+        ),
+        "MovimientoRepository.buscar_pagina_movimientos_por_usuario (primera)": (
+            consulta_pagina(usuario_id, 50, "", "").cursor(movimientos_collection)
+        ),
+        "MovimientoRepository.buscar_movimientos_por_rango_fechas": (
+            consulta_rango(usuario_id, fecha, fecha, 1000).cursor(movimientos_collection)
+        ),
+        "MovimientoRepository.iterar_movimientos_por_usuario": (
+            consulta_historial(usuario_id).cursor(movimientos_collection)
+        ),
+        "MovimientoRepository.iterar_movimientos_exportacion": (
+            consulta_exportacion(usuario_id, fecha, fecha).cursor(movimientos_collection)
+        ),
+        "MovimientoRepository.iterar_movimientos_exportacion (completo)": (
+            consulta_exportacion(usuario_id, None, None).cursor(movimientos_collection)
+        ),
+        "MovimientoRepository.contar_movimientos_por_usuario": (
+            consulta_conteo(usuario_id).cursor(movimientos_collection)
+        ),
+        "MovimientoRepository.buscar_movimiento_por_id": (
+            consulta_movimiento_por_id(usuario_id).cursor(movimientos_collection)
+        ),
+        "UsuarioRepository.buscar_por_email": (
+            consulta_por_email("usuario@example.com").cursor(usuarios_collection)
+        ),
+        "UsuarioRepository.buscar_por_id": (
+            consulta_usuario_por_id(usuario_id).cursor(usuarios_collection)
+        ),
+        "UsuarioRepository.buscar_sesion_por_id": Agregacion(
+            usuarios_collection, pipeline_sesion(usuario_id, 50, fecha)
+        ),
+        "ResumenRepository.obtener_resumenes_por_usuario": (
+            consulta_resumenes(usuario_id, 24).cursor(resumenes_collection)
+        ),
+        "ResumenRepository.recalcular_por_usuario": Agregacion(
+            movimientos_collection, pipeline_resumenes(usuario_id, "verificacion")
+        ),
+        "CalendarioRepository.obtener_deuda_pendiente": Agregacion(
+            calendario_deudas_collection, pipeline_pendiente(usuario_id, fecha)
+        ),
+        "CalendarioRepository.obtener_pagos_del_mes": (
+            consulta_pagos_mes(usuario_id, fecha).cursor(calendario_deudas_collection)
+        ),
+        "CalendarioRepository.eliminar_calendario": (
+            consulta_calendario_deuda(usuario_id).cursor(calendario_deudas_collection)
+        ),
+        "CalendarioRepository.reconstruir_por_usuario": (
+            consulta_deudas(usuario_id).cursor(movimientos_collection)
+        ),
+        "BalanceRepository.obtener_balance_por_usuario": (
+            consulta_balance(usuario_id).cursor(balances_collection)
+        ),
+    }
+
+
+def _etapas_del_plan(plan) -> set[str]:
+    """Recorre un plan de explain() y devuelve todas sus etapas."""
+    etapas = set()
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            etapas.add(plan["stage"])
+        for valor in plan.values():
+            etapas |= _etapas_del_plan(valor)
+    elif isinstance(plan, list):
+        for valor in plan:
+            etapas |= _etapas_del_plan(valor)
+    return etapas
+
+
+def _planes_ganadores(explain) -> list:
+    """
+    Busca los winningPlan de un resultado de explain().
+
+    Nota:
+        find() los devuelve en queryPlanner; aggregate() en queryPlanner si
+        el pipeline se resolvió entero en el motor de consultas, o dentro de
+        la etapa $cursor de "stages" si no (uno por shard en clusters).
+    """
+    planes = []
+    if isinstance(explain, dict):
+        for clave, valor in explain.items():
+            if clave == "winningPlan":
+                planes.append(valor)
+            else:
+                planes.extend(_planes_ganadores(valor))
+    elif isinstance(explain, list):
+        for valor in explain:
+            planes.extend(_planes_ganadores(valor))
+    return planes
+
+
+def _sort_en_pipeline(explain) -> bool:
+    """True si explain() de una agregación deja un $sort como etapa propia (en memoria)."""
+    if isinstance(explain, dict):
+        etapas = explain.get("stages")
+        if isinstance(etapas, list) and any("$sort" in etapa for etapa in etapas):
+            return True
+        return any(_sort_en_pipeline(valor) for valor in explain.values())
+    if isinstance(explain, list):
+        return any(_sort_en_pipeline(valor) for valor in explain)
+    return False
+
+
+def _sin_escrituras(pipeline: list[dict]) -> list[dict]:
+    """Quita las etapas $merge/$out: explain() solo debe planificar la lectura."""
+    return [etapa for etapa in pipeline if not any(clave in etapa for clave in ETAPAS_ESCRITURA)]
+
+
+def _con_lookups(consultas: dict) -> dict:
+    """
+    Añade como consultas propias los sub-pipelines de cada $lookup.
+
+    Nota:
+        explain() de la agregación principal no incluye el plan de las
+        colecciones del $lookup; cada sub-pipeline se explica sobre su "from".
+    """
+    expandidas = {}
+    for descripcion, consulta in consultas.items():
+        expandidas[descripcion] = consulta
+        if not isinstance(consulta, Agregacion):
+            continue
+        for etapa in consulta.pipeline:
+            lookup = etapa.get("$lookup")
+            if lookup and "pipeline" in lookup:
+                expandidas[f"{descripcion} $lookup {lookup['from']}"] = Agregacion(
+                    consulta.coleccion.database[lookup["from"]], lookup["pipeline"]
+                )
+    return expandidas
+
+
+def _explicar(consulta) -> dict:
+    """Ejecuta explain() de un cursor o de una Agregacion."""
+    if isinstance(consulta, Agregacion):
+        return consulta.coleccion.database.command(
+            "aggregate",
+            consulta.coleccion.name,
+            pipeline=_sin_escrituras(consulta.pipeline),
+            explain=True
+        )
+    return consulta.explain()
+
+
+def verificar_planes() -> dict[str, set[str]]:
+    """
+    Ejecuta explain() sobre cada query y agregación de los repositories.
+    
+    Returns:
+        Diccionario {query: etapas prohibidas} solo con las queries que
+        hacen COLLSCAN o SORT en memoria. Vacío si todas usan índices.
+    """
+    problemas = {}
+    for descripcion, consulta in _con_lookups(_consultas_repositories()).items():
+        explain = _explicar(consulta)
+        etapas = set()
+        for plan in _planes_ganadores(explain):
+            etapas |= _etapas_del_plan(plan) & ETAPAS_PROHIBIDAS
+        if _sort_en_pipeline(explain):
+            etapas.add("SORT")
+        if etapas:
+            problemas[descripcion] = etapas
+    return problemas
+
+
+if __name__ == "__main__":
+    for nombre in asegurar_indices():
+        print(f"✅ Índice asegurado: {nombre}")
+    
+    if "--verificar" in sys.argv[1:]:
+        problemas = verificar_planes()
+        for descripcion, etapas in problemas.items():
+            print(f"❌ {descripcion}: {', '.join(sorted(etapas))}")
+        if problemas:
+            sys.exit(1)
+        print("✅ Todas las queries usan índices")
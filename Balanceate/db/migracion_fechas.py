@@ -0,0 +1,111 @@
+"""
+Migración de movimientos.fecha de ISO string a datetime (BSON Date).
+
+Convierte por lotes y por usuario, de lo más reciente a lo más antiguo. Ese
+orden mantiene el invariante del que dependen las lecturas durante la
+transición: todo movimiento con fecha datetime es más reciente que cualquiera
+con fecha string (ver query_pagina en movimiento_repository).
+
+Es reanudable: cada lote consulta los documentos que aún tienen fecha string,
+así que se puede interrumpir y volver a lanzar sin llevar estado. Tras cada
+lote se invalida la caché del usuario, para que ninguna primera página
+cacheada siga sirviendo fechas string (y cursores string) ya migradas.
+
+Una importación de extractos inserta fechas datetime antiguas, lo que
+rompería el invariante; por eso migra antes las fechas del usuario
+(migrar_fechas_usuario, que no hace nada si ya no quedan strings).
+
+Uso:
+    python -m Balanceate.db.migracion_fechas [tamaño_lote]
+"""
+import logging
+import sys
+from datetime import datetime
+from pymongo import UpdateOne
+from . import cache
+from .db import movimientos_collection
+
+logger = logging.getLogger(__name__)
+
+
+def migrar_fechas_usuario(usuario_id: str, lote: int = 500) -> tuple[int, int]:
+    """
+    Migra las fechas string de un usuario a datetime.
+    
+    Args:
+        usuario_id: ID del usuario
+        lote: Número de documentos por bulk_write
+        
+    Returns:
+        Tupla (migrados, invalidos). Los documentos con fecha no parseable
+        se dejan como están y se reportan como inválidos.
+    """
+    migrados = 0
+    invalidos = []
+    
+    while True:
+        filtro = {"usuario_id": usuario_id, "fecha": {"$type": "string"}}
+        if invalidos:
+            filtro["_id"] = {"$nin": invalidos}
+        
+        docs = list(
+            movimientos_collection
+            .find(filtro, {"fecha": 1})
+            .sort([("fecha", -1), ("_id", -1)])
+            .limit(lote)
+        )
+        if not docs:
+            break
+        
+        operaciones = []
+        for doc in docs:
+            try:
+                fecha = datetime.fromisoformat(doc["fecha"])
+            except (ValueError, TypeError):
+                invalidos.append(doc["_id"])
+                continue
+            # El filtro incluye la fecha original: si otro proceso la cambió, no se pisa
+            operaciones.append(
+                UpdateOne(
+                    {"_id": doc["_id"], "fecha": doc["fecha"]},
+                    {"$set": {"fecha": fecha}}
+                )
+            )
+        
+        if operaciones:
+            resultado = movimientos_collection.bulk_write(operaciones, ordered=False)
+            migrados += resultado.modified_count
+            cache.invalidar_usuario(usuario_id)
+    
+    return migrados, len(invalidos)
+
+
+def migrar_fechas(lote: int = 500) -> tuple[int, int]:
+    """
+    Migra las fechas string de todos los usuarios.
+    
+    Args:
+        lote: Número de documentos por bulk_write
+        
+    Returns:
+        Tupla (migrados, invalidos) acumulada de todos los usuarios
+    """
+    total_migrados = 0
+    total_invalidos = 0
+    
+    for usuario_id in movimientos_collection.distinct("usuario_id", {"fecha": {"$type": "string"}}):
+        migrados, invalidos = migrar_fechas_usuario(usuario_id, lote)
+        total_migrados += migrados
+        total_invalidos += invalidos
+        logger.info("Fechas de %s: %d migradas, %d inválidas", usuario_id, migrados, invalidos)
+    
+    return total_migrados, total_invalidos
+
+
+if __name__ == "__main__":
+    from ..logs import configurar_logging
+    configurar_logging(formato="texto", asincrono=False)
+    
+    tamano_lote = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    migrados, invalidos = migrar_fechas(tamano_lote)
+    print(f"✅ Migración completada: {migrados} migrados, {invalidos} inválidos")
@@ -8,9 +8,195 @@ de la implementación específica de la base de datos.
 """
 from datetime import datetime
 from bson import ObjectId
-from .db import movimientos_collection
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError
+from . import cache
+from .consultas import Consulta
+from .db import movimientos_collection, movimientos_collection_async
+from .balance_repository import BalanceRepository, BalanceRepositoryAsync
+from .resumen_repository import ResumenRepository, ResumenRepositoryAsync
+from .calendario_repository import CalendarioRepository, CalendarioRepositoryAsync
+from ..services.balance_service import calcular_aporte_movimiento
+from ..services.metricas_service import medir_repository
+
+
+# Campos que afectan al balance (reconciliación del ledger)
+PROYECCION_BALANCE = {"tipo": 1, "valor": 1, "monto_total": 1}
+
+# Campos que muestra el feed de movimientos. Las lecturas del feed solo piden
+# estos campos para no transferir ni decodificar datos que la UI descarta.
+PROYECCION_FEED = {
+    "tipo": 1,
+    "nombre": 1,
+    "fecha": 1,
+    "valor": 1,
+    "monto_total": 1,
+    "mensualidad": 1,
+    "plazo": 1,
+}
+
+# Orden del feed: fecha descendente, _id desempata
+ORDEN_FEED = [("fecha", -1), ("_id", -1)]
+
+# Orden cronológico de los recorridos completos (reconciliación, exportación)
+ORDEN_HISTORIAL = [("fecha", 1), ("_id", 1)]
+
+
+def query_pagina(usuario_id: str, cursor_fecha: datetime | str, cursor_id: str) -> dict | None:
+    """
+    Construye el filtro keyset de una página del feed.
+    Retorna None si el cursor no es válido.
+
+    Compatibilidad durante la migración de fecha (ISO string -> datetime):
+    MongoDB ordena los Date por encima de los string y la migración avanza de
+    lo más nuevo a lo más antiguo, así que todo documento con fecha datetime
+    es más reciente que cualquiera con fecha string. Con un cursor datetime
+    la página continúa por los datetime anteriores y luego por los string.
+    La importación de extractos, que inserta datetime antiguos, migra antes
+    las fechas del usuario para no romper ese invariante.
+    """
+    query = {"usuario_id": usuario_id}
+    if cursor_fecha and cursor_id:
+        try:
+            ultimo_id = ObjectId(cursor_id)
+        except:
+            return None
+        # Cada rama acota el escaneo del índice; la segunda desempata por _id
+        ramas = [
+            {"usuario_id": usuario_id, "fecha": {"$lt": cursor_fecha}},
+            {"usuario_id": usuario_id, "fecha": cursor_fecha, "_id": {"$lt": ultimo_id}},
+        ]
+        if isinstance(cursor_fecha, datetime):
+            ramas.append({"usuario_id": usuario_id, "fecha": {"$type": "string"}})
+        query = {"$or": ramas}
+    return query
+
+
+def query_rango(
+    usuario_id: str,
+    fecha_inicio: datetime | str | None,
+    fecha_fin: datetime | str | None
+) -> dict:
+    """
+    Construye el filtro de un rango de fechas que cubre ambos formatos
+    de almacenamiento (datetime y el ISO string anterior a la migración).
+
+    Cualquiera de los dos extremos puede omitirse (rango abierto), pero no
+    ambos. Cada rama solo compara valores de su tipo, así que un rango
+    abierto tampoco mezcla fechas datetime con strings.
+    """
+    ramas = []
+    for convertir in (_como_datetime, _como_iso):
+        condicion = {}
+        if fecha_inicio:
+            condicion["$gte"] = convertir(fecha_inicio)
+        if fecha_fin:
+            condicion["$lte"] = convertir(fecha_fin)
+        ramas.append({"usuario_id": usuario_id, "fecha": condicion})
+    return {"$or": ramas}
+
+
+def query_exportacion(
+    usuario_id: str,
+    fecha_inicio: datetime | str | None,
+    fecha_fin: datetime | str | None
+) -> dict:
+    """Filtro de exportación: todo el historial o un rango de fechas, abierto o cerrado."""
+    if fecha_inicio or fecha_fin:
+        return query_rango(usuario_id, fecha_inicio, fecha_fin)
+    return {"usuario_id": usuario_id}
+
+
+def consulta_movimientos(usuario_id: str, limit: int) -> Consulta:
+    """Últimos movimientos de un usuario por fecha descendente."""
+    return Consulta({"usuario_id": usuario_id}, PROYECCION_FEED, [("fecha", -1)], limit)
+
+
+def consulta_pagina(
+    usuario_id: str,
+    limit: int,
+    cursor_fecha: datetime | str,
+    cursor_id: str
+) -> Consulta | None:
+    """Página keyset del feed (ver query_pagina); None si el cursor no es válido."""
+    query = query_pagina(usuario_id, cursor_fecha, cursor_id)
+    if query is None:
+        return None
+    return Consulta(query, PROYECCION_FEED, ORDEN_FEED, limit)
+
+
+def consulta_rango(
+    usuario_id: str,
+    fecha_inicio: datetime | str,
+    fecha_fin: datetime | str,
+    limit: int
+) -> Consulta:
+    """Movimientos de un rango de fechas por fecha descendente."""
+    return Consulta(query_rango(usuario_id, fecha_inicio, fecha_fin), PROYECCION_FEED, [("fecha", -1)], limit)
+
+
+def consulta_historial(usuario_id: str) -> Consulta:
+    """Historial completo en orden cronológico con los campos del balance."""
+    return Consulta({"usuario_id": usuario_id}, PROYECCION_BALANCE, ORDEN_HISTORIAL)
+
+
+def consulta_exportacion(
+    usuario_id: str,
+    fecha_inicio: datetime | str | None,
+    fecha_fin: datetime | str | None
+) -> Consulta:
+    """Historial (o rango) a exportar en orden cronológico."""
+    return Consulta(query_exportacion(usuario_id, fecha_inicio, fecha_fin), PROYECCION_FEED, ORDEN_HISTORIAL)
+
+
+def consulta_movimiento_por_id(movimiento_id: str) -> Consulta:
+    """Un movimiento por _id. Lanza InvalidId si el ID no es válido."""
+    return Consulta({"_id": ObjectId(movimiento_id)}, limite=1)
+
+
+def consulta_conteo(usuario_id: str) -> Consulta:
+    """Todos los movimientos de un usuario (para count_documents)."""
+    return Consulta({"usuario_id": usuario_id})
+
 
+def _como_datetime(fecha: datetime | str) -> datetime:
+    """Normaliza una fecha (datetime o ISO string) a datetime."""
+    return fecha if isinstance(fecha, datetime) else datetime.fromisoformat(fecha)
 
+
+def _como_iso(fecha: datetime | str) -> str:
+    """Normaliza una fecha (datetime o ISO string) a ISO string."""
+    return fecha.isoformat() if isinstance(fecha, datetime) else fecha
+
+
+def _insertados_del_lote(documentos: list[dict], error: BulkWriteError | None) -> list[dict]:
+    """
+    Devuelve los documentos que insert_many(ordered=False) sí insertó.
+    Con ordered=False MongoDB continúa tras un error y reporta los índices fallidos.
+    """
+    if error is None:
+        return documentos
+    fallidos = {e["index"] for e in error.details.get("writeErrors", [])}
+    return [doc for i, doc in enumerate(documentos) if i not in fallidos]
+
+
+def _delta_del_lote(insertados: list[dict]) -> dict:
+    """Suma el aporte al ledger de un lote de movimientos insertados."""
+    delta_disponible = 0.0
+    delta_deudas = 0.0
+    for doc in insertados:
+        disponible, deudas = calcular_aporte_movimiento(doc)
+        delta_disponible += disponible
+        delta_deudas += deudas
+    return {
+        "delta_disponible": delta_disponible,
+        "delta_deudas": delta_deudas,
+        "delta_movimientos": len(insertados),
+        "ultimo_movimiento_id": str(insertados[-1]["_id"]) if insertados else "",
+    }
+
+
+@medir_repository
 class MovimientoRepository:
     """
     Repository para gestionar operaciones de movimientos en MongoDB.
@@ -33,6 +219,13 @@ class MovimientoRepository:
         Returns:
             ID del movimiento creado como string
 
+        Nota:
+            Tras insertar, aplica el aporte del movimiento al ledger de
+            balance del usuario (BalanceRepository.aplicar_movimiento) y al
+            resumen de su mes (ResumenRepository.aplicar_movimiento). Las
+            deudas guardan además su calendario de pagos
+            (CalendarioRepository.crear_calendario).
+
         Uso común:
             - Agregar nuevos ingresos, gastos o deudas
         """
@@ -44,7 +237,55 @@ class MovimientoRepository:
             raise ValueError("El movimiento debe tener un usuario_id")
 
         result = movimientos_collection.insert_one(movimiento_data)
-        return str(result.inserted_id)
+        movimiento_id = str(result.inserted_id)
+
+        BalanceRepository.aplicar_movimiento(
+            movimiento_data["usuario_id"],
+            movimiento_data,
+            movimiento_id=movimiento_id
+        )
+        ResumenRepository.aplicar_movimiento(movimiento_data)
+        CalendarioRepository.crear_calendario(movimiento_data)
+        cache.invalidar_usuario(movimiento_data["usuario_id"])
+        return movimiento_id
+
+    @staticmethod
+    def crear_movimientos_lote(movimientos: list[dict]) -> int:
+        """
+        Inserta un lote de movimientos de un mismo usuario.
+
+        Args:
+            movimientos: Documentos ya validados (todos con el mismo usuario_id)
+
+        Returns:
+            Número de movimientos insertados
+
+        Nota:
+            Usa insert_many(ordered=False): un documento fallido no detiene al
+            resto. El ledger de balance se actualiza con un único $inc por
+            lote y los resúmenes mensuales con un bulk_write por lote.
+
+        Uso común:
+            - Importación masiva de extractos bancarios (CSV/OFX)
+        """
+        if not movimientos:
+            return 0
+
+        error = None
+        try:
+            movimientos_collection.insert_many(movimientos, ordered=False)
+        except BulkWriteError as e:
+            error = e
+
+        insertados = _insertados_del_lote(movimientos, error)
+        if insertados:
+            BalanceRepository.aplicar_delta(
+                insertados[0]["usuario_id"], **_delta_del_lote(insertados)
+            )
+            ResumenRepository.aplicar_lote(insertados)
+            CalendarioRepository.crear_calendarios_lote(insertados)
+            cache.invalidar_usuario(insertados[0]["usuario_id"])
+        return len(insertados)
 
     @staticmethod
     def buscar_movimientos_por_usuario(usuario_id: str, limit: int = 100) -> list[dict]:
@@ -56,7 +297,11 @@ class MovimientoRepository:
             limit: Número máximo de movimientos a retornar (default: 100)
 
         Returns:
-            Lista de documentos de movimientos
+            Lista de documentos de movimientos (solo campos de PROYECCION_FEED)
+
+        Nota:
+            Lectura read-through: se sirve desde la caché de Redis si está
+            (ver db/cache.py); cualquier escritura de movimientos la invalida.
 
         Uso común:
             - Cargar movimientos para mostrar en la interfaz
@@ -64,11 +309,107 @@ class MovimientoRepository:
         if not usuario_id:
             return []
 
-        return list(
-            movimientos_collection
-            .find({"usuario_id": usuario_id})
-            .sort("fecha", -1)
-            .limit(limit)
+        campo = cache.CAMPO_LISTA.format(limit=limit)
+        movimientos, generacion = cache.leer(usuario_id, campo)
+        if movimientos is None:
+            movimientos = list(consulta_movimientos(usuario_id, limit).cursor(movimientos_collection))
+            cache.guardar(usuario_id, campo, movimientos, generacion)
+        return movimientos
+
+    @staticmethod
+    def buscar_pagina_movimientos_por_usuario(
+        usuario_id: str,
+        limit: int = 50,
+        cursor_fecha: datetime | str = "",
+        cursor_id: str = ""
+    ) -> list[dict]:
+        """
+        Busca una página de movimientos de un usuario usando paginación keyset.
+
+        Args:
+            usuario_id: ID del usuario
+            limit: Tamaño de la página
+            cursor_fecha: fecha (datetime o ISO string) del último movimiento
+                de la página anterior
+            cursor_id: _id (string) del último movimiento de la página anterior
+
+        Returns:
+            Lista de documentos ordenados por (fecha, _id) descendente,
+            posteriores al cursor si se indica uno (solo campos de PROYECCION_FEED)
+
+        Nota:
+            En lugar de skip() busca directamente a partir del cursor
+            (fecha, _id), por lo que el costo de cada página no crece con la
+            profundidad del historial. Usa el índice usuario_fecha.
+            La primera página (sin cursor) pasa por la caché de Redis.
+
+        Uso común:
+            - Primera página del feed (sin cursor) y scroll infinito (con cursor)
+        """
+        if not usuario_id:
+            return []
+
+        consulta = consulta_pagina(usuario_id, limit, cursor_fecha, cursor_id)
+        if consulta is None:
+            return []
+
+        primera_pagina = not cursor_fecha and not cursor_id
+        campo = cache.CAMPO_PAGINA.format(limit=limit)
+        generacion = None
+        if primera_pagina:
+            pagina, generacion = cache.leer(usuario_id, campo)
+            if pagina is not None:
+                return pagina
+
+        pagina = list(consulta.cursor(movimientos_collection))
+        if primera_pagina:
+            cache.guardar(usuario_id, campo, pagina, generacion)
+        return pagina
+
+    @staticmethod
+    def iterar_movimientos_por_usuario(usuario_id: str):
+        """
+        Recorre todo el historial de movimientos de un usuario.
+
+        Args:
+            usuario_id: ID del usuario
+
+        Returns:
+            Cursor de MongoDB ordenado cronológicamente (fecha, _id ascendente),
+            con solo los campos que afectan al balance
+
+        Uso común:
+            - Reconciliar el ledger de balance sin cargar el historial en memoria
+        """
+        return consulta_historial(usuario_id).cursor(movimientos_collection)
+
+    @staticmethod
+    def iterar_movimientos_exportacion(
+        usuario_id: str,
+        fecha_inicio: datetime | str | None = None,
+        fecha_fin: datetime | str | None = None,
+        tamano_lote: int = 1000
+    ):
+        """
+        Recorre el historial de un usuario para exportarlo.
+
+        Args:
+            usuario_id: ID del usuario
+            fecha_inicio: Fecha de inicio opcional (datetime o ISO)
+            fecha_fin: Fecha de fin opcional (datetime o ISO)
+            tamano_lote: Documentos por lote pedido al servidor
+
+        Returns:
+            Cursor de MongoDB en orden cronológico con los campos de PROYECCION_FEED
+
+        Nota:
+            El cursor vive en el servidor y se lee de tamano_lote en tamano_lote,
+            así que la memoria usada no depende del tamaño del historial.
+        """
+        return (
+            consulta_exportacion(usuario_id, fecha_inicio, fecha_fin)
+            .cursor(movimientos_collection)
+            .batch_size(tamano_lote)
         )
 
     @staticmethod
@@ -86,7 +427,7 @@ class MovimientoRepository:
             return None
 
         try:
-            return movimientos_collection.find_one({"_id": ObjectId(movimiento_id)})
+            return movimientos_collection.find_one(consulta_movimiento_por_id(movimiento_id).filtro)
         except:
             return None
 
@@ -101,19 +442,45 @@ class MovimientoRepository:
 
         Returns:
             True si se actualizó, False si no se encontró
+
+        Nota:
+            Si cambia el aporte del movimiento al balance, el ledger del
+            usuario se ajusta con la diferencia entre el documento anterior
+            y el nuevo.
         """
         if not movimiento_id or not datos_actualizacion:
             return False
 
         try:
-            result = movimientos_collection.update_one(
+            anterior = movimientos_collection.find_one_and_update(
                 {"_id": ObjectId(movimiento_id)},
-                {"$set": datos_actualizacion}
+                {"$set": datos_actualizacion},
+                return_document=ReturnDocument.BEFORE
             )
-            return result.modified_count > 0
         except:
             return False
 
+        if not anterior:
+            return False
+
+        actualizado = {**anterior, **datos_actualizacion}
+        if actualizado == anterior:
+            return False
+
+        # Si cambia usuario_id, el aporte sale del ledger anterior y entra en el nuevo
+        usuario_anterior = anterior.get("usuario_id", "")
+        usuario_nuevo = actualizado.get("usuario_id", "")
+        BalanceRepository.aplicar_movimiento(usuario_anterior, anterior, signo=-1)
+        BalanceRepository.aplicar_movimiento(usuario_nuevo, actualizado)
+        ResumenRepository.aplicar_movimiento(anterior, signo=-1)
+        ResumenRepository.aplicar_movimiento(actualizado)
+        if "deuda" in (anterior.get("tipo"), actualizado.get("tipo")):
+            CalendarioRepository.regenerar_calendario(actualizado)
+        cache.invalidar_usuario(usuario_anterior)
+        if usuario_nuevo != usuario_anterior:
+            cache.invalidar_usuario(usuario_nuevo)
+        return True
+
     @staticmethod
     def eliminar_movimiento_por_id(movimiento_id: str) -> bool:
         """
@@ -124,21 +491,39 @@ class MovimientoRepository:
 
         Returns:
             True si se eliminó, False si no se encontró
+
+        Nota:
+            El aporte del movimiento eliminado se revierte en el ledger y en
+            el resumen de su mes.
+            ultimo_movimiento_id no se retrocede; la reconciliación lo corrige.
         """
         if not movimiento_id:
             return False
 
         try:
-            result = movimientos_collection.delete_one({"_id": ObjectId(movimiento_id)})
-            return result.deleted_count > 0
+            eliminado = movimientos_collection.find_one_and_delete(
+                {"_id": ObjectId(movimiento_id)}
+            )
         except:
             return False
 
+        if not eliminado:
+            return False
+
+        BalanceRepository.aplicar_movimiento(
+            eliminado.get("usuario_id", ""), eliminado, signo=-1
+        )
+        ResumenRepository.aplicar_movimiento(eliminado, signo=-1)
+        if eliminado.get("tipo") == "deuda":
+            CalendarioRepository.eliminar_calendario(str(eliminado["_id"]))
+        cache.invalidar_usuario(eliminado.get("usuario_id", ""))
+        return True
+
     @staticmethod
     def buscar_movimientos_por_rango_fechas(
         usuario_id: str,
-        fecha_inicio: str,
-        fecha_fin: str,
+        fecha_inicio: datetime | str,
+        fecha_fin: datetime | str,
         limit: int = 1000
     ) -> list[dict]:
         """
@@ -146,30 +531,19 @@ class MovimientoRepository:
 
         Args:
             usuario_id: ID del usuario
-            fecha_inicio: Fecha de inicio en formato ISO (YYYY-MM-DDTHH:MM:SS)
-            fecha_fin: Fecha de fin en formato ISO (YYYY-MM-DDTHH:MM:SS)
+            fecha_inicio: Fecha de inicio (datetime o ISO YYYY-MM-DDTHH:MM:SS)
+            fecha_fin: Fecha de fin (datetime o ISO YYYY-MM-DDTHH:MM:SS)
             limit: Número máximo de resultados
 
         Returns:
-            Lista de documentos de movimientos en el rango
+            Lista de documentos de movimientos en el rango (solo campos de PROYECCION_FEED)
         """
         if not usuario_id or not fecha_inicio or not fecha_fin:
             return []
 
         try:
-            query = {
-                "usuario_id": usuario_id,
-                "fecha": {
-                    "$gte": fecha_inicio,
-                    "$lte": fecha_fin
-                }
-            }
-            return list(
-                movimientos_collection
-                .find(query)
-                .sort("fecha", -1)
-                .limit(limit)
-            )
+            consulta = consulta_rango(usuario_id, fecha_inicio, fecha_fin, limit)
+            return list(consulta.cursor(movimientos_collection))
         except:
             return []
 
@@ -187,4 +561,216 @@ class MovimientoRepository:
         if not usuario_id:
             return 0
 
-        return movimientos_collection.count_documents({"usuario_id": usuario_id})
\ No newline at end of file
+        return movimientos_collection.count_documents(consulta_conteo(usuario_id).filtro)
+
+
+@medir_repository
+class MovimientoRepositoryAsync:
+    """
+    Versión async de MovimientoRepository.
+
+    Mismos métodos y semántica (incluido el mantenimiento del ledger de
+    balance), pero cada operación es awaitable y usa el cliente async.
+    """
+
+    @staticmethod
+    async def crear_movimiento(movimiento_data: dict) -> str:
+        """Crea un nuevo movimiento y aplica su aporte al ledger."""
+        if not movimiento_data:
+            raise ValueError("Los datos del movimiento no pueden estar vacíos")
+
+        if "usuario_id" not in movimiento_data:
+            raise ValueError("El movimiento debe tener un usuario_id")
+
+        result = await movimientos_collection_async.insert_one(movimiento_data)
+        movimiento_id = str(result.inserted_id)
+
+        await BalanceRepositoryAsync.aplicar_movimiento(
+            movimiento_data["usuario_id"],
+            movimiento_data,
+            movimiento_id=movimiento_id
+        )
+        await ResumenRepositoryAsync.aplicar_movimiento(movimiento_data)
+        await CalendarioRepositoryAsync.crear_calendario(movimiento_data)
+        await cache.invalidar_usuario_async(movimiento_data["usuario_id"])
+        return movimiento_id
+
+    @staticmethod
+    async def crear_movimientos_lote(movimientos: list[dict]) -> int:
+        """Inserta un lote de movimientos y actualiza ledger y resúmenes una vez."""
+        if not movimientos:
+            return 0
+
+        error = None
+        try:
+            await movimientos_collection_async.insert_many(movimientos, ordered=False)
+        except BulkWriteError as e:
+            error = e
+
+        insertados = _insertados_del_lote(movimientos, error)
+        if insertados:
+            await BalanceRepositoryAsync.aplicar_delta(
+                insertados[0]["usuario_id"], **_delta_del_lote(insertados)
+            )
+            await ResumenRepositoryAsync.aplicar_lote(insertados)
+            await CalendarioRepositoryAsync.crear_calendarios_lote(insertados)
+            await cache.invalidar_usuario_async(insertados[0]["usuario_id"])
+        return len(insertados)
+
+    @staticmethod
+    async def buscar_movimientos_por_usuario(usuario_id: str, limit: int = 100) -> list[dict]:
+        """Busca los movimientos de un usuario, ordenados por fecha descendente."""
+        if not usuario_id:
+            return []
+
+        campo = cache.CAMPO_LISTA.format(limit=limit)
+        movimientos, generacion = await cache.leer_async(usuario_id, campo)
+        if movimientos is None:
+            movimientos = await (
+                consulta_movimientos(usuario_id, limit).cursor(movimientos_collection_async).to_list()
+            )
+            await cache.guardar_async(usuario_id, campo, movimientos, generacion)
+        return movimientos
+
+    @staticmethod
+    async def buscar_pagina_movimientos_por_usuario(
+        usuario_id: str,
+        limit: int = 50,
+        cursor_fecha: datetime | str = "",
+        cursor_id: str = ""
+    ) -> list[dict]:
+        """Busca una página de movimientos de un usuario usando paginación keyset."""
+        if not usuario_id:
+            return []
+
+        consulta = consulta_pagina(usuario_id, limit, cursor_fecha, cursor_id)
+        if consulta is None:
+            return []
+
+        primera_pagina = not cursor_fecha and not cursor_id
+        campo = cache.CAMPO_PAGINA.format(limit=limit)
+        generacion = None
+        if primera_pagina:
+            pagina, generacion = await cache.leer_async(usuario_id, campo)
+            if pagina is not None:
+                return pagina
+
+        pagina = await consulta.cursor(movimientos_collection_async).to_list()
+        if primera_pagina:
+            await cache.guardar_async(usuario_id, campo, pagina, generacion)
+        return pagina
+
+    @staticmethod
+    def iterar_movimientos_por_usuario(usuario_id: str):
+        """Recorre todo el historial de un usuario (cursor async, usar async for)."""
+        return consulta_historial(usuario_id).cursor(movimientos_collection_async)
+
+    @staticmethod
+    def iterar_movimientos_exportacion(
+        usuario_id: str,
+        fecha_inicio: datetime | str | None = None,
+        fecha_fin: datetime | str | None = None,
+        tamano_lote: int = 1000
+    ):
+        """Recorre el historial de un usuario para exportarlo (cursor async, usar async for)."""
+        return (
+            consulta_exportacion(usuario_id, fecha_inicio, fecha_fin)
+            .cursor(movimientos_collection_async)
+            .batch_size(tamano_lote)
+        )
+
+    @staticmethod
+    async def buscar_movimiento_por_id(movimiento_id: str) -> dict | None:
+        """Busca un movimiento específico por su ID."""
+        if not movimiento_id:
+            return None
+
+        try:
+            return await movimientos_collection_async.find_one(consulta_movimiento_por_id(movimiento_id).filtro)
+        except:
+            return None
+
+    @staticmethod
+    async def actualizar_movimiento(movimiento_id: str, datos_actualizacion: dict) -> bool:
+        """Actualiza un movimiento y ajusta el ledger con la diferencia."""
+        if not movimiento_id or not datos_actualizacion:
+            return False
+
+        try:
+            anterior = await movimientos_collection_async.find_one_and_update(
+                {"_id": ObjectId(movimiento_id)},
+                {"$set": datos_actualizacion},
+                return_document=ReturnDocument.BEFORE
+            )
+        except:
+            return False
+
+        if not anterior:
+            return False
+
+        actualizado = {**anterior, **datos_actualizacion}
+        if actualizado == anterior:
+            return False
+
+        usuario_anterior = anterior.get("usuario_id", "")
+        usuario_nuevo = actualizado.get("usuario_id", "")
+        await BalanceRepositoryAsync.aplicar_movimiento(usuario_anterior, anterior, signo=-1)
+        await BalanceRepositoryAsync.aplicar_movimiento(usuario_nuevo, actualizado)
+        await ResumenRepositoryAsync.aplicar_movimiento(anterior, signo=-1)
+        await ResumenRepositoryAsync.aplicar_movimiento(actualizado)
+        if "deuda" in (anterior.get("tipo"), actualizado.get("tipo")):
+            await CalendarioRepositoryAsync.regenerar_calendario(actualizado)
+        await cache.invalidar_usuario_async(usuario_anterior)
+        if usuario_nuevo != usuario_anterior:
+            await cache.invalidar_usuario_async(usuario_nuevo)
+        return True
+
+    @staticmethod
+    async def eliminar_movimiento_por_id(movimiento_id: str) -> bool:
+        """Elimina un movimiento y revierte su aporte en el ledger."""
+        if not movimiento_id:
+            return False
+
+        try:
+            eliminado = await movimientos_collection_async.find_one_and_delete(
+                {"_id": ObjectId(movimiento_id)}
+            )
+        except:
+            return False
+
+        if not eliminado:
+            return False
+
+        await BalanceRepositoryAsync.aplicar_movimiento(
+            eliminado.get("usuario_id", ""), eliminado, signo=-1
+        )
+        await ResumenRepositoryAsync.aplicar_movimiento(eliminado, signo=-1)
+        if eliminado.get("tipo") == "deuda":
+            await CalendarioRepositoryAsync.eliminar_calendario(str(eliminado["_id"]))
+        await cache.invalidar_usuario_async(eliminado.get("usuario_id", ""))
+        return True
+
+    @staticmethod
+    async def buscar_movimientos_por_rango_fechas(
+        usuario_id: str,
+        fecha_inicio: datetime | str,
+        fecha_fin: datetime | str,
+        limit: int = 1000
+    ) -> list[dict]:
+        """Busca movimientos de un usuario dentro de un rango de fechas."""
+        if not usuario_id or not fecha_inicio or not fecha_fin:
+            return []
+
+        try:
+            consulta = consulta_rango(usuario_id, fecha_inicio, fecha_fin, limit)
+            return await consulta.cursor(movimientos_collection_async).to_list()
+        except:
+            return []
+
+    @staticmethod
+    async def contar_movimientos_por_usuario(usuario_id: str) -> int:
+        """Cuenta el total de movimientos de un usuario."""
+        if not usuario_id:
+            return 0
+
+        return await movimientos_collection_async.count_documents(consulta_conteo(usuario_id).filtro)
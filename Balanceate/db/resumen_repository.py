@@ -0,0 +1,280 @@
+"""
+Repository para los resúmenes mensuales por usuario.
+Encapsula el acceso a la colección resumenes_mensuales.
+
+Cada documento acumula, para un usuario y un mes (YYYY-MM), los ingresos,
+gastos y deudas nuevas de ese mes. Se mantiene con $inc en cada alta o baja
+de movimientos y se puede reconstruir con una agregación $group sobre
+movimientos, de modo que un dashboard de años de historial es una lectura
+pequeña sobre esta colección.
+"""
+from datetime import datetime
+from bson import ObjectId
+from pymongo import UpdateOne
+from .consultas import Consulta
+from .db import (
+    movimientos_collection,
+    resumenes_collection,
+    resumenes_collection_async,
+    resumenes_collection_reportes,
+    resumenes_collection_reportes_async,
+)
+from ..services.lote_movimientos import LoteMovimientos
+from ..services.resumen_service import calcular_aporte_resumen, calcular_resumenes_lote, clave_mes
+from ..services.metricas_service import medir_repository
+
+
+def _update_resumen(movimiento: dict, signo: int) -> tuple[dict, dict] | None:
+    """
+    Construye el filtro y el update $inc que aplica un movimiento a su mes.
+    Retorna None si el movimiento no aporta nada.
+    """
+    mes = clave_mes(movimiento.get("fecha"))
+    aporte = calcular_aporte_resumen(movimiento)
+    if not mes or not aporte or not movimiento.get("usuario_id"):
+        return None
+
+    filtro = {"usuario_id": movimiento["usuario_id"], "mes": mes}
+    update = {
+        "$inc": {campo: signo * valor for campo, valor in aporte.items()},
+        "$set": {"ultima_actualizacion": datetime.now().isoformat()},
+    }
+    return filtro, update
+
+
+def _updates_lote(movimientos: list[dict]) -> list[UpdateOne]:
+    """
+    Acumula en memoria el aporte de un lote de movimientos por mes y
+    construye un upsert $inc por cada (usuario, mes) afectado.
+    """
+    docs_por_usuario: dict[str, list[dict]] = {}
+    for movimiento in movimientos:
+        if movimiento.get("usuario_id"):
+            docs_por_usuario.setdefault(movimiento["usuario_id"], []).append(movimiento)
+
+    ahora = datetime.now().isoformat()
+    updates = []
+    for usuario_id, docs in docs_por_usuario.items():
+        lote = LoteMovimientos.desde_documentos(docs)
+        for mes, incrementos in calcular_resumenes_lote(lote).items():
+            updates.append(UpdateOne(
+                {"usuario_id": usuario_id, "mes": mes},
+                {"$inc": incrementos, "$set": {"ultima_actualizacion": ahora}},
+                upsert=True
+            ))
+    return updates
+
+
+def consulta_resumenes(usuario_id: str, limit: int) -> Consulta:
+    """Resúmenes más recientes de un usuario (índice usuario_mes)."""
+    return Consulta({"usuario_id": usuario_id}, {"_id": 0}, [("mes", -1)], limit)
+
+
+def pipeline_resumenes(usuario_id: str, reconstruccion: str) -> list[dict]:
+    """
+    Agregación que recalcula todos los resúmenes mensuales de un usuario
+    y los escribe en resumenes_mensuales con $merge (requiere el índice
+    único resumenes_mensuales.usuario_mes).
+
+    El mes sigue la regla de resumen_service.clave_mes: los ISO string se
+    parsean ($dateFromString pasa los que tienen offset a UTC) y las
+    fechas inválidas no cuentan en ningún mes. Cada resumen escrito lleva
+    la marca reconstruccion para borrar después los meses que no salieron.
+    """
+    def suma_si(tipo: str, campo: str) -> dict:
+        monto = {"$convert": {"input": f"${campo}", "to": "double", "onError": 0, "onNull": 0}}
+        return {"$sum": {"$cond": [{"$eq": ["$tipo", tipo]}, monto, 0]}}
+
+    # Fechas datetime y ISO string (documentos sin migrar); el resto, null
+    fecha = {"$switch": {
+        "branches": [
+            {"case": {"$eq": [{"$type": "$fecha"}, "date"]}, "then": "$fecha"},
+            {"case": {"$eq": [{"$type": "$fecha"}, "string"]}, "then": {"$dateFromString": {
+                "dateString": "$fecha", "onError": None, "onNull": None,
+            }}},
+        ],
+        "default": None,
+    }}
+
+    return [
+        {"$match": {"usuario_id": usuario_id, "tipo": {"$in": ["ingreso", "gasto", "deuda"]}}},
+        {"$group": {
+            "_id": {"$dateToString": {"format": "%Y-%m", "date": fecha}},
+            "ingresos": suma_si("ingreso", "valor"),
+            "gastos": suma_si("gasto", "valor"),
+            "deudas": suma_si("deuda", "monto_total"),
+            "movimientos": {"$sum": 1},
+        }},
+        {"$match": {"_id": {"$ne": None}}},
+        {"$project": {
+            "_id": 0,
+            "usuario_id": {"$literal": usuario_id},
+            "mes": "$_id",
+            "ingresos": 1,
+            "gastos": 1,
+            "deudas": 1,
+            "movimientos": 1,
+            "ultima_actualizacion": {"$literal": datetime.now().isoformat()},
+            "reconstruccion": {"$literal": reconstruccion},
+        }},
+        {"$merge": {
+            "into": resumenes_collection.name,
+            "on": ["usuario_id", "mes"],
+            "whenMatched": "replace",
+            "whenNotMatched": "insert",
+        }},
+    ]
+
+
+@medir_repository
+class ResumenRepository:
+    """
+    Repository para gestionar los resúmenes mensuales en MongoDB.
+
+    Responsabilidades:
+        - Mantener incrementalmente el resumen del mes de cada movimiento
+        - Reconstruir los resúmenes de un usuario desde sus movimientos
+        - Leer los resúmenes para reportes
+    """
+
+    @staticmethod
+    def aplicar_movimiento(movimiento: dict, signo: int = 1) -> bool:
+        """
+        Aplica (o revierte) un movimiento en el resumen de su mes.
+
+        Args:
+            movimiento: Documento del movimiento
+            signo: 1 para sumar el movimiento, -1 para revertirlo
+
+        Returns:
+            True si se actualizó/creó el resumen, False si no aplica o hubo error
+        """
+        operacion = _update_resumen(movimiento, signo)
+        if not operacion:
+            return False
+
+        try:
+            result = resumenes_collection.update_one(*operacion, upsert=True)
+            return result.acknowledged
+        except:
+            return False
+
+    @staticmethod
+    def aplicar_lote(movimientos: list[dict]) -> bool:
+        """
+        Aplica un lote de movimientos nuevos a sus resúmenes mensuales.
+
+        Args:
+            movimientos: Documentos insertados (p. ej. una importación)
+
+        Returns:
+            True si se escribieron los resúmenes, False si no aplica o hubo error
+
+        Nota:
+            Un único bulk_write con un $inc por mes tocado, en lugar de una
+            escritura por movimiento.
+        """
+        operaciones = _updates_lote(movimientos)
+        if not operaciones:
+            return False
+
+        try:
+            return resumenes_collection.bulk_write(operaciones, ordered=False).acknowledged
+        except:
+            return False
+
+    @staticmethod
+    def recalcular_por_usuario(usuario_id: str) -> None:
+        """
+        Reconstruye todos los resúmenes mensuales de un usuario.
+
+        Args:
+            usuario_id: ID del usuario
+
+        Nota:
+            Recorre todo el historial del usuario en el servidor ($group +
+            $merge). $merge solo escribe los meses que aún tienen
+            movimientos, así que después se borran los meses que ya
+            existían y no salieron en esta reconstrucción (sin su marca).
+            Como en el calendario de deudas, primero se escribe y luego se
+            borra: los resúmenes nunca quedan vacíos a mitad de camino.
+            Pensado para reconciliación, no para el camino de cada request.
+        """
+        if not usuario_id:
+            return
+
+        meses_previos = resumenes_collection.distinct("mes", {"usuario_id": usuario_id})
+        reconstruccion = str(ObjectId())
+        movimientos_collection.aggregate(pipeline_resumenes(usuario_id, reconstruccion))
+        if meses_previos:
+            resumenes_collection.delete_many({
+                "usuario_id": usuario_id,
+                "mes": {"$in": meses_previos},
+                "reconstruccion": {"$ne": reconstruccion},
+            })
+
+    @staticmethod
+    def obtener_resumenes_por_usuario(usuario_id: str, limit: int = 24) -> list[dict]:
+        """
+        Obtiene los resúmenes mensuales más recientes de un usuario.
+
+        Args:
+            usuario_id: ID del usuario
+            limit: Número máximo de meses (default: 24)
+
+        Returns:
+            Lista de resúmenes ordenados por mes descendente
+
+        Nota:
+            Usa la preferencia de lectura de reportes
+            (MONGO_REPORTES_READ_PREFERENCE), por lo que puede leer de un
+            secundario con un pequeño retraso de replicación.
+        """
+        if not usuario_id:
+            return []
+
+        return list(consulta_resumenes(usuario_id, limit).cursor(resumenes_collection_reportes))
+
+
+@medir_repository
+class ResumenRepositoryAsync:
+    """
+    Versión async de ResumenRepository.
+
+    Mismos métodos y semántica, pero cada operación es awaitable y usa el
+    cliente async.
+    """
+
+    @staticmethod
+    async def aplicar_movimiento(movimiento: dict, signo: int = 1) -> bool:
+        """Aplica (o revierte) un movimiento en el resumen de su mes."""
+        operacion = _update_resumen(movimiento, signo)
+        if not operacion:
+            return False
+
+        try:
+            result = await resumenes_collection_async.update_one(*operacion, upsert=True)
+            return result.acknowledged
+        except:
+            return False
+
+    @staticmethod
+    async def aplicar_lote(movimientos: list[dict]) -> bool:
+        """Aplica un lote de movimientos nuevos a sus resúmenes mensuales."""
+        operaciones = _updates_lote(movimientos)
+        if not operaciones:
+            return False
+
+        try:
+            resultado = await resumenes_collection_async.bulk_write(operaciones, ordered=False)
+            return resultado.acknowledged
+        except:
+            return False
+
+    @staticmethod
+    async def obtener_resumenes_por_usuario(usuario_id: str, limit: int = 24) -> list[dict]:
+        """Obtiene los resúmenes mensuales más recientes de un usuario."""
+        if not usuario_id:
+            return []
+
+        return await consulta_resumenes(usuario_id, limit).cursor(resumenes_collection_reportes_async).to_list()
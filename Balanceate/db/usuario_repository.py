@@ -8,9 +8,84 @@ de la implementación específica de la base de datos.
 """
 from datetime import datetime
 from bson import ObjectId
-from .db import usuarios_collection
+from . import cache
+from .calendario_repository import lookups_deudas_sesion
+from .consultas import Consulta
+from .db import usuarios_collection, usuarios_collection_async
+from .movimiento_repository import PROYECCION_FEED, ORDEN_FEED
+from ..services.metricas_service import medir_repository
 
 
+def consulta_por_email(email: str) -> Consulta:
+    """Un usuario por email, ya normalizado (índice único de email)."""
+    return Consulta({"email": email}, limite=1)
+
+
+def consulta_usuario_por_id(usuario_id: str) -> Consulta:
+    """Un usuario por _id. Lanza InvalidId si el ID no es válido."""
+    return Consulta({"_id": ObjectId(usuario_id)}, limite=1)
+
+
+def pipeline_sesion(usuario_id: str, limit_movimientos: int, fecha: datetime) -> list[dict]:
+    """
+    Construye la agregación que trae usuario, balance, primera página del
+    feed y deudas del mes de fecha en una sola consulta.
+
+    Los $lookup usan sub-pipelines no correlacionados con el usuario_id
+    literal, de modo que cada uno se resuelve con su índice
+    (balances.usuario_unico, movimientos.usuario_fecha y
+    calendario_deudas.usuario_fecha_delta).
+    """
+    return [
+        {"$match": {"_id": ObjectId(usuario_id)}},
+        {"$project": {"email": 1, "nombre": 1}},
+        {"$lookup": {
+            "from": "balances",
+            "pipeline": [
+                {"$match": {"usuario_id": usuario_id}},
+                {"$limit": 1},
+                {"$project": {"_id": 0}},
+            ],
+            "as": "balance",
+        }},
+        {"$lookup": {
+            "from": "movimientos",
+            "pipeline": [
+                {"$match": {"usuario_id": usuario_id}},
+                {"$sort": dict(ORDEN_FEED)},
+                {"$limit": limit_movimientos},
+                {"$project": PROYECCION_FEED},
+            ],
+            "as": "movimientos",
+        }},
+        *lookups_deudas_sesion(usuario_id, fecha),
+    ]
+
+
+def _documento_sesion(resultado: dict | None) -> dict | None:
+    """Separa el resultado de la agregación en usuario, balance, movimientos y deudas."""
+    if not resultado:
+        return None
+
+    balances = resultado.pop("balance", [])
+    movimientos = resultado.pop("movimientos", [])
+    deuda_previa = resultado.pop("deuda_previa", [])
+    calendario_mes = resultado.pop("calendario_mes", [])
+    return {
+        "usuario": resultado,
+        "balance": balances[0] if balances else None,
+        "movimientos": movimientos,
+        "deuda_previa": deuda_previa[0]["pendiente"] if deuda_previa else 0.0,
+        "calendario_mes": calendario_mes,
+    }
+
+
+def _campo_sesion(limit_movimientos: int, fecha: datetime) -> str:
+    """Campo de caché de la sesión: depende del mes porque trae sus deudas."""
+    return cache.CAMPO_SESION.format(limit=limit_movimientos, mes=f"{fecha.year:04d}-{fecha.month:02d}")
+
+
+@medir_repository
 class UsuarioRepository:
     """
     Repository para gestionar operaciones de usuarios en MongoDB.
@@ -42,7 +117,7 @@ class UsuarioRepository:
         
         # Normalizar email: lowercase y sin espacios
         email_normalizado = email.lower().strip()
-        return usuarios_collection.find_one({"email": email_normalizado})
+        return usuarios_collection.find_one(consulta_por_email(email_normalizado).filtro)
     
     @staticmethod
     def buscar_por_id(usuario_id: str) -> dict | None:
@@ -67,11 +142,56 @@ class UsuarioRepository:
             return None
         
         try:
-            return usuarios_collection.find_one({"_id": ObjectId(usuario_id)})
+            return usuarios_collection.find_one(consulta_usuario_por_id(usuario_id).filtro)
         except Exception:
             # ID inválido o error en la búsqueda
             return None
     
+    @staticmethod
+    def buscar_sesion_por_id(usuario_id: str, limit_movimientos: int = 50) -> dict | None:
+        """
+        Carga todo lo necesario para hidratar una sesión en un solo round trip.
+        
+        Args:
+            usuario_id: ID del usuario en formato string
+            limit_movimientos: Tamaño de la primera página del feed
+            
+        Returns:
+            Diccionario {"usuario", "balance", "movimientos", "deuda_previa",
+            "calendario_mes"} o None si el usuario no existe o el ID no es
+            válido. "usuario" solo trae _id, email y nombre (nunca el hash
+            de la contraseña); "balance" es None si el usuario aún no tiene
+            ledger. Las deudas se resuelven con
+            calendario_repository.deudas_de_sesion.
+            
+        Nota:
+            Lectura read-through: se sirve desde la caché de Redis si está,
+            con un campo por mes. Las escrituras de movimientos (incluido su
+            calendario), ledger y usuario la invalidan.
+            
+        Uso común:
+            - Restaurar sesión desde token JWT (on_load)
+        """
+        if not usuario_id:
+            return None
+        
+        fecha = datetime.now()
+        campo = _campo_sesion(limit_movimientos, fecha)
+        sesion, generacion = cache.leer(usuario_id, campo)
+        if sesion is not None:
+            return sesion
+        
+        try:
+            resultados = list(
+                usuarios_collection.aggregate(pipeline_sesion(usuario_id, limit_movimientos, fecha))
+            )
+        except Exception:
+            return None
+        
+        sesion = _documento_sesion(resultados[0] if resultados else None)
+        cache.guardar(usuario_id, campo, sesion, generacion)
+        return sesion
+    
     @staticmethod
     def existe_email(email: str) -> bool:
         """
@@ -158,6 +278,7 @@ class UsuarioRepository:
         
         try:
             resultado = usuarios_collection.delete_one({"_id": ObjectId(usuario_id)})
+            cache.invalidar_usuario(usuario_id)
             return resultado.deleted_count > 0
         except Exception:
             return False
@@ -185,6 +306,7 @@ class UsuarioRepository:
                 {"_id": ObjectId(usuario_id)},
                 {"$set": {"nombre": nuevo_nombre.strip()}}
             )
+            cache.invalidar_usuario(usuario_id)
             return resultado.modified_count > 0
         except Exception:
             return False
@@ -220,3 +342,132 @@ class UsuarioRepository:
             return resultado.modified_count > 0
         except Exception:
             return False
+
+
+@medir_repository
+class UsuarioRepositoryAsync:
+    """
+    Versión async de UsuarioRepository.
+    
+    Mismos métodos y semántica, pero cada operación es awaitable y usa el
+    cliente async, de modo que los handlers de Reflex no bloquean el event loop.
+    """
+    
+    @staticmethod
+    async def buscar_por_email(email: str) -> dict | None:
+        """Busca un usuario por su email (normalizado)."""
+        if not email:
+            return None
+        
+        email_normalizado = email.lower().strip()
+        return await usuarios_collection_async.find_one(consulta_por_email(email_normalizado).filtro)
+    
+    @staticmethod
+    async def buscar_por_id(usuario_id: str) -> dict | None:
+        """Busca un usuario por su ID; retorna None si el ID no es válido."""
+        if not usuario_id:
+            return None
+        
+        try:
+            return await usuarios_collection_async.find_one(consulta_usuario_por_id(usuario_id).filtro)
+        except Exception:
+            return None
+    
+    @staticmethod
+    async def buscar_sesion_por_id(usuario_id: str, limit_movimientos: int = 50) -> dict | None:
+        """Carga usuario, balance, primera página del feed y deudas del mes en un solo round trip."""
+        if not usuario_id:
+            return None
+        
+        fecha = datetime.now()
+        campo = _campo_sesion(limit_movimientos, fecha)
+        sesion, generacion = await cache.leer_async(usuario_id, campo)
+        if sesion is not None:
+            return sesion
+        
+        try:
+            cursor = await usuarios_collection_async.aggregate(
+                pipeline_sesion(usuario_id, limit_movimientos, fecha)
+            )
+            resultados = await cursor.to_list()
+        except Exception:
+            return None
+        
+        sesion = _documento_sesion(resultados[0] if resultados else None)
+        await cache.guardar_async(usuario_id, campo, sesion, generacion)
+        return sesion
+    
+    @staticmethod
+    async def existe_email(email: str) -> bool:
+        """Verifica si un email ya está registrado."""
+        return await UsuarioRepositoryAsync.buscar_por_email(email) is not None
+    
+    @staticmethod
+    async def crear(email: str, password_hash: str, nombre: str) -> str:
+        """
+        Crea un nuevo usuario en la base de datos.
+        
+        Raises:
+            ValueError: Si el email ya está registrado
+            Exception: Si falla la inserción en la base de datos
+        """
+        if await UsuarioRepositoryAsync.existe_email(email):
+            raise ValueError("El email ya está registrado")
+        
+        nuevo_usuario = {
+            "email": email.lower().strip(),
+            "password": password_hash,
+            "nombre": nombre.strip(),
+            "fecha_registro": datetime.now().isoformat()
+        }
+        
+        resultado = await usuarios_collection_async.insert_one(nuevo_usuario)
+        
+        if not resultado.inserted_id:
+            raise Exception("No se pudo crear el usuario")
+        
+        return str(resultado.inserted_id)
+    
+    @staticmethod
+    async def eliminar(usuario_id: str) -> bool:
+        """Elimina un usuario de la base de datos (irreversible)."""
+        if not usuario_id:
+            return False
+        
+        try:
+            resultado = await usuarios_collection_async.delete_one({"_id": ObjectId(usuario_id)})
+            await cache.invalidar_usuario_async(usuario_id)
+            return resultado.deleted_count > 0
+        except Exception:
+            return False
+    
+    @staticmethod
+    async def actualizar_nombre(usuario_id: str, nuevo_nombre: str) -> bool:
+        """Actualiza el nombre de un usuario."""
+        if not usuario_id or not nuevo_nombre:
+            return False
+        
+        try:
+            resultado = await usuarios_collection_async.update_one(
+                {"_id": ObjectId(usuario_id)},
+                {"$set": {"nombre": nuevo_nombre.strip()}}
+            )
+            await cache.invalidar_usuario_async(usuario_id)
+            return resultado.modified_count > 0
+        except Exception:
+            return False
+    
+    @staticmethod
+    async def actualizar_password(usuario_id: str, nuevo_password_hash: str) -> bool:
+        """Actualiza el hash de contraseña de un usuario."""
+        if not usuario_id or not nuevo_password_hash:
+            return False
+        
+        try:
+            resultado = await usuarios_collection_async.update_one(
+                {"_id": ObjectId(usuario_id)},
+                {"$set": {"password": nuevo_password_hash}}
+            )
+            return resultado.modified_count > 0
+        except Exception:
+            return False
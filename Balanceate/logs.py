@@ -0,0 +1,157 @@
+"""
+Configuración de logging de Balanceate.
+
+Cada módulo usa su logger (logging.getLogger(__name__)), colgado del logger
+"Balanceate". Los mensajes del camino caliente (handlers, verificación de
+tokens) son DEBUG y usan formato perezoso ("%s"), así que con el nivel por
+defecto no se formatean ni se escriben.
+
+Las líneas se escriben como JSON (una por registro) desde un hilo aparte:
+el handler del logger solo encola el registro (QueueHandler) y un
+QueueListener hace la E/S, fuera del event loop de Reflex.
+
+Configuración:
+    LOG_NIVEL: Nivel por defecto de Balanceate (default INFO)
+    LOG_NIVELES: Niveles por módulo, p. ej.
+        "Balanceate.state=DEBUG,Balanceate.db.cache=WARNING"
+    LOG_FORMATO: "json" (default) o "texto"
+    LOG_ASINCRONO: "false" para escribir en el hilo que registra (default true)
+
+Uso:
+    logger = logging.getLogger(__name__)
+    logger.debug("Sesión restaurada para %s", usuario_id)
+    logger.warning("Caché no disponible", extra={"error": str(e)})
+"""
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+from datetime import datetime, timezone
+
+LOGGER_RAIZ = "Balanceate"
+
+# Atributos propios de LogRecord; el resto (extra=...) se exporta como campos
+_ATRIBUTOS_RECORD = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+_listener: logging.handlers.QueueListener | None = None
+_FORMATEADOR_EXCEPCIONES = logging.Formatter()
+
+
+class FormateadorJSON(logging.Formatter):
+    """Formatea cada registro como una línea JSON."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        linea = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "nivel": record.levelname,
+            "logger": record.name,
+            "mensaje": record.getMessage(),
+        }
+        for clave, valor in vars(record).items():
+            if clave not in _ATRIBUTOS_RECORD and not clave.startswith("_"):
+                linea[clave] = valor
+        if record.exc_info:
+            linea["excepcion"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            linea["excepcion"] = record.exc_text
+        return json.dumps(linea, ensure_ascii=False, default=str)
+
+
+class _ManejadorCola(logging.handlers.QueueHandler):
+    """
+    QueueHandler que deja el formato final al hilo de escritura.
+
+    Nota:
+        En el hilo que registra solo se resuelve el mensaje ("%s" % args)
+        y el traceback, que no se pueden diferir; el JSON se arma después.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _FORMATEADOR_EXCEPCIONES.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _niveles_por_modulo(valor: str) -> dict[str, str]:
+    """Interpreta LOG_NIVELES ("modulo=NIVEL,modulo=NIVEL")."""
+    niveles = {}
+    for par in valor.split(","):
+        nombre, _, nivel = par.partition("=")
+        if nombre.strip() and nivel.strip():
+            niveles[nombre.strip()] = nivel.strip().upper()
+    return niveles
+
+
+def configurar_logging(
+    nivel: str | None = None,
+    niveles: dict[str, str] | None = None,
+    formato: str | None = None,
+    asincrono: bool | None = None,
+    destino=None
+) -> None:
+    """
+    Configura el logger de Balanceate. Se puede llamar varias veces.
+
+    Args:
+        nivel: Nivel por defecto (default LOG_NIVEL o INFO)
+        niveles: Niveles por módulo (default LOG_NIVELES)
+        formato: "json" o "texto" (default LOG_FORMATO o json)
+        asincrono: Escribir desde un hilo aparte (default LOG_ASINCRONO o True)
+        destino: Stream de salida (default sys.stderr)
+
+    Uso común:
+        - Al importar la app (Balanceate.py) y en los benchmarks
+    """
+    global _listener
+
+    nivel = (nivel or os.getenv("LOG_NIVEL", "INFO")).upper()
+    niveles = niveles if niveles is not None else _niveles_por_modulo(os.getenv("LOG_NIVELES", ""))
+    formato = formato or os.getenv("LOG_FORMATO", "json")
+    if asincrono is None:
+        asincrono = os.getenv("LOG_ASINCRONO", "true").strip().lower() in ("1", "true", "yes", "si")
+
+    salida = logging.StreamHandler(destino or sys.stderr)
+    salida.setFormatter(
+        FormateadorJSON() if formato == "json"
+        else logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+    )
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+    raiz = logging.getLogger(LOGGER_RAIZ)
+    for handler in list(raiz.handlers):
+        raiz.removeHandler(handler)
+
+    if asincrono:
+        cola: queue.SimpleQueue = queue.SimpleQueue()
+        _listener = logging.handlers.QueueListener(cola, salida, respect_handler_level=True)
+        _listener.start()
+        raiz.addHandler(_ManejadorCola(cola))
+    else:
+        raiz.addHandler(salida)
+
+    raiz.setLevel(nivel)
+    raiz.propagate = False
+    for nombre, nivel_modulo in niveles.items():
+        logging.getLogger(nombre).setLevel(nivel_modulo)
+
+
+def detener_logging() -> None:
+    """Vacía la cola y detiene el hilo de escritura."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(detener_logging)
@@ -19,7 +19,6 @@ class Movimiento(BaseModel):
     fecha: str = ""  # Solo hora para mostrar (HH:MM:SS)
     fecha_completa: str = ""  # Fecha completa ISO para agrupar
     valor: float = 0.0
-    usuario_id: str = ""
     # Campos adicionales para deudas
     monto_total: float = 0.0  # Monto total de la deuda
     mensualidad: float = 0.0  # Pago mensual
@@ -41,3 +40,16 @@ class Balance(BaseModel):
     disponible: float = 0.0  # ingresos - gastos pagados
     deudas_pendientes: float = 0.0  # suma de montos totales de deudas activas
     balance_real: float = 0.0  # disponible - deudas_pendientes
+    # Metadatos del ledger materializado
+    total_movimientos: int = 0
+    ultimo_movimiento_id: str = ""
+
+
+class ResumenMensual(BaseModel):
+    """Totales de un mes de un usuario (colección resumenes_mensuales)."""
+    mes: str = ""  # "MM/YYYY" para mostrar
+    ingresos: float = 0.0
+    gastos: float = 0.0
+    deudas: float = 0.0  # deuda nueva del mes (monto total)
+    neto: float = 0.0  # ingresos - gastos
+    movimientos: int = 0
@@ -2,4 +2,4 @@
 Servicios de lógica de negocio.
 Contiene la lógica separada del State de Reflex.
 """
-from . import movimiento_service, balance_service, validacion_service
+from . import movimiento_service, balance_service, validacion_service, resumen_service, exportacion_service
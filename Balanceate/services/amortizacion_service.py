@@ -0,0 +1,164 @@
+"""
+Servicio de amortización de deudas.
+Este módulo contiene funciones puras que generan el calendario de pagos de
+una deuda a partir de su monto total, mensualidad y plazo.
+
+El calendario se genera una sola vez al crear la deuda y se guarda como
+entradas en la colección calendario_deudas (ver CalendarioRepository):
+una entrada "alta" que suma el monto total a la deuda pendiente y una
+entrada "pago" por cuota que la reduce. La deuda pendiente a una fecha es
+la suma de los deltas de las entradas hasta esa fecha.
+"""
+import calendar
+import math
+from datetime import datetime
+
+
+# Límite de cuotas generadas por deuda (50 años); la última liquida el saldo
+PLAZO_MAXIMO_MESES = 600
+
+
+def sumar_meses(fecha: datetime, meses: int) -> datetime:
+    """
+    Suma meses a una fecha conservando el día (o el último día del mes).
+
+    Args:
+        fecha: Fecha de partida
+        meses: Número de meses a sumar
+
+    Returns:
+        Fecha resultante; p. ej. 31/01 + 1 mes = 28/02 (o 29/02)
+    """
+    indice = fecha.month - 1 + meses
+    anio, mes = fecha.year + indice // 12, indice % 12 + 1
+    dia = min(fecha.day, calendar.monthrange(anio, mes)[1])
+    return fecha.replace(year=anio, month=mes, day=dia)
+
+
+def rango_mes(fecha: datetime) -> tuple[datetime, datetime]:
+    """Devuelve el inicio del mes de fecha y el inicio del mes siguiente."""
+    inicio = datetime(fecha.year, fecha.month, 1)
+    return inicio, sumar_meses(inicio, 1)
+
+
+def normalizar_condiciones(monto_total: float, mensualidad: float, plazo: int) -> tuple[float, float, int]:
+    """
+    Completa las condiciones de una deuda cuando falta la mensualidad o el plazo.
+
+    Args:
+        monto_total: Monto total de la deuda
+        mensualidad: Pago mensual (0 si no se indicó)
+        plazo: Plazo en meses (0 si no se indicó)
+
+    Returns:
+        Tupla (monto_total, mensualidad, plazo). Plazo 0 significa que la
+        deuda no tiene pagos programados.
+
+    Lógica de negocio:
+        - Sin plazo: tantos meses como hagan falta para cubrir el monto
+        - Sin mensualidad: el monto se reparte en cuotas iguales
+        - El plazo nunca supera PLAZO_MAXIMO_MESES
+    """
+    monto_total = max(float(monto_total), 0.0)
+    mensualidad = max(float(mensualidad), 0.0)
+    plazo = max(int(plazo), 0)
+
+    if monto_total == 0:
+        return 0.0, mensualidad, 0
+    if plazo == 0 and mensualidad > 0:
+        plazo = math.ceil(round(monto_total / mensualidad, 6))
+    plazo = min(plazo, PLAZO_MAXIMO_MESES)
+    if mensualidad == 0 and plazo > 0:
+        mensualidad = round(monto_total / plazo, 2)
+    return monto_total, mensualidad, plazo
+
+
+def generar_calendario(
+    monto_total: float,
+    mensualidad: float,
+    plazo: int,
+    fecha_inicio: datetime
+) -> list[dict]:
+    """
+    Genera el calendario de una deuda.
+
+    Args:
+        monto_total: Monto total de la deuda
+        mensualidad: Pago mensual
+        plazo: Plazo en meses
+        fecha_inicio: Fecha de alta de la deuda
+
+    Returns:
+        Lista de entradas {"fecha", "tipo", "cuota", "monto", "delta", "saldo"}:
+        primero el alta y luego un pago por mes
+
+    Lógica de negocio:
+        - El primer pago vence un mes después del alta
+        - Cada pago es la mensualidad, sin pasar del saldo restante
+        - La última cuota del plazo liquida el saldo que quede
+        - Los importes se redondean a centavos
+    """
+    monto_total, mensualidad, plazo = normalizar_condiciones(monto_total, mensualidad, plazo)
+    if monto_total == 0:
+        return []
+
+    entradas = [{
+        "fecha": fecha_inicio,
+        "tipo": "alta",
+        "cuota": 0,
+        "monto": monto_total,
+        "delta": monto_total,
+        "saldo": monto_total,
+    }]
+
+    saldo = monto_total
+    for cuota in range(1, plazo + 1):
+        pago = saldo if cuota == plazo else min(mensualidad, saldo)
+        pago = round(pago, 2)
+        saldo = round(saldo - pago, 2)
+        entradas.append({
+            "fecha": sumar_meses(fecha_inicio, cuota),
+            "tipo": "pago",
+            "cuota": cuota,
+            "monto": pago,
+            "delta": -pago,
+            "saldo": saldo,
+        })
+        if saldo <= 0:
+            break
+
+    return entradas
+
+
+def calendario_de_movimiento(movimiento: dict) -> list[dict]:
+    """
+    Genera las entradas de calendario de un movimiento de tipo deuda.
+
+    Args:
+        movimiento: Documento del movimiento, ya insertado (con _id)
+
+    Returns:
+        Entradas listas para insertar en calendario_deudas (con usuario_id
+        y deuda_id). Vacía si el movimiento no es una deuda o tiene datos
+        inválidos.
+    """
+    if movimiento.get("tipo") != "deuda" or movimiento.get("_id") is None:
+        return []
+
+    fecha = movimiento.get("fecha")
+    try:
+        if isinstance(fecha, str):
+            fecha = datetime.fromisoformat(fecha)
+        if not isinstance(fecha, datetime):
+            return []
+        entradas = generar_calendario(
+            movimiento.get("monto_total", 0),
+            movimiento.get("mensualidad", 0),
+            movimiento.get("plazo", 0),
+            fecha
+        )
+    except (ValueError, TypeError, OverflowError):
+        return []
+
+    comunes = {"usuario_id": movimiento.get("usuario_id", ""), "deuda_id": str(movimiento["_id"])}
+    return [{**comunes, **entrada} for entrada in entradas]
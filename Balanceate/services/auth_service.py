@@ -3,7 +3,13 @@ Servicio de autenticación.
 Maneja JWT, hashing de passwords y validación de usuarios.
 
 """
+import asyncio
+import logging
 import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 import bcrypt
@@ -11,6 +17,8 @@ from jwt import encode, decode
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # Configuración de JWT
 JWT_SECRET = os.getenv("JWT_SECRET")
 if not JWT_SECRET:
@@ -18,6 +26,36 @@ if not JWT_SECRET:
 
 JWT_EXPIRES_IN = timedelta(days=int(os.getenv("JWT_EXPIRES_DAYS", 7)))
 
+# Tokens de descarga: de vida corta porque viajan en la URL de exportación
+JWT_EXPORTACION_EXPIRES_IN = timedelta(seconds=int(os.getenv("JWT_EXPORTACION_SEGUNDOS", 300)))
+
+# Caché de tokens ya verificados: token -> (usuario_id, exp en epoch)
+JWT_CACHE_MAX = int(os.getenv("JWT_CACHE_MAX", 1024))
+_tokens_verificados: OrderedDict[str, tuple[str, float]] = OrderedDict()
+_tokens_lock = threading.Lock()
+
+# Pool de bcrypt: bcrypt libera el GIL, así que los hilos escalan con los núcleos
+BCRYPT_WORKERS = int(os.getenv("BCRYPT_WORKERS", os.cpu_count() or 2))
+# Máximo de operaciones bcrypt pendientes (en cola + en ejecución) antes de rechazar
+BCRYPT_MAX_PENDIENTES = int(os.getenv("BCRYPT_MAX_PENDIENTES", BCRYPT_WORKERS * 8))
+
+_bcrypt_executor = ThreadPoolExecutor(
+    max_workers=BCRYPT_WORKERS,
+    thread_name_prefix="bcrypt"
+)
+_bcrypt_lock = threading.Lock()
+_bcrypt_pendientes = 0
+_bcrypt_metricas = {
+    "operaciones": 0,
+    "rechazadas": 0,
+    "espera_total_ms": 0.0,
+    "espera_max_ms": 0.0,
+}
+
+
+class ServicioSaturadoError(Exception):
+    """Se lanza cuando la cola de bcrypt está llena (back-pressure)."""
+
 
 def generar_token(usuario_id: str) -> str:
 
@@ -31,23 +69,82 @@ def generar_token(usuario_id: str) -> str:
 def verificar_token(token: str) -> str | None:
 
     if not token:
-        print("🔒 Token vacío o nulo")
         return None
+    
+    # Caché LRU: evita repetir la verificación de firma en cada navegación
+    with _tokens_lock:
+        entrada = _tokens_verificados.get(token)
+        if entrada:
+            usuario_id, expira = entrada
+            if expira > time.time():
+                _tokens_verificados.move_to_end(token)
+                return usuario_id
+            del _tokens_verificados[token]
         
     try:
         payload = decode(token, JWT_SECRET, algorithms=["HS256"])
         if "usuario_id" in payload:
             usuario_id = payload["usuario_id"]
-            print(f"🔓 Token válido para usuario: {usuario_id}")
+            _guardar_token_verificado(token, usuario_id, payload.get("exp"))
             return usuario_id
         else:
-            print("🔒 Token no contiene usuario_id")
+            logger.debug("Token sin usuario_id")
             return None
     except Exception as e:
-        print(f"🔒 Error al verificar token: {str(e)}")
+        logger.debug("Token rechazado: %s", e)
+        return None
+
+
+def generar_token_exportacion(usuario_id: str) -> str:
+    """
+    Genera un token de corta duración para descargar la exportación.
+    
+    Usa la clave "exporta_usuario_id" en lugar de "usuario_id", de modo que
+    verificar_token nunca lo acepta como token de sesión.
+    """
+    payload = {
+        "exporta_usuario_id": usuario_id,
+        "exp": datetime.utcnow() + JWT_EXPORTACION_EXPIRES_IN
+    }
+    return encode(payload, JWT_SECRET, algorithm="HS256")
+
+
+def verificar_token_exportacion(token: str) -> str | None:
+    """Devuelve el usuario_id de un token de exportación válido, o None."""
+    if not token:
+        return None
+    
+    try:
+        payload = decode(token, JWT_SECRET, algorithms=["HS256"])
+        return payload.get("exporta_usuario_id")
+    except Exception as e:
+        logger.debug("Token de exportación rechazado: %s", e)
         return None
 
 
+def _guardar_token_verificado(token: str, usuario_id: str, exp) -> None:
+    """Guarda un token verificado en la caché hasta su expiración."""
+    if not exp:
+        return
+    
+    with _tokens_lock:
+        _tokens_verificados[token] = (usuario_id, float(exp))
+        _tokens_verificados.move_to_end(token)
+        while len(_tokens_verificados) > JWT_CACHE_MAX:
+            _tokens_verificados.popitem(last=False)
+
+
+def invalidar_token(token: str) -> None:
+    """
+    Elimina un token de la caché de verificación.
+    
+    Uso común:
+        - Logout: el token ya no se resuelve desde la caché
+    """
+    with _tokens_lock:
+        _tokens_verificados.pop(token, None)
+
+
 def hash_password(password: str) -> str:
 
     return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
@@ -77,5 +174,83 @@ def verificar_password(password: str, password_hash: str | bytes) -> bool:
         
         return bcrypt.checkpw(password_bytes, password_hash_bytes)
     except Exception as e:
-        print(f"Error en verificar_password: {str(e)}")
+        logger.warning("Error en verificar_password: %s", e)
         return False
+
+
+def _ejecutar_en_pool_bcrypt(funcion, encolado: float, *args):
+    """Ejecuta una operación bcrypt en el pool y registra la espera en cola."""
+    espera_ms = (time.perf_counter() - encolado) * 1000
+    with _bcrypt_lock:
+        _bcrypt_metricas["operaciones"] += 1
+        _bcrypt_metricas["espera_total_ms"] += espera_ms
+        _bcrypt_metricas["espera_max_ms"] = max(_bcrypt_metricas["espera_max_ms"], espera_ms)
+    return funcion(*args)
+
+
+async def _enviar_a_pool_bcrypt(funcion, *args):
+    """
+    Envía una operación bcrypt al pool sin bloquear el event loop.
+    
+    Raises:
+        ServicioSaturadoError: Si ya hay BCRYPT_MAX_PENDIENTES operaciones pendientes
+    """
+    global _bcrypt_pendientes
+    
+    with _bcrypt_lock:
+        if _bcrypt_pendientes >= BCRYPT_MAX_PENDIENTES:
+            _bcrypt_metricas["rechazadas"] += 1
+            raise ServicioSaturadoError("Demasiadas operaciones de autenticación en curso")
+        _bcrypt_pendientes += 1
+    
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            _bcrypt_executor,
+            _ejecutar_en_pool_bcrypt,
+            funcion,
+            time.perf_counter(),
+            *args
+        )
+    finally:
+        with _bcrypt_lock:
+            _bcrypt_pendientes -= 1
+
+
+async def hash_password_async(password: str) -> str:
+    """
+    Versión async de hash_password que se ejecuta en el pool de bcrypt.
+    
+    Raises:
+        ServicioSaturadoError: Si la cola de bcrypt está llena
+    """
+    return await _enviar_a_pool_bcrypt(hash_password, password)
+
+
+async def verificar_password_async(password: str, password_hash: str | bytes) -> bool:
+    """
+    Versión async de verificar_password que se ejecuta en el pool de bcrypt.
+    
+    Raises:
+        ServicioSaturadoError: Si la cola de bcrypt está llena
+    """
+    return await _enviar_a_pool_bcrypt(verificar_password, password, password_hash)
+
+
+def metricas_bcrypt() -> dict:
+    """
+    Devuelve las métricas del pool de bcrypt.
+    
+    Returns:
+        Diccionario con operaciones, rechazadas, pendientes y tiempos de espera
+        en cola (total, promedio y máximo, en milisegundos)
+    """
+    with _bcrypt_lock:
+        metricas = dict(_bcrypt_metricas)
+        metricas["pendientes"] = _bcrypt_pendientes
+    
+    operaciones = metricas["operaciones"]
+    metricas["espera_promedio_ms"] = (
+        metricas["espera_total_ms"] / operaciones if operaciones else 0.0
+    )
+    return metricas
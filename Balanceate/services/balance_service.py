@@ -2,54 +2,92 @@
 Servicio para la lógica de negocio relacionada con balances.
 Este módulo contiene funciones puras que procesan y calculan balances.
 """
+from collections.abc import Iterable
 from datetime import datetime
 from ..models import Balance
+from . import calculo_vectorizado
+from .lote_movimientos import LoteMovimientos
 
 
-def calcular_balance_completo(docs: list[dict], usuario_id: str) -> Balance:
+def calcular_aporte_movimiento(doc: dict) -> tuple[float, float]:
+    """
+    Calcula cuánto aporta un movimiento al ledger de balance del usuario.
+    
+    Args:
+        doc: Documento (dict) del movimiento
+        
+    Returns:
+        Tupla (delta_disponible, delta_deudas) con el efecto del movimiento
+        
+    Lógica de negocio:
+        - Ingreso: suma su valor al disponible
+        - Gasto: resta su valor al disponible
+        - Deuda: suma su monto total a las deudas pendientes
+        - Documentos con datos inválidos no aportan nada
+    """
+    try:
+        tipo = doc.get("tipo", "")
+        
+        if tipo == "ingreso":
+            return float(doc.get("valor", 0)), 0.0
+        if tipo == "gasto":
+            return -float(doc.get("valor", 0)), 0.0
+        if tipo == "deuda":
+            return 0.0, float(doc.get("monto_total", 0))
+    except (ValueError, TypeError):
+        pass
+    
+    return 0.0, 0.0
+
+
+def calcular_aporte_lote(lote: LoteMovimientos) -> tuple[float, float]:
+    """
+    Calcula el aporte conjunto de un lote de movimientos al ledger.
+    
+    Args:
+        lote: LoteMovimientos en columnas
+        
+    Returns:
+        Tupla (delta_disponible, delta_deudas), con las mismas reglas que
+        calcular_aporte_movimiento aplicadas a cada fila
+        
+    Nota:
+        Se calcula vectorizado (ver calculo_vectorizado);
+        calcular_aporte_movimiento es la referencia escalar.
+    """
+    resultado = calculo_vectorizado.calcular_lote(lote, por_mes=False)
+    return resultado.delta_disponible, resultado.delta_deudas
+
+
+def calcular_balance_completo(docs: Iterable[dict], usuario_id: str) -> Balance:
     """
     Calcula el balance completo a partir de documentos de movimientos.
     
     Args:
-        docs: Lista de documentos (dicts) de movimientos desde MongoDB
+        docs: Documentos (dicts) de movimientos desde MongoDB, en orden cronológico
         usuario_id: ID del usuario propietario del balance
         
     Returns:
-        Objeto Balance con total, disponible, deudas_pendientes y balance_real
+        Objeto Balance con total, disponible, deudas_pendientes, balance_real,
+        total_movimientos y ultimo_movimiento_id
         
     Lógica de negocio:
         - Balance total (disponible): suma de ingresos menos gastos
         - Deudas pendientes: suma de montos totales de todas las deudas
         - Balance real: disponible menos deudas pendientes
         - Las deudas NO afectan el balance disponible directamente
+        
+    Nota:
+        Recorre todo el historial (O(n)). En el flujo normal el balance se lee
+        del ledger materializado en la colección balances; esta función solo
+        se usa para reconciliar ese ledger (ver reconciliacion_service).
     """
-    balance_total = 0.0
-    deudas_pendientes = 0.0
-    
-    for doc in docs:
-        try:
-            tipo = doc.get("tipo", "")
-            
-            # Calcular balance disponible (ingresos - gastos)
-            if tipo == "ingreso":
-                valor = float(doc.get("valor", 0))
-                balance_total += valor
-            elif tipo == "gasto":
-                valor = float(doc.get("valor", 0))
-                balance_total -= valor
-            
-            # Acumular deudas pendientes (monto total de cada deuda)
-            if tipo == "deuda":
-                monto_total = float(doc.get("monto_total", 0))
-                deudas_pendientes += monto_total
-                
-        except (ValueError, TypeError):
-            # Ignorar documentos con datos inválidos
-            continue
-    
-    # Validar que el balance sea un número válido
-    if not isinstance(balance_total, (int, float)):
-        balance_total = 0.0
+    # Recorrer el historial en lotes de columnas, no documento a documento
+    resultado = calculo_vectorizado.calcular_historial(docs, por_mes=False)
+    balance_total = resultado.delta_disponible
+    deudas_pendientes = resultado.delta_deudas
+    total_movimientos = resultado.movimientos
+    ultimo_movimiento_id = resultado.ultimo_id
     
     # Calcular los 3 tipos de balance
     disponible = float(balance_total)
@@ -62,57 +100,71 @@ def calcular_balance_completo(docs: list[dict], usuario_id: str) -> Balance:
         ultima_actualizacion=datetime.now().isoformat(),
         disponible=disponible,
         deudas_pendientes=deudas_pendientes,
-        balance_real=balance_real
+        balance_real=balance_real,
+        total_movimientos=total_movimientos,
+        ultimo_movimiento_id=ultimo_movimiento_id
     )
 
 
-def actualizar_balance_incremental(balance_actual: Balance, valor: float, tipo: str) -> Balance:
+def balance_desde_documento(doc: dict, usuario_id: str) -> Balance:
     """
-    Actualiza un balance existente de forma incremental.
+    Construye un Balance a partir del documento del ledger en MongoDB.
+    
+    Args:
+        doc: Documento de la colección balances
+        usuario_id: ID del usuario propietario del balance
+        
+    Returns:
+        Objeto Balance con los campos materializados del ledger
+    """
+    disponible = float(doc.get("disponible", doc.get("total", 0.0)))
+    deudas_pendientes = float(doc.get("deudas_pendientes", 0.0))
+    
+    return Balance(
+        usuario_id=usuario_id,
+        total=disponible,
+        ultima_actualizacion=str(doc.get("ultima_actualizacion", "")),
+        disponible=disponible,
+        deudas_pendientes=deudas_pendientes,
+        balance_real=float(doc.get("balance_real", disponible - deudas_pendientes)),
+        total_movimientos=int(doc.get("total_movimientos", 0)),
+        ultimo_movimiento_id=str(doc.get("ultimo_movimiento_id", ""))
+    )
+
+
+def aplicar_movimiento_a_balance(
+    balance_actual: Balance,
+    movimiento: dict,
+    movimiento_id: str = ""
+) -> Balance:
+    """
+    Aplica en memoria el mismo delta que el ledger recibe al crear un movimiento.
     
     Args:
         balance_actual: Balance actual del usuario
-        valor: Valor del movimiento a aplicar
-        tipo: Tipo de movimiento ("ingreso", "gasto", "deuda")
+        movimiento: Documento del movimiento recién creado
+        movimiento_id: ID del movimiento (pasa a ser ultimo_movimiento_id)
         
     Returns:
-        Nuevo objeto Balance actualizado
+        Nuevo objeto Balance con el aporte del movimiento aplicado
         
-    Lógica de negocio:
-        - Para ingresos: aumenta el total/disponible
-        - Para gastos: disminuye el total/disponible
-        - Para deudas: aumenta las deudas pendientes (NO afecta disponible)
-        - Recalcula balance_real = disponible - deudas_pendientes
+    Nota:
+        Evita releer el ledger tras cada alta: el resultado coincide con lo
+        que BalanceRepository.aplicar_movimiento acaba de escribir.
     """
-    if not isinstance(balance_actual, Balance):
-        raise ValueError("balance_actual debe ser un objeto Balance")
-    
-    # Copiar valores actuales
-    nuevo_total = balance_actual.total
-    nuevas_deudas = balance_actual.deudas_pendientes
-    
-    # Aplicar el movimiento según tipo
-    if tipo == "ingreso":
-        nuevo_total += float(valor)
-    elif tipo == "gasto":
-        nuevo_total -= float(valor)
-    elif tipo == "deuda":
-        # Las deudas no afectan el balance disponible inmediatamente
-        # Solo aumentan las deudas pendientes
-        nuevas_deudas += float(valor)  # valor aquí sería monto_total
-    
-    # Calcular valores derivados
-    disponible = float(nuevo_total)
-    balance_real = disponible - nuevas_deudas
-    
-    # Crear nuevo objeto Balance
+    delta_disponible, delta_deudas = calcular_aporte_movimiento(movimiento)
+    disponible = balance_actual.disponible + delta_disponible
+    deudas_pendientes = balance_actual.deudas_pendientes + delta_deudas
+    
     return Balance(
         usuario_id=balance_actual.usuario_id,
-        total=nuevo_total,
+        total=disponible,
         ultima_actualizacion=datetime.now().isoformat(),
         disponible=disponible,
-        deudas_pendientes=nuevas_deudas,
-        balance_real=balance_real
+        deudas_pendientes=deudas_pendientes,
+        balance_real=disponible - deudas_pendientes,
+        total_movimientos=balance_actual.total_movimientos + 1,
+        ultimo_movimiento_id=movimiento_id or balance_actual.ultimo_movimiento_id
     )
 
 
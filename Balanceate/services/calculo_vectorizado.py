@@ -0,0 +1,158 @@
+"""
+Cálculo vectorizado de balances y resúmenes sobre lotes de movimientos.
+
+Las columnas de un LoteMovimientos (array.array) se ven como arrays de NumPy
+sin copiarlas; los aportes se obtienen con sumas por máscara de tipo y las
+series por mes con np.bincount, en una sola pasada por lote.
+
+Las funciones escalares balance_service.calcular_aporte_movimiento y
+resumen_service.calcular_aporte_resumen definen las reglas de negocio y
+sirven de referencia: aplicadas documento a documento deben dar los mismos
+resultados que este módulo.
+"""
+from collections.abc import Iterable
+from typing import NamedTuple
+import numpy as np
+from .lote_movimientos import (
+    LoteMovimientos, TIPO_DESCONOCIDO, TIPO_INGRESO, TIPO_GASTO, TIPO_DEUDA,
+)
+
+
+# Campo del resumen mensual que acumula cada código de tipo
+CAMPOS_POR_CODIGO = {
+    TIPO_INGRESO: "ingresos",
+    TIPO_GASTO: "gastos",
+    TIPO_DEUDA: "deudas",
+}
+
+
+class ResultadoCalculo(NamedTuple):
+    """Resultado del cálculo sobre uno o varios lotes."""
+    delta_disponible: float
+    delta_deudas: float
+    movimientos: int
+    ultimo_id: str
+    por_mes: dict[str, dict[str, float]]  # {YYYY-MM: {campo: total}}
+
+
+def _columna(columna, dtype) -> np.ndarray:
+    """Vista NumPy (sin copia) de una columna array.array."""
+    return np.frombuffer(columna, dtype=dtype)
+
+
+def _series_por_mes(
+    tipos: np.ndarray,
+    valores: np.ndarray,
+    montos_totales: np.ndarray,
+    timestamps: np.ndarray
+) -> dict[str, dict[str, float]]:
+    """
+    Agrupa por mes los aportes de las filas con fecha y tipo conocido.
+
+    Returns:
+        {YYYY-MM: {"ingresos", "gastos", "deudas", "movimientos"}}
+    """
+    validas = (tipos != TIPO_DESCONOCIDO) & ~np.isnan(timestamps)
+    if not validas.any():
+        return {}
+
+    tipos = tipos[validas]
+    # Las deudas aportan su monto total; ingresos y gastos, su valor
+    montos = np.where(tipos == TIPO_DEUDA, montos_totales[validas], valores[validas])
+    meses = (
+        np.floor(timestamps[validas]).astype(np.int64)
+        .astype("datetime64[s]").astype("datetime64[M]")
+    )
+    etiquetas, indice = np.unique(meses, return_inverse=True)
+
+    columnas = {
+        campo: np.bincount(indice, weights=np.where(tipos == codigo, montos, 0.0), minlength=len(etiquetas))
+        for codigo, campo in CAMPOS_POR_CODIGO.items()
+    }
+    conteos = np.bincount(indice, minlength=len(etiquetas))
+
+    return {
+        mes: {
+            **{campo: float(columna[i]) for campo, columna in columnas.items()},
+            "movimientos": int(conteos[i]),
+        }
+        for i, mes in enumerate(np.datetime_as_string(etiquetas, unit="M"))
+    }
+
+
+def calcular_lote(lote: LoteMovimientos, por_mes: bool = True) -> ResultadoCalculo:
+    """
+    Calcula el aporte de un lote al ledger y, opcionalmente, sus series por mes.
+
+    Args:
+        lote: LoteMovimientos en columnas
+        por_mes: Calcular también los totales por mes
+
+    Returns:
+        ResultadoCalculo del lote (por_mes vacío si no se pidió)
+
+    Lógica de negocio:
+        - Ingreso: suma su valor al disponible
+        - Gasto: resta su valor al disponible
+        - Deuda: suma su monto total a las deudas pendientes
+    """
+    tipos = _columna(lote.tipos, np.int8)
+    valores = _columna(lote.valores, np.float64)
+    montos_totales = _columna(lote.montos_totales, np.float64)
+
+    delta_disponible = valores[tipos == TIPO_INGRESO].sum() - valores[tipos == TIPO_GASTO].sum()
+    delta_deudas = montos_totales[tipos == TIPO_DEUDA].sum()
+
+    series = {}
+    if por_mes:
+        series = _series_por_mes(tipos, valores, montos_totales, _columna(lote.timestamps, np.float64))
+
+    return ResultadoCalculo(
+        delta_disponible=float(delta_disponible),
+        delta_deudas=float(delta_deudas),
+        movimientos=len(lote),
+        ultimo_id=lote.ultimo_id,
+        por_mes=series
+    )
+
+
+def _fusionar_series(destino: dict[str, dict[str, float]], origen: dict[str, dict[str, float]]) -> None:
+    """Suma en destino las series por mes de origen."""
+    for mes, totales in origen.items():
+        acumulado = destino.get(mes)
+        if acumulado is None:
+            destino[mes] = dict(totales)
+            continue
+        for campo, valor in totales.items():
+            acumulado[campo] += valor
+
+
+def calcular_historial(docs: Iterable[dict], por_mes: bool = True) -> ResultadoCalculo:
+    """
+    Calcula el aporte de un historial completo recorriéndolo en lotes.
+
+    Args:
+        docs: Documentos de movimientos (p. ej. un cursor de MongoDB), en orden
+        por_mes: Calcular también los totales por mes
+
+    Returns:
+        ResultadoCalculo acumulado de todos los lotes
+
+    Nota:
+        La memoria usada depende del tamaño de lote, no del historial.
+    """
+    delta_disponible = 0.0
+    delta_deudas = 0.0
+    movimientos = 0
+    ultimo_id = ""
+    series: dict[str, dict[str, float]] = {}
+
+    for lote in LoteMovimientos.en_lotes(docs):
+        resultado = calcular_lote(lote, por_mes)
+        delta_disponible += resultado.delta_disponible
+        delta_deudas += resultado.delta_deudas
+        movimientos += resultado.movimientos
+        ultimo_id = resultado.ultimo_id or ultimo_id
+        _fusionar_series(series, resultado.por_mes)
+
+    return ResultadoCalculo(delta_disponible, delta_deudas, movimientos, ultimo_id, series)
@@ -0,0 +1,143 @@
+"""
+Servicio para la exportación del historial de movimientos.
+Este módulo contiene funciones que convierten documentos de movimientos en
+fragmentos CSV o NDJSON a medida que se leen del cursor, sin materializar el
+historial completo en memoria.
+"""
+import csv
+import io
+import json
+from collections.abc import AsyncIterable, AsyncIterator, Iterable, Iterator
+from datetime import datetime
+
+
+# Columnas exportadas, en orden
+COLUMNAS_EXPORTACION = ["fecha", "tipo", "nombre", "valor", "monto_total", "mensualidad", "plazo"]
+
+# Filas por fragmento enviado al navegador
+FILAS_POR_FRAGMENTO = 1000
+
+FORMATOS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+}
+
+
+# Primeros caracteres con los que una hoja de cálculo interpreta una celda
+# como fórmula (inyección de fórmulas en CSV)
+PREFIJOS_FORMULA = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _celda_csv(valor):
+    """Neutraliza una celda de texto que una hoja de cálculo tomaría por fórmula."""
+    if isinstance(valor, str) and valor.startswith(PREFIJOS_FORMULA):
+        return "'" + valor
+    return valor
+
+
+def _valores_fila(doc: dict) -> list:
+    """Extrae los valores exportables de un documento, en el orden de las columnas."""
+    fecha = doc.get("fecha", "")
+    if isinstance(fecha, datetime):
+        fecha = fecha.isoformat()
+    return [
+        fecha,
+        doc.get("tipo", ""),
+        doc.get("nombre", ""),
+        doc.get("valor", 0),
+        doc.get("monto_total", 0),
+        doc.get("mensualidad", 0),
+        doc.get("plazo", 0),
+    ]
+
+
+class FormateadorExportacion:
+    """
+    Convierte lotes de documentos en fragmentos de texto de un formato.
+    
+    Reutiliza un único buffer para todos los fragmentos.
+    """
+    def __init__(self, formato: str):
+        if formato not in FORMATOS:
+            raise ValueError(f"Formato de exportación no soportado: {formato}")
+        self.formato = formato
+        self._buffer = io.StringIO()
+        self._escritor = csv.writer(self._buffer, lineterminator="\n")
+
+    def encabezado(self) -> str:
+        """Texto inicial del archivo (fila de columnas en CSV, vacío en NDJSON)."""
+        if self.formato != "csv":
+            return ""
+        return ",".join(COLUMNAS_EXPORTACION) + "\n"
+
+    def fragmento(self, docs: list[dict]) -> str:
+        """Formatea un lote de documentos como un fragmento de texto."""
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        
+        if self.formato == "csv":
+            # Los nombres pueden venir de extractos importados: se neutralizan
+            # las fórmulas. NDJSON no lo necesita y conserva el texto original.
+            self._escritor.writerows(
+                [_celda_csv(valor) for valor in _valores_fila(doc)] for doc in docs
+            )
+        else:
+            for doc in docs:
+                self._buffer.write(
+                    json.dumps(dict(zip(COLUMNAS_EXPORTACION, _valores_fila(doc))), ensure_ascii=False)
+                )
+                self._buffer.write("\n")
+        
+        return self._buffer.getvalue()
+
+
+def generar_fragmentos(
+    docs: Iterable[dict],
+    formato: str,
+    filas_por_fragmento: int = FILAS_POR_FRAGMENTO
+) -> Iterator[str]:
+    """
+    Genera el archivo de exportación fragmento a fragmento.
+    
+    Args:
+        docs: Documentos de movimientos (p. ej. un cursor de MongoDB)
+        formato: "csv" o "ndjson"
+        filas_por_fragmento: Documentos por fragmento
+        
+    Yields:
+        Fragmentos de texto; en memoria solo vive el lote actual
+    """
+    formateador = FormateadorExportacion(formato)
+    encabezado = formateador.encabezado()
+    if encabezado:
+        yield encabezado
+    
+    lote = []
+    for doc in docs:
+        lote.append(doc)
+        if len(lote) >= filas_por_fragmento:
+            yield formateador.fragmento(lote)
+            lote = []
+    if lote:
+        yield formateador.fragmento(lote)
+
+
+async def generar_fragmentos_async(
+    docs: AsyncIterable[dict],
+    formato: str,
+    filas_por_fragmento: int = FILAS_POR_FRAGMENTO
+) -> AsyncIterator[str]:
+    """Versión async de generar_fragmentos para cursores async."""
+    formateador = FormateadorExportacion(formato)
+    encabezado = formateador.encabezado()
+    if encabezado:
+        yield encabezado
+    
+    lote = []
+    async for doc in docs:
+        lote.append(doc)
+        if len(lote) >= filas_por_fragmento:
+            yield formateador.fragmento(lote)
+            lote = []
+    if lote:
+        yield formateador.fragmento(lote)
@@ -0,0 +1,359 @@
+"""
+Servicio para la importación masiva de movimientos desde extractos bancarios.
+Este módulo contiene funciones puras que leen CSV u OFX línea a línea y
+producen lotes de movimientos validados, sin cargar el archivo completo en
+memoria. Los extractos subidos se guardan antes en un archivo temporal
+(guardar_en_temporal) y se leen desde ahí (filas_de_archivo).
+"""
+import csv
+import itertools
+import math
+import os
+import re
+import shutil
+import tempfile
+from collections.abc import Iterable, Iterator
+from typing import BinaryIO
+from datetime import datetime, timedelta, timezone
+from .movimiento_service import validar_datos_movimiento, construir_movimiento
+
+
+# Filas por lote: cada lote es un insert_many y una actualización del ledger
+TAMANO_LOTE = 500
+
+# Máximo de mensajes de error que se conservan en el resultado
+MAX_ERRORES = 20
+
+# Prefijo de los archivos temporales donde se guardan los extractos subidos
+PREFIJO_TEMPORAL = "balanceate-importacion-"
+
+# Nombres de columna aceptados en CSV (en minúsculas) para cada campo
+COLUMNAS_CSV = {
+    "fecha": ("fecha", "date", "fecha operacion", "fecha operación"),
+    "nombre": ("nombre", "descripcion", "descripción", "concepto", "description"),
+    "valor": ("valor", "monto", "importe", "amount"),
+    "tipo": ("tipo", "type"),
+    "monto_total": ("monto_total",),
+    "mensualidad": ("mensualidad",),
+    "plazo": ("plazo",),
+}
+
+_ETIQUETA_OFX = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<]*)")
+
+
+class ResultadoImportacion:
+    """Resultado acumulado de una importación."""
+    def __init__(self):
+        self.importados = 0
+        self.rechazados = 0
+        self.errores: list[str] = []
+
+    def registrar_error(self, fila: int, mensaje: str):
+        """Cuenta una fila rechazada y guarda su mensaje (hasta MAX_ERRORES)."""
+        self.rechazados += 1
+        if len(self.errores) < MAX_ERRORES:
+            self.errores.append(f"Fila {fila}: {mensaje}")
+
+
+def parsear_fecha(texto: str) -> datetime | None:
+    """
+    Interpreta la fecha de una fila de extracto.
+    
+    Args:
+        texto: Fecha ISO (YYYY-MM-DD[THH:MM:SS]), DD/MM/YYYY o
+            formato OFX (YYYYMMDD[HHMMSS][.XXX][TZ])
+        
+    Returns:
+        datetime sin zona horaria, o None si no se reconoce el formato
+        
+    Nota:
+        Las fechas con zona (ISO con offset u OFX con [offset:TZ]) se
+        convierten a la hora local del servidor y se devuelven sin tzinfo,
+        la misma convención que construir_movimiento (datetime.now()): así
+        un movimiento importado cae en el mismo día y mes que uno creado a
+        mano a esa hora. Las fechas sin zona se devuelven tal cual.
+    """
+    texto = (texto or "").strip()
+    if not texto:
+        return None
+    
+    try:
+        fecha = datetime.fromisoformat(texto)
+    except ValueError:
+        pass
+    else:
+        return _a_hora_local(fecha)
+    
+    try:
+        return datetime.strptime(texto, "%d/%m/%Y")
+    except ValueError:
+        pass
+    
+    # OFX: los primeros 8-14 dígitos son la fecha/hora; [offset:TZ] opcional
+    digitos = re.match(r"\d{8}(\d{6})?", texto)
+    if digitos:
+        formato = "%Y%m%d%H%M%S" if digitos.group(1) else "%Y%m%d"
+        fecha = datetime.strptime(digitos.group(0), formato)
+        zona = re.search(r"\[([+-]?\d+(?:\.\d+)?)(?::[^\]]*)?\]", texto)
+        if zona:
+            try:
+                fecha = fecha.replace(tzinfo=timezone(timedelta(hours=float(zona.group(1)))))
+            except ValueError:
+                return None
+        return _a_hora_local(fecha)
+    
+    return None
+
+
+def _a_hora_local(fecha: datetime) -> datetime:
+    """Convierte una fecha con zona a hora local sin tzinfo; las fechas sin zona no cambian."""
+    if fecha.tzinfo is None:
+        return fecha
+    return fecha.astimezone().replace(tzinfo=None)
+
+
+def _parsear_numero(texto) -> float:
+    """
+    Convierte un importe de extracto a float (admite coma decimal).
+    
+    Raises:
+        ValueError: Si no es un número finito ("nan" o "inf" llegarían al
+            $inc del ledger y lo dejarían en NaN para siempre)
+    """
+    if isinstance(texto, (int, float)):
+        numero = float(texto)
+    else:
+        texto = (texto or "").strip().replace(" ", "")
+        if not texto:
+            return 0.0
+        if "," in texto and "." in texto:
+            # 1.234,56 o 1,234.56: el último separador es el decimal
+            if texto.rfind(",") > texto.rfind("."):
+                texto = texto.replace(".", "").replace(",", ".")
+            else:
+                texto = texto.replace(",", "")
+        else:
+            texto = texto.replace(",", ".")
+        numero = float(texto)
+    if not math.isfinite(numero):
+        raise ValueError(f"importe no finito: {texto}")
+    return numero
+
+
+def leer_csv(lineas: Iterable[str]) -> Iterator[dict]:
+    """
+    Lee un extracto CSV y produce una fila normalizada por movimiento.
+    
+    Args:
+        lineas: Líneas de texto del archivo (p. ej. un archivo abierto)
+        
+    Yields:
+        Diccionarios con fecha, nombre, valor, tipo y campos de deuda en texto
+        
+    Nota:
+        Detecta el separador (coma o punto y coma) con la primera línea y
+        acepta los nombres de columna de COLUMNAS_CSV.
+    """
+    lineas = iter(lineas)
+    encabezado = next(lineas, "")
+    separador = ";" if encabezado.count(";") > encabezado.count(",") else ","
+    columnas = [c.strip().lower() for c in next(csv.reader([encabezado], delimiter=separador))]
+    
+    indices = {}
+    for campo, alias in COLUMNAS_CSV.items():
+        for i, columna in enumerate(columnas):
+            if columna in alias:
+                indices[campo] = i
+                break
+    
+    for registro in csv.reader(lineas, delimiter=separador):
+        if not any(celda.strip() for celda in registro):
+            continue
+        yield {
+            campo: registro[i] if i < len(registro) else ""
+            for campo, i in indices.items()
+        }
+
+
+def leer_ofx(lineas: Iterable[str]) -> Iterator[dict]:
+    """
+    Lee un extracto OFX (SGML o XML) y produce una fila por transacción.
+    
+    Args:
+        lineas: Líneas de texto del archivo
+        
+    Yields:
+        Diccionarios con fecha, nombre y valor (con signo) de cada STMTTRN
+        
+    Nota:
+        Procesa etiqueta a etiqueta, así que funciona tanto con una etiqueta
+        por línea como con el archivo entero en una sola línea.
+    """
+    transaccion = None
+    
+    for linea in lineas:
+        for cierre, etiqueta, valor in _ETIQUETA_OFX.findall(linea):
+            etiqueta = etiqueta.upper()
+            if etiqueta == "STMTTRN":
+                if cierre and transaccion is not None:
+                    yield {
+                        "fecha": transaccion.get("DTPOSTED", ""),
+                        "nombre": transaccion.get("NAME") or transaccion.get("MEMO", ""),
+                        "valor": transaccion.get("TRNAMT", ""),
+                    }
+                    transaccion = None
+                elif not cierre:
+                    transaccion = {}
+            elif transaccion is not None and not cierre and valor.strip():
+                transaccion[etiqueta] = valor.strip()
+
+
+def _construir_desde_fila(fila: dict, usuario_id: str) -> tuple[dict | None, str]:
+    """
+    Valida una fila normalizada y construye su documento de movimiento.
+    
+    Returns:
+        Tupla (documento, "") si es válida, o (None, mensaje_error)
+        
+    Lógica de negocio:
+        - Sin columna tipo, el signo del valor decide: positivo es ingreso,
+          negativo es gasto (convención de los extractos bancarios)
+        - El valor se guarda siempre en positivo
+    """
+    try:
+        valor = _parsear_numero(fila.get("valor", ""))
+        monto_total = _parsear_numero(fila.get("monto_total", ""))
+        mensualidad = _parsear_numero(fila.get("mensualidad", ""))
+        plazo = int(_parsear_numero(fila.get("plazo", "")))
+    except (ValueError, TypeError):
+        return None, "importe no numérico"
+    
+    tipo = (fila.get("tipo") or "").strip().lower()
+    if not tipo:
+        tipo = "ingreso" if valor >= 0 else "gasto"
+    valor = abs(valor)
+    nombre = (fila.get("nombre") or "").strip()
+    
+    fecha = parsear_fecha(fila.get("fecha", ""))
+    if fecha is None:
+        return None, "fecha no reconocida"
+    
+    validacion = validar_datos_movimiento(
+        tipo=tipo,
+        nombre=nombre,
+        valor=valor,
+        monto_total=monto_total,
+        mensualidad=mensualidad,
+        plazo=plazo
+    )
+    if not validacion.es_valido:
+        return None, validacion.mensaje_error
+    
+    documento = construir_movimiento(
+        tipo=tipo,
+        nombre=nombre,
+        usuario_id=usuario_id,
+        valor=valor,
+        monto_total=monto_total,
+        mensualidad=mensualidad,
+        plazo=plazo
+    )
+    documento["fecha"] = fecha.replace(microsecond=fecha.microsecond // 1000 * 1000)
+    return documento, ""
+
+
+def construir_lotes(
+    filas: Iterable[dict],
+    usuario_id: str,
+    resultado: ResultadoImportacion,
+    tamano_lote: int = TAMANO_LOTE
+) -> Iterator[list[dict]]:
+    """
+    Agrupa filas validadas en lotes de documentos listos para insert_many.
+    
+    Args:
+        filas: Filas normalizadas (de leer_csv o leer_ofx)
+        usuario_id: ID del usuario propietario
+        resultado: Acumulador donde se registran las filas rechazadas
+        tamano_lote: Documentos por lote
+        
+    Yields:
+        Listas de como máximo tamano_lote documentos; en memoria solo vive
+        el lote actual
+    """
+    lote = []
+    for numero, fila in enumerate(filas, start=1):
+        documento, error = _construir_desde_fila(fila, usuario_id)
+        if documento is None:
+            resultado.registrar_error(numero, error)
+            continue
+        lote.append(documento)
+        if len(lote) >= tamano_lote:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+def detectar_formato(nombre_archivo: str, primera_linea: str = "") -> str:
+    """
+    Determina si un extracto es OFX o CSV.
+    
+    Returns:
+        "ofx" o "csv"
+    """
+    if nombre_archivo.lower().endswith((".ofx", ".qfx")):
+        return "ofx"
+    if primera_linea.lstrip().upper().startswith(("OFXHEADER", "<?XML", "<OFX")):
+        return "ofx"
+    return "csv"
+
+
+def guardar_en_temporal(archivo: BinaryIO) -> str:
+    """
+    Copia un extracto subido a un archivo temporal, por bloques.
+    
+    Args:
+        archivo: Archivo binario abierto (p. ej. UploadFile.file)
+        
+    Returns:
+        Ruta del archivo temporal. Quien lo procesa debe borrarlo
+        (filas_de_archivo lo hace al terminar).
+    """
+    with tempfile.NamedTemporaryFile(prefix=PREFIJO_TEMPORAL, delete=False) as temporal:
+        shutil.copyfileobj(archivo, temporal)
+        return temporal.name
+
+
+def filas_de_archivo(ruta: str, nombre_archivo: str) -> Iterator[dict]:
+    """
+    Lee un extracto guardado con guardar_en_temporal línea a línea.
+    
+    Args:
+        ruta: Ruta del archivo temporal
+        nombre_archivo: Nombre original (decide entre CSV y OFX)
+        
+    Yields:
+        Filas normalizadas de leer_csv o leer_ofx
+        
+    Nota:
+        El archivo temporal se borra al agotar o cerrar el generador.
+    """
+    try:
+        with open(ruta, encoding="utf-8-sig", errors="replace", newline="") as lineas:
+            primera_linea = next(lineas, "")
+            lineas_completas = itertools.chain([primera_linea], lineas)
+            if detectar_formato(nombre_archivo, primera_linea) == "ofx":
+                yield from leer_ofx(lineas_completas)
+            else:
+                yield from leer_csv(lineas_completas)
+    finally:
+        borrar_temporal(ruta)
+
+
+def borrar_temporal(ruta: str) -> None:
+    """Borra un extracto temporal; no falla si ya no existe."""
+    try:
+        os.unlink(ruta)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,207 @@
+"""
+Representación compacta de lotes de movimientos para procesamiento en memoria.
+
+Un LoteMovimientos guarda cada campo en una columna (array.array) en lugar de
+un objeto por movimiento. Los cálculos de balances y resúmenes recorren estas
+columnas; los modelos pydantic (Movimiento) solo se construyen al entregar
+datos a la UI (ver LoteMovimientos.a_movimientos).
+"""
+from array import array
+from collections.abc import Iterable, Iterator
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from ..models import Movimiento
+
+
+# Códigos de tipo guardados en la columna tipos (el índice es el código)
+TIPOS = ("", "ingreso", "gasto", "deuda")
+TIPO_DESCONOCIDO, TIPO_INGRESO, TIPO_GASTO, TIPO_DEUDA = range(len(TIPOS))
+CODIGOS_TIPO = {tipo: codigo for codigo, tipo in enumerate(TIPOS)}
+
+# Origen de los timestamps: fechas naive, igual que en MongoDB
+EPOCA = datetime(1970, 1, 1)
+
+# Documentos por lote al recorrer cursores
+TAMANO_LOTE = 10_000
+
+SIN_FECHA = float("nan")
+
+
+def _numero(valor, defecto: float = 0.0) -> float:
+    """Convierte un campo numérico; los valores inválidos cuentan como 0."""
+    if type(valor) is float:
+        return valor
+    try:
+        return float(valor)
+    except (ValueError, TypeError):
+        return defecto
+
+
+def _entero(valor) -> int:
+    """Convierte un campo entero (plazo); los valores inválidos cuentan como 0."""
+    if type(valor) is int and -2**31 <= valor < 2**31:
+        return valor
+    try:
+        entero = int(float(valor))
+    except (ValueError, TypeError, OverflowError):
+        return 0
+    return entero if -2**31 <= entero < 2**31 else 0
+
+
+def _timestamp(fecha) -> float:
+    """Segundos desde EPOCA de una fecha datetime o ISO string (NaN si no es válida)."""
+    if isinstance(fecha, str):
+        try:
+            fecha = datetime.fromisoformat(fecha)
+        except ValueError:
+            return SIN_FECHA
+    elif not isinstance(fecha, datetime):
+        return SIN_FECHA
+    if fecha.tzinfo is not None:
+        # Fechas con zona: al instante UTC, como las fechas naive de MongoDB
+        fecha = fecha.astimezone(timezone.utc).replace(tzinfo=None)
+    return (fecha - EPOCA).total_seconds()
+
+
+def fecha_desde_timestamp(timestamp: float) -> datetime | None:
+    """Convierte un timestamp de la columna timestamps a datetime."""
+    if timestamp != timestamp:  # NaN
+        return None
+    return EPOCA + timedelta(seconds=timestamp)
+
+
+class LoteMovimientos:
+    """
+    Lote de movimientos en columnas.
+
+    Columnas:
+        tipos: Código de tipo (ver TIPOS), array de enteros de 1 byte
+        valores, montos_totales, mensualidades: array de doubles
+        plazos: array de enteros
+        timestamps: Segundos desde EPOCA (NaN si la fecha no es válida)
+        nombres: Lista de nombres, solo si el lote se creó con con_nombres=True
+
+    Nota:
+        Los campos numéricos inválidos se guardan como 0, igual que los
+        tratan el ledger y la agregación de resúmenes.
+    """
+    __slots__ = (
+        "tipos", "valores", "montos_totales", "mensualidades", "plazos",
+        "timestamps", "nombres", "ultimo_id",
+    )
+
+    def __init__(self, con_nombres: bool = False):
+        self.tipos = array("b")
+        self.valores = array("d")
+        self.montos_totales = array("d")
+        self.mensualidades = array("d")
+        self.plazos = array("i")
+        self.timestamps = array("d")
+        self.nombres: list[str] | None = [] if con_nombres else None
+        self.ultimo_id = ""  # _id del último documento agregado
+
+    def __len__(self) -> int:
+        return len(self.tipos)
+
+    @classmethod
+    def desde_documentos(cls, docs: Iterable[dict], con_nombres: bool = False) -> "LoteMovimientos":
+        """
+        Construye un lote a partir de documentos de MongoDB.
+
+        Args:
+            docs: Documentos (dicts) de movimientos
+            con_nombres: Guardar también los nombres (necesarios para la UI)
+
+        Returns:
+            LoteMovimientos con una fila por documento
+
+        Nota:
+            Los documentos sin fecha reciben la hora actual, calculada una vez
+            por lote. Cada columna se construye de una vez, no fila a fila.
+        """
+        docs = docs if isinstance(docs, list) else list(docs)
+        lote = cls(con_nombres)
+        ahora = datetime.now()
+
+        lote.tipos = array("b", [CODIGOS_TIPO.get(doc.get("tipo", ""), TIPO_DESCONOCIDO) for doc in docs])
+        lote.valores = array("d", [_numero(doc.get("valor", 0)) for doc in docs])
+        lote.montos_totales = array("d", [_numero(doc.get("monto_total", 0)) for doc in docs])
+        lote.mensualidades = array("d", [_numero(doc.get("mensualidad", 0)) for doc in docs])
+        lote.plazos = array("i", [_entero(doc.get("plazo", 0)) for doc in docs])
+        lote.timestamps = array("d", [_timestamp(doc.get("fecha") or ahora) for doc in docs])
+        if con_nombres:
+            lote.nombres = [doc.get("nombre", "") for doc in docs]
+
+        for doc in reversed(docs):
+            if doc.get("_id") is not None:
+                lote.ultimo_id = str(doc["_id"])
+                break
+        return lote
+
+    @classmethod
+    def en_lotes(
+        cls,
+        docs: Iterable[dict],
+        tamano: int = TAMANO_LOTE,
+        con_nombres: bool = False
+    ) -> Iterator["LoteMovimientos"]:
+        """
+        Recorre documentos (p. ej. un cursor) en lotes de tamaño fijo.
+
+        Uso común:
+            - Calcular balances o resúmenes de historiales grandes sin cargar
+              todos los documentos en memoria
+            - Agrupar el feed directamente desde el cursor (con_nombres=True)
+        """
+        docs = iter(docs)
+        while True:
+            bloque = list(islice(docs, tamano))
+            if not bloque:
+                return
+            yield cls.desde_documentos(bloque, con_nombres)
+
+    def a_movimientos(self) -> list[Movimiento]:
+        """
+        Convierte el lote en modelos Movimiento para la UI.
+
+        Returns:
+            Lista de Movimiento con la hora (HH:MM:SS) y la fecha ISO completa
+
+        Nota:
+            Requiere un lote creado con con_nombres=True.
+        """
+        return [movimiento for _, movimiento in self.iterar_movimientos()]
+
+    def iterar_movimientos(self) -> Iterator[tuple[float, Movimiento]]:
+        """
+        Recorre el lote construyendo cada Movimiento junto a su timestamp.
+
+        Returns:
+            Pares (timestamp, Movimiento) en el orden del lote; el timestamp
+            es el de la columna timestamps (NaN si la fecha no es válida)
+
+        Uso común:
+            - Agrupar por día sin volver a parsear fecha_completa
+              (ver movimiento_service.iterar_grupos_de_documentos)
+        """
+        if self.nombres is None:
+            raise ValueError("El lote no guarda nombres; crear con con_nombres=True")
+
+        for tipo, nombre, valor, monto_total, mensualidad, plazo, timestamp in zip(
+            self.tipos, self.nombres, self.valores, self.montos_totales,
+            self.mensualidades, self.plazos, self.timestamps
+        ):
+            fecha = fecha_desde_timestamp(timestamp)
+            # isoformat() siempre es "YYYY-MM-DDTHH:MM:SS[.ffffff]": la hora
+            # sale de la misma cadena, sin un strftime por fila
+            fecha_completa = fecha.isoformat() if fecha else ""
+            yield timestamp, Movimiento(
+                tipo=TIPOS[tipo],
+                nombre=nombre,
+                fecha=fecha_completa[11:19],
+                fecha_completa=fecha_completa,
+                valor=round(valor, 2),
+                monto_total=monto_total,
+                mensualidad=mensualidad,
+                plazo=plazo
+            )
@@ -0,0 +1,208 @@
+"""
+Servicio de métricas de latencia.
+Mide cuánto tardan los event handlers del State y las operaciones de los
+repositories, y exporta los histogramas en formato de texto de Prometheus.
+
+Dos familias de histogramas, en segundos:
+    - balanceate_handler_segundos{handler="login"}
+    - balanceate_db_segundos{repository="MovimientoRepositoryAsync",operacion="crear_movimiento"}
+
+Los tiempos son inclusivos: una operación que llama a otras (p. ej.
+crear_movimiento actualiza ledger, resúmenes y calendario) incluye su
+tiempo, y cada una se registra también por separado. Las métricas son por
+proceso; con varios workers, Prometheus suma las series de cada uno.
+"""
+import functools
+import inspect
+import threading
+import time
+
+# Límites superiores de los buckets (segundos), de 1 ms a 10 s
+BUCKETS_SEGUNDOS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+METRICA_HANDLER = "balanceate_handler_segundos"
+METRICA_DB = "balanceate_db_segundos"
+METRICA_ERRORES = "balanceate_errores_total"
+
+
+class Histograma:
+    """Histograma acumulativo de latencias para un conjunto de etiquetas."""
+    __slots__ = ("conteos", "suma", "total")
+
+    def __init__(self):
+        self.conteos = [0] * len(BUCKETS_SEGUNDOS)
+        self.suma = 0.0
+        self.total = 0
+
+    def observar(self, segundos: float) -> None:
+        for i, limite in enumerate(BUCKETS_SEGUNDOS):
+            if segundos <= limite:
+                self.conteos[i] += 1
+                break
+        self.suma += segundos
+        self.total += 1
+
+
+_lock = threading.Lock()
+_histogramas: dict[tuple[str, tuple[tuple[str, str], ...]], Histograma] = {}
+_errores: dict[tuple[tuple[str, str], ...], int] = {}
+
+
+def observar(metrica: str, segundos: float, error: bool = False, **etiquetas: str) -> None:
+    """
+    Registra una latencia en el histograma de metrica con esas etiquetas.
+
+    Args:
+        metrica: METRICA_HANDLER o METRICA_DB
+        segundos: Duración medida
+        error: Si la operación terminó con una excepción
+        **etiquetas: Etiquetas de la serie (handler, repository, operacion)
+    """
+    clave = tuple(sorted(etiquetas.items()))
+    with _lock:
+        histograma = _histogramas.get((metrica, clave))
+        if histograma is None:
+            histograma = _histogramas[(metrica, clave)] = Histograma()
+        histograma.observar(segundos)
+        if error:
+            clave_error = (("metrica", metrica),) + clave
+            _errores[clave_error] = _errores.get(clave_error, 0) + 1
+
+
+def _cronometrar(funcion, metrica: str, etiquetas: dict[str, str]):
+    """Envuelve una función sync o async para registrar su duración."""
+    if inspect.iscoroutinefunction(funcion):
+        @functools.wraps(funcion)
+        async def envoltura_async(*args, **kwargs):
+            inicio = time.perf_counter()
+            error = False
+            try:
+                return await funcion(*args, **kwargs)
+            except BaseException:
+                error = True
+                raise
+            finally:
+                observar(metrica, time.perf_counter() - inicio, error, **etiquetas)
+        return envoltura_async
+
+    @functools.wraps(funcion)
+    def envoltura(*args, **kwargs):
+        inicio = time.perf_counter()
+        error = False
+        try:
+            return funcion(*args, **kwargs)
+        except BaseException:
+            error = True
+            raise
+        finally:
+            observar(metrica, time.perf_counter() - inicio, error, **etiquetas)
+    return envoltura
+
+
+def medir_handler(funcion):
+    """
+    Decorador para event handlers del State.
+
+    Uso:
+        @rx.event(background=True)   # siempre por fuera
+        @medir_handler
+        async def login(self): ...
+
+    Nota:
+        En handlers en background el tiempo incluye las esperas por el
+        lock del estado dentro de `async with self`.
+    """
+    return _cronometrar(funcion, METRICA_HANDLER, {"handler": funcion.__name__})
+
+
+def medir_repository(cls):
+    """
+    Decorador de clase que mide todos los métodos estáticos de un repository.
+
+    Nota:
+        Los métodos que devuelven cursores (iterar_*) solo miden la creación
+        del cursor; el recorrido lo mide quien lo consume.
+    """
+    for nombre, atributo in list(vars(cls).items()):
+        if nombre.startswith("_") or not isinstance(atributo, staticmethod):
+            continue
+        funcion = atributo.__func__
+        if inspect.isgeneratorfunction(funcion) or inspect.isasyncgenfunction(funcion):
+            continue
+        etiquetas = {"repository": cls.__name__, "operacion": nombre}
+        setattr(cls, nombre, staticmethod(_cronometrar(funcion, METRICA_DB, etiquetas)))
+    return cls
+
+
+def _formatear_etiquetas(etiquetas: tuple[tuple[str, str], ...], extra: str = "") -> str:
+    partes = [f'{nombre}="{valor}"' for nombre, valor in etiquetas]
+    if extra:
+        partes.append(extra)
+    return "{" + ",".join(partes) + "}" if partes else ""
+
+
+def _formatear_valor(valor: float) -> str:
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+def exportar_prometheus(
+    contadores: dict[str, dict] | None = None,
+    totales: dict[str, dict] | None = None,
+) -> str:
+    """
+    Exporta las métricas en formato de texto de Prometheus (versión 0.0.4).
+
+    Args:
+        contadores: Métricas adicionales {prefijo: {nombre: valor}} que se
+            exportan como gauges (p. ej. {"balanceate_bcrypt": metricas_bcrypt()})
+        totales: Contadores monotónicos {prefijo: {nombre: valor}} que se
+            exportan como counters prefijo_nombre_total (p. ej. hits y
+            misses de la caché)
+
+    Returns:
+        Texto listo para servir con Content-Type text/plain; version=0.0.4
+    """
+    with _lock:
+        histogramas = {
+            clave: (list(h.conteos), h.suma, h.total) for clave, h in _histogramas.items()
+        }
+        errores = dict(_errores)
+
+    lineas = []
+    for metrica, descripcion in (
+        (METRICA_HANDLER, "Duración de los event handlers del State"),
+        (METRICA_DB, "Duración de las operaciones de los repositories"),
+    ):
+        series = sorted((clave, datos) for (nombre, clave), datos in histogramas.items() if nombre == metrica)
+        lineas.append(f"# HELP {metrica} {descripcion}")
+        lineas.append(f"# TYPE {metrica} histogram")
+        for etiquetas, (conteos, suma, total) in series:
+            acumulado = 0
+            for limite, conteo in zip(BUCKETS_SEGUNDOS, conteos):
+                acumulado += conteo
+                bucket = _formatear_etiquetas(etiquetas, f'le="{limite}"')
+                lineas.append(f"{metrica}_bucket{bucket} {acumulado}")
+            bucket = _formatear_etiquetas(etiquetas, 'le="+Inf"')
+            lineas.append(f"{metrica}_bucket{bucket} {total}")
+            lineas.append(f"{metrica}_sum{_formatear_etiquetas(etiquetas)} {suma!r}")
+            lineas.append(f"{metrica}_count{_formatear_etiquetas(etiquetas)} {total}")
+
+    lineas.append(f"# HELP {METRICA_ERRORES} Handlers y operaciones terminados con excepción")
+    lineas.append(f"# TYPE {METRICA_ERRORES} counter")
+    for etiquetas, cantidad in sorted(errores.items()):
+        lineas.append(f"{METRICA_ERRORES}{_formatear_etiquetas(etiquetas)} {cantidad}")
+
+    for prefijo, valores in (contadores or {}).items():
+        for nombre, valor in valores.items():
+            if isinstance(valor, (int, float)) and not isinstance(valor, bool):
+                lineas.append(f"# TYPE {prefijo}_{nombre} gauge")
+                lineas.append(f"{prefijo}_{nombre} {_formatear_valor(valor)}")
+
+    for prefijo, valores in (totales or {}).items():
+        for nombre, valor in valores.items():
+            if isinstance(valor, int) and not isinstance(valor, bool):
+                lineas.append(f"# TYPE {prefijo}_{nombre}_total counter")
+                lineas.append(f"{prefijo}_{nombre}_total {valor}")
+
+    return "\n".join(lineas) + "\n"
+
@@ -2,62 +2,227 @@
 Servicio para la lógica de negocio relacionada con los movimientos.
 Este módulo contiene funciones puras que procesan y transforman datos de movimientos.
 """
-from datetime import datetime, timedelta
+from collections.abc import Iterable, Iterator
+from datetime import date, datetime, timedelta
+from itertools import groupby
+from operator import itemgetter
 from ..models import Movimiento, GrupoMovimientos, Balance
+from .balance_service import calcular_aporte_lote
+from .lote_movimientos import EPOCA, LoteMovimientos
 
 
-def agrupar_movimientos_por_fecha(movimientos: list[Movimiento]) -> list[GrupoMovimientos]:
+ETIQUETA_HOY = "Hoy"
+ETIQUETA_AYER = "Ayer"
+ETIQUETA_FECHA_DESCONOCIDA = "Fecha desconocida"
+
+SEGUNDOS_POR_DIA = 86_400
+
+
+class EtiquetasPorDia:
+    """
+    Calcula la etiqueta de cada día una sola vez.
+
+    Lógica de negocio:
+        - El día de hoy se etiqueta como "Hoy" y el anterior como "Ayer"
+        - Otros días se etiquetan con formato DD/MM/YYYY
+        - Fechas inválidas se etiquetan como "Fecha desconocida"
+
+    Nota:
+        "Hoy" se fija al crear la instancia; se crea una por agrupación.
+    """
+    __slots__ = ("_hoy", "_por_dia", "_por_texto")
+
+    def __init__(self, hoy: date | None = None):
+        self._hoy = hoy or datetime.now().date()
+        self._por_dia: dict[int, str] = {}
+        self._por_texto: dict[str, str] = {}
+
+    def de_fecha(self, fecha: date) -> str:
+        """Etiqueta de una fecha (sin memoizar)."""
+        dias = (self._hoy - fecha).days
+        if dias == 0:
+            return ETIQUETA_HOY
+        if dias == 1:
+            return ETIQUETA_AYER
+        return fecha.strftime("%d/%m/%Y")
+
+    def de_timestamp(self, timestamp: float) -> str:
+        """Etiqueta de un timestamp de LoteMovimientos (segundos desde EPOCA)."""
+        if timestamp != timestamp:  # NaN
+            return ETIQUETA_FECHA_DESCONOCIDA
+        dia = int(timestamp // SEGUNDOS_POR_DIA)
+        etiqueta = self._por_dia.get(dia)
+        if etiqueta is None:
+            etiqueta = self._por_dia[dia] = self.de_fecha(EPOCA.date() + timedelta(days=dia))
+        return etiqueta
+
+    def de_texto(self, fecha_completa: str) -> str:
+        """Etiqueta de un fecha_completa ISO; solo se parsea su parte de fecha."""
+        clave = fecha_completa[:10]
+        etiqueta = self._por_texto.get(clave)
+        if etiqueta is None:
+            try:
+                etiqueta = self.de_fecha(date.fromisoformat(clave))
+            except (ValueError, TypeError):
+                etiqueta = ETIQUETA_FECHA_DESCONOCIDA
+            self._por_texto[clave] = etiqueta
+        return etiqueta
+
+
+def _agrupar_consecutivos(filas: Iterable[tuple[str, Movimiento]]) -> Iterator[GrupoMovimientos]:
+    """Emite un grupo por cada racha de filas (etiqueta, movimiento) con la misma etiqueta."""
+    for etiqueta, racha in groupby(filas, key=itemgetter(0)):
+        yield GrupoMovimientos(etiqueta=etiqueta, movimientos=[mov for _, mov in racha])
+
+
+def _fusionar_grupos(
+    grupos_existentes: list[GrupoMovimientos] | None,
+    nuevos: Iterable[GrupoMovimientos]
+) -> list[GrupoMovimientos]:
+    """
+    Fusiona grupos nuevos en los existentes.
+
+    Un grupo cuya etiqueta ya existe se añade al final de ese grupo; los demás
+    se añaden al final de la lista. Cada grupo fusionado se reconstruye una
+    sola vez, aunque su etiqueta aparezca en varias rachas.
+    """
+    grupos = list(grupos_existentes or [])
+    indices = {grupo.etiqueta: i for i, grupo in enumerate(grupos)}
+    fusionados: dict[int, list[Movimiento]] = {}
+
+    for grupo in nuevos:
+        i = indices.get(grupo.etiqueta)
+        if i is None:
+            indices[grupo.etiqueta] = len(grupos)
+            grupos.append(grupo)
+            continue
+        if i not in fusionados:
+            fusionados[i] = list(grupos[i].movimientos)
+        fusionados[i].extend(grupo.movimientos)
+
+    for i, movimientos in fusionados.items():
+        grupos[i] = GrupoMovimientos(etiqueta=grupos[i].etiqueta, movimientos=movimientos)
+    return grupos
+
+
+def iterar_grupos_de_documentos(
+    docs: Iterable[dict],
+    etiquetas: EtiquetasPorDia | None = None
+) -> Iterator[GrupoMovimientos]:
+    """
+    Agrupa documentos de MongoDB por día en una sola pasada.
+    
+    Args:
+        docs: Documentos (lista o cursor) ordenados por fecha descendente,
+            proyectados con PROYECCION_FEED
+        etiquetas: Memo de etiquetas a reutilizar (default uno nuevo)
+        
+    Returns:
+        Generador de GrupoMovimientos, en el orden de los documentos
+        
+    Nota:
+        Cada fecha se parsea una vez (al construir el LoteMovimientos) y cada
+        día se etiqueta una vez. Se emite un grupo por cada racha de días
+        iguales; con el orden del feed cada día forma una sola racha (las
+        fechas inválidas pueden formar más de una, ver _fusionar_grupos).
+    """
+    etiquetas = etiquetas or EtiquetasPorDia()
+    filas = (
+        (etiquetas.de_timestamp(timestamp), movimiento)
+        for lote in LoteMovimientos.en_lotes(docs, con_nombres=True)
+        for timestamp, movimiento in lote.iterar_movimientos()
+    )
+    return _agrupar_consecutivos(filas)
+
+
+def agrupar_documentos_por_fecha(
+    docs: Iterable[dict],
+    grupos_existentes: list[GrupoMovimientos] | None = None
+) -> list[GrupoMovimientos]:
+    """
+    Convierte y agrupa por fecha una página del feed.
+    
+    Args:
+        docs: Documentos (lista o cursor) ordenados por fecha descendente
+        grupos_existentes: Grupos ya construidos (p. ej. páginas anteriores del
+            feed). Si se indican, los grupos nuevos se fusionan en ellos.
+        
+    Returns:
+        Lista de GrupoMovimientos con etiquetas "Hoy", "Ayer" o fecha formateada
+        
+    Uso común:
+        - Primera página y scroll infinito del feed (state.py)
+    """
+    return _fusionar_grupos(grupos_existentes, iterar_grupos_de_documentos(docs))
+
+
+def agrupar_movimientos_por_fecha(
+    movimientos: list[Movimiento],
+    grupos_existentes: list[GrupoMovimientos] | None = None
+) -> list[GrupoMovimientos]:
     """
     Agrupa una lista de movimientos por fecha con etiquetas amigables.
     
     Args:
         movimientos: Lista de movimientos a agrupar
+        grupos_existentes: Grupos ya construidos (p. ej. páginas anteriores del
+            feed). Si se indican, los movimientos nuevos se fusionan en ellos
+            sin reagrupar la lista completa.
         
     Returns:
         Lista de GrupoMovimientos con etiquetas "Hoy", "Ayer" o fecha formateada
         
     Lógica de negocio:
-        - Movimientos de hoy se etiquetan como "Hoy"
-        - Movimientos de ayer se etiquetan como "Ayer"
-        - Otros movimientos se etiquetan con formato DD/MM/YYYY
-        - Movimientos con fecha inválida se agrupan bajo "Fecha desconocida"
+        - Etiquetas según EtiquetasPorDia
+        - Un movimiento cuya etiqueta ya existe se añade al final de ese grupo
+        
+    Nota:
+        Para documentos de MongoDB usar agrupar_documentos_por_fecha, que no
+        vuelve a parsear fecha_completa.
     """
     if not movimientos:
-        return []
+        return list(grupos_existentes or [])
     
-    hoy = datetime.now().date()
-    ayer = hoy - timedelta(days=1)
-    grupos_dict = {}
+    etiquetas = EtiquetasPorDia()
+    filas = ((etiquetas.de_texto(mov.fecha_completa), mov) for mov in movimientos)
+    return _fusionar_grupos(grupos_existentes, _agrupar_consecutivos(filas))
+
+
+def anteponer_movimiento_a_grupos(
+    grupos: list[GrupoMovimientos],
+    movimiento: Movimiento
+) -> list[GrupoMovimientos]:
+    """
+    Inserta un movimiento recién creado al inicio del feed agrupado.
     
-    for mov in movimientos:
-        try:
-            fecha_obj = datetime.fromisoformat(mov.fecha_completa).date()
-            
-            # Determinar etiqueta según reglas de negocio
-            if fecha_obj == hoy:
-                etiqueta = "Hoy"
-            elif fecha_obj == ayer:
-                etiqueta = "Ayer"
-            else:
-                etiqueta = fecha_obj.strftime("%d/%m/%Y")
-            
-            if etiqueta not in grupos_dict:
-                grupos_dict[etiqueta] = []
-            grupos_dict[etiqueta].append(mov)
-        except:
-            # Si hay error al parsear, agrupar como "Fecha desconocida"
-            if "Fecha desconocida" not in grupos_dict:
-                grupos_dict["Fecha desconocida"] = []
-            grupos_dict["Fecha desconocida"].append(mov)
+    Args:
+        grupos: Grupos actuales, ordenados del más reciente al más antiguo
+        movimiento: Movimiento nuevo (el más reciente de todos)
+        
+    Returns:
+        Nueva lista de grupos con el movimiento al principio de su grupo
+        
+    Lógica de negocio:
+        - Si el primer grupo tiene la misma etiqueta ("Hoy" normalmente),
+          el movimiento se antepone en ese grupo
+        - Si no, se crea un grupo nuevo al inicio
+        - Solo se reconstruye el primer grupo: O(1) grupos por alta
+    """
+    nuevo_grupo = agrupar_movimientos_por_fecha([movimiento])[0]
     
-    # Convertir dict a lista de GrupoMovimientos
-    grupos = []
-    for etiqueta, movs in grupos_dict.items():
-        grupos.append(
-            GrupoMovimientos(etiqueta=etiqueta, movimientos=movs)
+    if grupos and grupos[0].etiqueta == nuevo_grupo.etiqueta:
+        primero = GrupoMovimientos(
+            etiqueta=nuevo_grupo.etiqueta,
+            movimientos=[movimiento] + grupos[0].movimientos
         )
+        return [primero] + grupos[1:]
     
-    return grupos
+    return [nuevo_grupo] + grupos
+
+
+def contar_movimientos_agrupados(grupos: list[GrupoMovimientos]) -> int:
+    """Cuenta los movimientos de un feed agrupado."""
+    return sum(len(grupo.movimientos) for grupo in grupos)
 
 
 def calcular_balance_desde_documentos(docs: list[dict], usuario_id: str) -> Balance:
@@ -77,42 +242,16 @@ def calcular_balance_desde_documentos(docs: list[dict], usuario_id: str) -> Bala
         - Balance real: disponible menos deudas pendientes
         - Las deudas NO afectan el balance disponible directamente
     """
-    balance_total = 0.0
-    deudas_pendientes = 0.0
-    
-    for doc in docs:
-        try:
-            tipo = doc.get("tipo", "")
-            
-            # Calcular balance disponible (ingresos - gastos)
-            if tipo == "ingreso":
-                valor = float(doc.get("valor", 0))
-                balance_total += valor
-            elif tipo == "gasto":
-                valor = float(doc.get("valor", 0))
-                balance_total -= valor
-            
-            # Acumular deudas pendientes (monto total de cada deuda)
-            if tipo == "deuda":
-                monto_total = float(doc.get("monto_total", 0))
-                deudas_pendientes += monto_total
-                
-        except (ValueError, TypeError):
-            # Ignorar documentos con datos inválidos
-            continue
-    
-    # Validar que el balance sea un número válido
-    if not isinstance(balance_total, (int, float)):
-        balance_total = 0.0
+    lote = LoteMovimientos.desde_documentos(docs)
+    disponible, deudas_pendientes = calcular_aporte_lote(lote)
     
     # Calcular los 3 tipos de balance
-    disponible = float(balance_total)
     balance_real = disponible - deudas_pendientes
     
     # Crear objeto Balance con todos los campos
     return Balance(
         usuario_id=usuario_id,
-        total=float(balance_total),  # Mantener compatible con UI actual
+        total=disponible,  # Mantener compatible con UI actual
         ultima_actualizacion=datetime.now().isoformat(),
         disponible=disponible,
         deudas_pendientes=deudas_pendientes,
@@ -131,59 +270,18 @@ def convertir_documentos_a_movimientos(docs: list[dict]) -> list[Movimiento]:
         Lista de objetos Movimiento con datos validados y formateados
         
     Transformaciones aplicadas:
-        - Extrae y valida campos del documento MongoDB
+        - Extrae los campos del documento MongoDB (se espera que vengan
+          proyectados con PROYECCION_FEED) a un LoteMovimientos
         - Formatea la fecha en formato HH:MM:SS para visualización
         - Redondea valores a 2 decimales
         - Maneja campos opcionales de deuda (monto_total, mensualidad, plazo)
-        - Ignora documentos con datos inválidos
+        - Los campos numéricos inválidos se muestran como 0
+        
+    Nota:
+        Es la frontera con la UI: el resto de cálculos trabaja sobre
+        LoteMovimientos y no construye modelos pydantic.
     """
-    movimientos = []
-    
-    for doc in docs:
-        try:
-            # Extraer campos básicos
-            valor = float(doc.get("valor", 0))
-            tipo = doc.get("tipo", "")
-            nombre = doc.get("nombre", "")
-            fecha = doc.get("fecha", datetime.now().isoformat())
-            usuario_id = doc.get("usuario_id", "")
-            
-            # Formatear la fecha para mostrar solo hora (HH:MM:SS)
-            try:
-                fecha_obj = datetime.fromisoformat(fecha)
-                hora_formateada = fecha_obj.strftime("%H:%M:%S")
-            except:
-                hora_formateada = fecha
-            
-            # Validar y formatear el valor
-            if not isinstance(valor, (int, float)):
-                valor = 0.0
-            valor_formateado = round(float(valor), 2)
-            
-            # Cargar campos adicionales para deudas
-            monto_total = float(doc.get("monto_total", 0.0))
-            mensualidad = float(doc.get("mensualidad", 0.0))
-            plazo = int(doc.get("plazo", 0))
-            
-            # Crear objeto Movimiento
-            movimientos.append(
-                Movimiento(
-                    tipo=tipo,
-                    nombre=nombre,
-                    fecha=hora_formateada,  # Solo hora para mostrar
-                    fecha_completa=fecha,  # Fecha completa ISO para agrupar
-                    valor=str(valor_formateado),  # String para evitar problemas de formato
-                    usuario_id=usuario_id,
-                    monto_total=monto_total,
-                    mensualidad=mensualidad,
-                    plazo=plazo
-                )
-            )
-        except (ValueError, TypeError):
-            # Ignorar documentos con datos inválidos
-            continue
-    
-    return movimientos
+    return LoteMovimientos.desde_documentos(docs, con_nombres=True).a_movimientos()
 
 
 class ResultadoValidacion:
@@ -305,11 +403,13 @@ def construir_movimiento(
         - Para deuda: usa 'mensualidad' como 'valor' (para compatibilidad en visualización)
         - Todos los movimientos tienen los mismos campos para consistencia
     """
-    # Campos base que todos los movimientos tienen
+    # Campos base que todos los movimientos tienen.
+    # fecha se guarda como datetime (BSON Date, precisión de milisegundos)
+    ahora = datetime.now()
     movimiento = {
         "tipo": tipo,
         "nombre": nombre,
-        "fecha": datetime.now().isoformat(),
+        "fecha": ahora.replace(microsecond=ahora.microsecond // 1000 * 1000),
         "usuario_id": usuario_id
     }
     
@@ -0,0 +1,106 @@
+"""
+Servicio de reconciliación del ledger de balances.
+
+El balance de cada usuario se mantiene materializado en la colección balances
+y se actualiza con $inc en cada alta, edición o baja de movimientos
+(ver BalanceRepository.aplicar_movimiento); lo mismo ocurre con los resúmenes
+mensuales (ResumenRepository), y los calendarios de deudas
+(CalendarioRepository) se generan al crear cada deuda. Este módulo recalcula
+todo desde el historial completo para corregir desviaciones o migrar
+documentos antiguos. Es un trabajo de fondo: no se ejecuta en el camino de
+cada request.
+
+Uso:
+    python -m Balanceate.services.reconciliacion_service [usuario_id ...]
+"""
+import logging
+import sys
+from ..db.balance_repository import BalanceRepository
+from ..db.calendario_repository import CalendarioRepository
+from ..db.movimiento_repository import MovimientoRepository
+from ..db.resumen_repository import ResumenRepository
+from ..models import Balance
+from . import balance_service
+
+logger = logging.getLogger(__name__)
+
+# Recálculos antes de rendirse si el ledger cambia durante cada lectura
+INTENTOS_RECONCILIACION = 5
+
+
+def reconciliar_balance_usuario(usuario_id: str) -> Balance:
+    """
+    Recalcula y guarda el ledger de un usuario a partir de sus movimientos.
+    
+    Args:
+        usuario_id: ID del usuario
+        
+    Returns:
+        Objeto Balance recalculado (persistido salvo conflicto persistente)
+        
+    Nota:
+        El recálculo lee un cursor; un $inc que llegue mientras tanto se
+        perdería con un $set ciego. Por eso se guarda solo si la versión del
+        ledger no cambió desde antes de la lectura, y si cambió se recalcula
+        (hasta INTENTOS_RECONCILIACION veces). Si todos los intentos chocan,
+        el ledger se deja como está: sigue recibiendo los deltas y la
+        próxima reconciliación lo corrige.
+    """
+    for _ in range(INTENTOS_RECONCILIACION):
+        version = BalanceRepository.obtener_version(usuario_id)
+        docs = MovimientoRepository.iterar_movimientos_por_usuario(usuario_id)
+        balance = balance_service.calcular_balance_completo(docs, usuario_id)
+        
+        guardado = BalanceRepository.reemplazar_si_version(
+            usuario_id,
+            {
+                "total": balance.total,
+                "disponible": balance.disponible,
+                "deudas_pendientes": balance.deudas_pendientes,
+                "balance_real": balance.balance_real,
+                "total_movimientos": balance.total_movimientos,
+                "ultimo_movimiento_id": balance.ultimo_movimiento_id,
+                "ultima_actualizacion": balance.ultima_actualizacion
+            },
+            version
+        )
+        if guardado:
+            return balance
+    
+    logger.warning(
+        "Ledger de %s modificado durante %d reconciliaciones; no se guardó",
+        usuario_id, INTENTOS_RECONCILIACION
+    )
+    return balance
+
+
+def reconciliar_todos() -> int:
+    """
+    Reconcilia el ledger, los resúmenes mensuales y los calendarios de
+    deudas de todos los usuarios con balance registrado.
+    
+    Returns:
+        Número de ledgers reconciliados
+    """
+    reconciliados = 0
+    for balance_doc in BalanceRepository.obtener_todos_los_balances(limit=0):
+        usuario_id = balance_doc.get("usuario_id", "")
+        if not usuario_id:
+            continue
+        reconciliar_balance_usuario(usuario_id)
+        ResumenRepository.recalcular_por_usuario(usuario_id)
+        CalendarioRepository.reconstruir_por_usuario(usuario_id)
+        reconciliados += 1
+    return reconciliados
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        for usuario_id in sys.argv[1:]:
+            balance = reconciliar_balance_usuario(usuario_id)
+            ResumenRepository.recalcular_por_usuario(usuario_id)
+            CalendarioRepository.reconstruir_por_usuario(usuario_id)
+            print(f"✅ {usuario_id}: disponible=${balance.disponible:.2f}, "
+                  f"movimientos={balance.total_movimientos}")
+    else:
+        print(f"✅ Ledgers reconciliados: {reconciliar_todos()}")
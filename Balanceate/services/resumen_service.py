@@ -0,0 +1,121 @@
+"""
+Servicio para la lógica de negocio de los resúmenes mensuales.
+Este módulo contiene funciones puras que determinan cómo aporta cada
+movimiento al resumen de su mes.
+"""
+from datetime import datetime, timezone
+from ..models import ResumenMensual
+from . import calculo_vectorizado
+from .lote_movimientos import LoteMovimientos
+
+
+# Campo del resumen que acumula cada tipo de movimiento
+CAMPOS_POR_TIPO = {
+    "ingreso": "ingresos",
+    "gasto": "gastos",
+    "deuda": "deudas",
+}
+
+
+def clave_mes(fecha: datetime | str) -> str:
+    """
+    Obtiene la clave de mes (YYYY-MM) de la fecha de un movimiento.
+    
+    Args:
+        fecha: Fecha del movimiento (datetime o ISO string sin migrar)
+        
+    Returns:
+        Mes en formato YYYY-MM, o "" si la fecha no es válida
+        
+    Nota:
+        Sigue las mismas reglas que LoteMovimientos (ver _timestamp): los
+        strings se parsean como ISO y las fechas con zona se pasan a UTC.
+    """
+    if isinstance(fecha, str):
+        try:
+            fecha = datetime.fromisoformat(fecha)
+        except ValueError:
+            return ""
+    if not isinstance(fecha, datetime):
+        return ""
+    if fecha.tzinfo is not None:
+        fecha = fecha.astimezone(timezone.utc).replace(tzinfo=None)
+    return f"{fecha.year:04d}-{fecha.month:02d}"
+
+
+def calcular_aporte_resumen(doc: dict) -> dict[str, float]:
+    """
+    Calcula cuánto aporta un movimiento al resumen de su mes.
+    
+    Args:
+        doc: Documento (dict) del movimiento
+        
+    Returns:
+        Diccionario {campo: incremento} listo para un $inc. Vacío si el
+        movimiento tiene un tipo desconocido.
+        
+    Lógica de negocio:
+        - Ingreso: suma su valor a "ingresos"
+        - Gasto: suma su valor a "gastos"
+        - Deuda: suma su monto total a "deudas" (deuda nueva del mes)
+        - Todos suman 1 a "movimientos"
+        - Un importe inválido cuenta como 0, pero el movimiento se cuenta
+          igual (como en LoteMovimientos y en la agregación $group)
+    """
+    tipo = doc.get("tipo", "")
+    campo = CAMPOS_POR_TIPO.get(tipo)
+    if not campo:
+        return {}
+    
+    try:
+        monto = float(doc.get("monto_total" if tipo == "deuda" else "valor", 0))
+    except (ValueError, TypeError):
+        monto = 0.0
+    
+    return {campo: monto, "movimientos": 1}
+
+
+def calcular_resumenes_lote(lote: LoteMovimientos) -> dict[str, dict[str, float]]:
+    """
+    Acumula por mes el aporte de un lote de movimientos.
+    
+    Args:
+        lote: LoteMovimientos en columnas
+        
+    Returns:
+        Diccionario {mes YYYY-MM: {campo: incremento}} con las mismas reglas
+        que calcular_aporte_resumen. Las filas sin fecha o con tipo
+        desconocido se ignoran.
+        
+    Nota:
+        Se calcula vectorizado (ver calculo_vectorizado);
+        calcular_aporte_resumen es la referencia escalar.
+    """
+    return calculo_vectorizado.calcular_lote(lote).por_mes
+
+
+def resumenes_desde_documentos(docs: list[dict]) -> list[ResumenMensual]:
+    """
+    Convierte documentos de resumenes_mensuales en modelos para la UI.
+    
+    Args:
+        docs: Documentos (dicts) de resumenes_mensuales, ordenados por mes
+        
+    Returns:
+        Lista de ResumenMensual en el mismo orden, con importes redondeados
+        a 2 decimales y el mes como MM/YYYY
+    """
+    resumenes = []
+    for doc in docs:
+        mes = doc.get("mes", "")
+        ingresos = round(float(doc.get("ingresos", 0) or 0), 2)
+        gastos = round(float(doc.get("gastos", 0) or 0), 2)
+        resumenes.append(ResumenMensual(
+            mes=f"{mes[5:7]}/{mes[:4]}" if len(mes) == 7 else mes,
+            ingresos=ingresos,
+            gastos=gastos,
+            deudas=round(float(doc.get("deudas", 0) or 0), 2),
+            neto=round(ingresos - gastos, 2),
+            movimientos=int(doc.get("movimientos", 0) or 0),
+        ))
+    return resumenes
@@ -1,12 +1,19 @@
+import asyncio
+import logging
 import os
 import reflex as rx
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
-from Balanceate.db.usuario_repository import UsuarioRepository
-from Balanceate.db.movimiento_repository import MovimientoRepository
-from Balanceate.db.balance_repository import BalanceRepository
-from Balanceate.models import Usuario, Movimiento, GrupoMovimientos, Balance
+from Balanceate.db.usuario_repository import UsuarioRepositoryAsync
+from Balanceate.db.movimiento_repository import MovimientoRepositoryAsync
+from Balanceate.db.balance_repository import BalanceRepositoryAsync
+from Balanceate.db.calendario_repository import CalendarioRepositoryAsync, deudas_de_sesion
+from Balanceate.db.resumen_repository import ResumenRepositoryAsync
+from Balanceate.db import migracion_fechas
+from Balanceate.models import Usuario, GrupoMovimientos, Balance, ResumenMensual
 from Balanceate.services import auth_service, movimiento_service, balance_service, validacion_service
+from Balanceate.services import reconciliacion_service, importacion_service, resumen_service
+from Balanceate.services.metricas_service import medir_handler
 
 # Nueva clase AppState con persistencia usando rx.LocalStorage
 class AppState(rx.State):
@@ -22,6 +29,14 @@ class AppState(rx.State):
 
 load_dotenv()  # Cargar variables de entorno desde .env
 
+logger = logging.getLogger(__name__)
+
+# Tamaño de página del feed de movimientos (scroll infinito)
+MOVIMIENTOS_POR_PAGINA = 50
+
+# Meses que muestra el resumen mensual de /config
+MESES_RESUMEN = 12
+
 class State(AppState):
     """Estado global de la aplicación que extiende AppState para persistencia."""
     # Estado de autenticación
@@ -33,32 +48,55 @@ class State(AppState):
     nombre_registro: str = ""
     error_mensaje: str = ""
 
-    def on_load(self):
+    # Token con el que ya se hidrató esta sesión (solo backend)
+    _token_hidratado: str = ""
+
+    @medir_handler
+    async def on_load(self):
         """Se ejecuta cuando se carga la página - verifica sesión persistente."""
-        print("🔄 on_load ejecutándose...")  # Debug
-        print(f"🔑 Token en localStorage: {self.auth_token[:20] if self.auth_token else 'VACÍO'}...")  # Debug
-        
         if self.auth_token:
-            print("✅ Token encontrado, verificando validez...")  # Debug
+            # Navegación dentro de una sesión viva: los datos ya están cargados
+            if self.usuario_actual and self._token_hidratado == self.auth_token:
+                logger.debug("on_load: sesión ya hidratada, se omite la recarga")
+                return
+            
             usuario_id = auth_service.verificar_token(self.auth_token)
             if usuario_id:
-                print(f"✅ Token válido para usuario: {usuario_id}")  # Debug
-                self.cargar_usuario_por_id(usuario_id)
-                print("✅ Sesión restaurada exitosamente")  # Debug
+                await self.cargar_usuario_por_id(usuario_id)
+                if self.usuario_actual:
+                    self._token_hidratado = self.auth_token
+                logger.debug("on_load: sesión restaurada para %s", usuario_id)
             else:
-                print("❌ Token inválido, limpiando localStorage...")  # Debug
+                logger.debug("on_load: token inválido, se limpia localStorage")
                 # Token inválido, limpiar localStorage
                 self.auth_token = ""
+                self._token_hidratado = ""
         else:
-            print("ℹ️ No hay token en localStorage")  # Debug
+            logger.debug("on_load: sin token en localStorage")
     
     # Estado de la aplicación
     balance: Balance = Balance(usuario_id="", total=0.0, ultima_actualizacion=datetime.now().isoformat())
-    movimientos: list[Movimiento] = []
-    movimientos_agrupados: list[GrupoMovimientos] = []  # Lista de grupos pre-procesada
+    # Deudas según su calendario de pagos (ver CalendarioRepository)
+    deuda_pendiente_hoy: float = 0.0
+    pagos_deuda_mes: float = 0.0
+    # Feed agrupado por fecha: cada movimiento se guarda una sola vez, dentro de su grupo
+    movimientos_agrupados: list[GrupoMovimientos] = []
+    hay_mas_movimientos: bool = False  # Quedan páginas por cargar en el feed
+    cargas_feed: int = 0  # Llamadas terminadas a cargar_mas_movimientos (las observa el scroll infinito)
+    # Cursor keyset (fecha, _id) del último movimiento cargado (solo backend)
+    _cursor_fecha: datetime | str = ""
+    _cursor_id: str = ""
     nombre: str = ""
     valor: float = 0.0
     
+    # Resultado de la última importación de extractos
+    importacion_mensaje: str = ""
+    # Extractos subidos pendientes de importar: (nombre de archivo, ruta temporal)
+    _importacion_pendiente: list[tuple[str, str]] = []
+    
+    # Últimos meses de resumenes_mensuales (se cargan al abrir /config)
+    resumenes_mensuales: list[ResumenMensual] = []
+    
     # Control de formularios dinámicos
     tipo_seleccionado: str = ""  # "ingreso", "gasto", "deuda" o "" para ninguno
     
@@ -109,46 +147,59 @@ class State(AppState):
         except (ValueError, TypeError):
             self.plazo = 0
 
-    def _cargar_balance_usuario(self, usuario_id: str):
+    async def _cargar_balance_usuario(self, usuario_id: str):
         """
         Helper privado para cargar el balance de un usuario.
         Evita duplicación de código entre login y cargar_usuario_por_id.
+        
+        Lee el ledger materializado con un único find_one.
         """
-        balance_doc = BalanceRepository.obtener_balance_por_usuario(usuario_id)
-        if balance_doc:
-            self.balance = Balance(
-                usuario_id=usuario_id,
-                total=float(balance_doc["total"]),
-                ultima_actualizacion=balance_doc["ultima_actualizacion"]
-            )
-            print(f"💰 Balance cargado: ${balance_doc['total']}")  # Debug
+        balance_doc = await BalanceRepositoryAsync.obtener_balance_por_usuario(usuario_id)
+        await self._aplicar_balance_documento(usuario_id, balance_doc)
+
+    async def _aplicar_balance_documento(
+        self,
+        usuario_id: str,
+        balance_doc: dict | None,
+        deudas: tuple[float, float] | None = None,
+    ):
+        """
+        Helper privado que construye self.balance a partir del documento del ledger.
+        Si el usuario aún no tiene ledger (documentos anteriores al ledger),
+        se reconcilia una vez.
+        
+        deudas es (deuda pendiente, pagos del mes) si ya vinieron con la
+        sesión; si no, o si se reconcilió (reconstruye el calendario), se leen.
+        """
+        if balance_doc and "disponible" in balance_doc:
+            self.balance = balance_service.balance_desde_documento(balance_doc, usuario_id)
         else:
-            self.balance = balance_service.crear_balance_inicial(usuario_id)
-            print("💰 Balance inicial creado")  # Debug
-
-    def actualizar_balance(self, valor: float, tipo: str):
-        """Actualiza el balance según el tipo de movimiento usando el servicio."""
-        # Asegurarse de que self.balance sea un objeto Balance
-        if not isinstance(self.balance, Balance):
-            self.balance = balance_service.crear_balance_inicial(
-                self.usuario_actual.id if self.usuario_actual else ""
+            # Trabajo O(n) poco frecuente: fuera del event loop
+            self.balance = await asyncio.to_thread(
+                reconciliacion_service.reconciliar_balance_usuario, usuario_id
             )
+            logger.info("Balance de %s reconciliado desde movimientos", usuario_id)
+            deudas = None
         
-        # Usar el servicio para actualizar incrementalmente
-        self.balance = balance_service.actualizar_balance_incremental(
-            self.balance, valor, tipo
-        )
-        
-        # Actualizar en la base de datos
-        BalanceRepository.actualizar_balance_por_usuario(
-            self.usuario_actual.id,
-            {
-                "total": self.balance.total,
-                "ultima_actualizacion": self.balance.ultima_actualizacion
-            }
+        if deudas is None:
+            await self._cargar_deudas_usuario(usuario_id)
+        else:
+            self.deuda_pendiente_hoy, self.pagos_deuda_mes = deudas
+
+    async def _cargar_deudas_usuario(self, usuario_id: str):
+        """
+        Helper privado que lee la deuda pendiente hoy y los pagos del mes.
+        Son dos lecturas indexadas sobre calendario_deudas, sin recalcular calendarios.
+        """
+        pendiente, pagos = await asyncio.gather(
+            CalendarioRepositoryAsync.obtener_deuda_pendiente(usuario_id),
+            CalendarioRepositoryAsync.obtener_pagos_del_mes(usuario_id),
         )
+        self.deuda_pendiente_hoy = pendiente
+        self.pagos_deuda_mes = round(sum(pago.get("monto", 0) for pago in pagos), 2)
 
-    def agregar_movimiento(self, tipo: str):
+    @medir_handler
+    async def agregar_movimiento(self, tipo: str):
         """Agrega un nuevo movimiento y actualiza el balance."""
         if not self.usuario_actual:
             return
@@ -179,12 +230,23 @@ class State(AppState):
                 plazo=self.plazo
             )
             
-            # Guardar en la base de datos
-            MovimientoRepository.crear_movimiento(nuevo_movimiento)
+            # Guardar en la base de datos (el repository actualiza el ledger)
+            movimiento_id = await MovimientoRepositoryAsync.crear_movimiento(nuevo_movimiento)
+            
+            # Aplicar el mismo delta del ledger al balance en memoria
+            self.balance = balance_service.aplicar_movimiento_a_balance(
+                self.balance, nuevo_movimiento, movimiento_id
+            )
             
-            # Actualizar el balance (solo para ingreso/gasto)
-            if tipo in ["ingreso", "gasto"]:
-                self.actualizar_balance(float(self.valor), tipo)
+            if tipo == "deuda":
+                await self._cargar_deudas_usuario(self.usuario_actual.id)
+            
+            # Anteponer el movimiento al feed sin releer la página
+            movimiento = movimiento_service.convertir_documentos_a_movimientos([nuevo_movimiento])
+            if movimiento:
+                self.movimientos_agrupados = movimiento_service.anteponer_movimiento_a_grupos(
+                    self.movimientos_agrupados, movimiento[0]
+                )
             
             # Limpiar campos
             self.nombre = ""
@@ -194,36 +256,188 @@ class State(AppState):
             self.plazo = 0
             self.tipo_seleccionado = ""  # Ocultar formulario
             
-            # Recargar movimientos
-            self.cargar_movimientos()
-            
         except (ValueError, TypeError) as e:
             self.error_mensaje = f"Error al agregar movimiento: {str(e)}"
 
-    def cargar_movimientos(self):
-        """Carga datos desde MongoDB y actualiza balance."""
-        # Limitar los resultados para mejorar performance
-        docs = MovimientoRepository.buscar_movimientos_por_usuario(
+    async def _cargar_pagina_movimientos(self) -> list[dict]:
+        """
+        Helper privado que trae la siguiente página del feed y avanza el cursor.
+        Pide un documento extra para saber si quedan más páginas.
+        """
+        docs = await MovimientoRepositoryAsync.buscar_pagina_movimientos_por_usuario(
             self.usuario_actual.id if self.usuario_actual else "",
-            limit=100
+            limit=MOVIMIENTOS_POR_PAGINA + 1,
+            cursor_fecha=self._cursor_fecha,
+            cursor_id=self._cursor_id
         )
+        return self._procesar_pagina_movimientos(docs)
+
+    def _procesar_pagina_movimientos(self, docs: list[dict]) -> list[dict]:
+        """
+        Helper privado que avanza el cursor con una página ya leída
+        (MOVIMIENTOS_POR_PAGINA + 1 documentos como máximo) y devuelve
+        los documentos de la página.
+        """
+        self.hay_mas_movimientos = len(docs) > MOVIMIENTOS_POR_PAGINA
+        docs = docs[:MOVIMIENTOS_POR_PAGINA]
+        if docs:
+            self._cursor_fecha = docs[-1].get("fecha", "")
+            self._cursor_id = str(docs[-1]["_id"])
+        return docs
+
+    @medir_handler
+    async def cargar_movimientos(self):
+        """Carga la primera página de movimientos desde MongoDB."""
+        self._cursor_fecha = ""
+        self._cursor_id = ""
+        self._mostrar_primera_pagina(await self._cargar_pagina_movimientos())
+
+    def _mostrar_primera_pagina(self, docs: list[dict]):
+        """Helper privado que reemplaza el feed por su primera página."""
+        # Convertir y agrupar por fecha en una sola pasada
+        self.movimientos_agrupados = movimiento_service.agrupar_documentos_por_fecha(docs)
+
+    @medir_handler
+    async def cargar_mas_movimientos(self):
+        """
+        Agrega la siguiente página al feed (scroll infinito).
         
-        # Convertir documentos a objetos Movimiento usando el servicio
-        self.movimientos = movimiento_service.convertir_documentos_a_movimientos(docs)
+        Incrementa cargas_feed al terminar, incluso si no hay página o la
+        lectura falla, para que el script del feed vuelva a habilitar la
+        carga automática.
+        """
+        try:
+            if not self.usuario_actual or not self.hay_mas_movimientos:
+                return
+            
+            nuevos = await self._cargar_pagina_movimientos()
+            
+            # Fusionar solo la página nueva en los grupos existentes
+            self.movimientos_agrupados = movimiento_service.agrupar_documentos_por_fecha(
+                nuevos, self.movimientos_agrupados
+            )
+        finally:
+            self.cargas_feed += 1
+
+
+
+    @medir_handler
+    async def importar_movimientos(self, files: list[rx.UploadFile]):
+        """
+        Recibe extractos bancarios CSV u OFX y lanza su importación.
         
-        # Agrupar movimientos por fecha usando el servicio
-        self.movimientos_agrupados = movimiento_service.agrupar_movimientos_por_fecha(self.movimientos)
+        Reflex no admite handlers de upload en background, así que este solo
+        copia cada archivo a un temporal (por bloques, fuera del event loop),
+        guarda sus rutas en un var de backend y encadena procesar_importacion,
+        que los lee línea a línea sin retener el lock del estado. En el
+        estado solo viajan las rutas, nunca el contenido.
+        """
+        if not self.usuario_actual:
+            return
         
-        # Calcular balance usando el servicio de balances
-        self.balance = balance_service.calcular_balance_completo(
-            docs, 
-            self.usuario_actual.id if self.usuario_actual else ""
-        )
+        for _, ruta in self._importacion_pendiente:
+            importacion_service.borrar_temporal(ruta)
+        pendientes = []
+        for archivo in files:
+            ruta = await asyncio.to_thread(importacion_service.guardar_en_temporal, archivo.file)
+            pendientes.append((archivo.filename or "", ruta))
+        self._importacion_pendiente = pendientes
+        self.importacion_mensaje = "Importando..."
+        self.error_mensaje = ""
+        return State.procesar_importacion
 
+    @rx.event(background=True)
+    @medir_handler
+    async def procesar_importacion(self):
+        """
+        Importa los extractos pendientes por lotes.
+        
+        El lock del estado solo se toma para leer los archivos pendientes y
+        para publicar el resultado; el parseo y las inserciones corren sin
+        él, así que la sesión sigue atendiendo otros eventos.
+        """
+        async with self:
+            if not self.usuario_actual or not self._importacion_pendiente:
+                return
+            usuario_id = self.usuario_actual.id
+            archivos = self._importacion_pendiente
+            self._importacion_pendiente = []
+        
+        resultado = importacion_service.ResultadoImportacion()
+        try:
+            # Las fechas importadas son datetime antiguos: query_pagina exige
+            # que no queden fechas string del usuario (ver migracion_fechas)
+            await asyncio.to_thread(migracion_fechas.migrar_fechas_usuario, usuario_id)
+            
+            for nombre_archivo, ruta in archivos:
+                filas = importacion_service.filas_de_archivo(ruta, nombre_archivo)
+                for lote in importacion_service.construir_lotes(filas, usuario_id, resultado):
+                    resultado.importados += await MovimientoRepositoryAsync.crear_movimientos_lote(lote)
+            
+            # Releer balance y primera página una sola vez al final
+            balance_doc = await BalanceRepositoryAsync.obtener_balance_por_usuario(usuario_id)
+            docs = await MovimientoRepositoryAsync.buscar_pagina_movimientos_por_usuario(
+                usuario_id, limit=MOVIMIENTOS_POR_PAGINA + 1
+            )
+        except Exception:
+            for _, ruta in archivos:
+                importacion_service.borrar_temporal(ruta)
+            logger.exception("Error al importar extractos de %s", usuario_id)
+            async with self:
+                self.importacion_mensaje = f"{resultado.importados} movimientos importados"
+                self.error_mensaje = "Ocurrió un error durante la importación"
+            return
+        
+        logger.info(
+            "Importación de %s: %d importados, %d rechazados",
+            usuario_id, resultado.importados, resultado.rechazados
+        )
+        
+        async with self:
+            # La sesión pudo cerrarse o cambiar de usuario mientras tanto
+            if not self.usuario_actual or self.usuario_actual.id != usuario_id:
+                return
+            
+            self.importacion_mensaje = (
+                f"{resultado.importados} movimientos importados, {resultado.rechazados} rechazados"
+            )
+            self.error_mensaje = "; ".join(resultado.errores[:3])
+            await self._aplicar_balance_documento(usuario_id, balance_doc)
+            self._cursor_fecha = ""
+            self._cursor_id = ""
+            self._mostrar_primera_pagina(self._procesar_pagina_movimientos(docs))
 
+    @medir_handler
+    async def cargar_resumenes(self):
+        """
+        Carga los últimos MESES_RESUMEN resúmenes mensuales del usuario.
+        
+        Es una sola lectura pequeña sobre resumenes_mensuales (mantenida
+        por los repositories), sin recorrer el historial de movimientos.
+        """
+        if not self.usuario_actual:
+            self.resumenes_mensuales = []
+            return
+        
+        docs = await ResumenRepositoryAsync.obtener_resumenes_por_usuario(
+            self.usuario_actual.id, limit=MESES_RESUMEN
+        )
+        self.resumenes_mensuales = resumen_service.resumenes_desde_documentos(docs)
 
-    def iniciar(self):
-        self.cargar_movimientos()
+    @medir_handler
+    def exportar_movimientos(self, formato: str):
+        """
+        Abre la descarga del historial completo en el formato indicado.
+        
+        El archivo lo sirve el endpoint /exportar del backend por streaming;
+        aquí solo se emite un token de descarga de corta duración.
+        """
+        if not self.usuario_actual:
+            return
+        
+        token = auth_service.generar_token_exportacion(self.usuario_actual.id)
+        api_url = rx.config.get_config().api_url
+        return rx.redirect(f"{api_url}/exportar?formato={formato}&token={token}", is_external=True)
 
     def set_nombre_registro(self, nombre: str):
         """Actualiza el nombre para el registro."""
@@ -238,40 +452,46 @@ class State(AppState):
         self.password_registro = password
 
     @rx.event(background=True)
+    @medir_handler
     async def registrar_usuario(self):
         """Registra un nuevo usuario."""
-        print("Iniciando proceso de registro...")  # Debug
+        async with self:
+            # Validar campos usando el servicio
+            validacion = validacion_service.validar_registro(
+                email=self.email_registro,
+                password=self.password_registro,
+                nombre=self.nombre_registro
+            )
+            
+            if not validacion.es_valido:
+                self.error_mensaje = validacion.mensaje_error
+                return
+            
+            password_registro = self.password_registro
+        
+        # Hash de la contraseña en el pool de bcrypt, sin retener el lock del estado
+        try:
+            hashed_password = await auth_service.hash_password_async(password_registro)
+        except auth_service.ServicioSaturadoError:
+            async with self:
+                self.error_mensaje = "Hay muchas solicitudes en este momento. Intenta de nuevo en unos segundos."
+            return
         
         async with self:
+            usuario_id = None
             try:
-                # Validar campos usando el servicio
-                validacion = validacion_service.validar_registro(
-                    email=self.email_registro,
-                    password=self.password_registro,
-                    nombre=self.nombre_registro
-                )
-                
-                if not validacion.es_valido:
-                    self.error_mensaje = validacion.mensaje_error
-                    return
-                    
-                print(f"Registrando nuevo usuario: {self.email_registro}")  # Debug
-                    
                 try:
-                    # Hash de la contraseña usando el servicio
-                    hashed_password = auth_service.hash_password(self.password_registro)
-                    
                     # Normalizar datos antes de guardar
                     email_normalizado = validacion_service.normalizar_email(self.email_registro)
                     nombre_normalizado = validacion_service.normalizar_nombre(self.nombre_registro)
                     
                     # Crear usuario usando el repository
-                    usuario_id = UsuarioRepository.crear(
+                    usuario_id = await UsuarioRepositoryAsync.crear(
                         email=email_normalizado,
                         password_hash=hashed_password,
                         nombre=nombre_normalizado
                     )
-                    print(f"Usuario creado con ID: {usuario_id}")  # Debug
+                    logger.info("Usuario registrado: %s", usuario_id)
                     
                     # Crear usuario en el estado
                     self.usuario_actual = Usuario(
@@ -284,23 +504,26 @@ class State(AppState):
                     if not self.guardar_sesion(usuario_id):
                         raise Exception("No se pudo guardar la sesión")
                     
-                    print("Sesión guardada")  # Debug
-                    
                     # Inicializar balance para el nuevo usuario
                     try:
                         # Guardar balance inicial en la base de datos primero
                         balance_inicial = {
                             "usuario_id": usuario_id,
                             "total": 0.0,
+                            "disponible": 0.0,
+                            "deudas_pendientes": 0.0,
+                            "balance_real": 0.0,
+                            "total_movimientos": 0,
+                            "ultimo_movimiento_id": "",
                             "ultima_actualizacion": datetime.now().isoformat()
                         }
                         
-                        BalanceRepository.crear_balance_inicial(balance_inicial)
+                        await BalanceRepositoryAsync.crear_balance_inicial(balance_inicial)
                         
                         # Actualizar el balance en el estado
                         self.balance = balance_service.crear_balance_inicial(usuario_id)
                     except Exception as e:
-                        print(f"Error al crear balance: {str(e)}")
+                        logger.error("Error al crear el balance de %s: %s", usuario_id, e)
                         raise Exception("Error al crear el balance inicial")
                     
                     # Limpiar campos
@@ -309,8 +532,6 @@ class State(AppState):
                     self.nombre_registro = ""
                     self.error_mensaje = ""
                     
-                    print("Registro exitoso, redirigiendo...")  # Debug
-                    
                     # Forzar la actualización del estado y la redirección
                     return rx.redirect("/")
                     
@@ -318,21 +539,20 @@ class State(AppState):
                     # Si algo falla durante el proceso, intentar limpiar datos parcialmente creados
                     if usuario_id:
                         try:
-                            UsuarioRepository.eliminar(usuario_id)
-                            BalanceRepository.eliminar_balance_por_usuario(usuario_id)
+                            await UsuarioRepositoryAsync.eliminar(usuario_id)
+                            await BalanceRepositoryAsync.eliminar_balance_por_usuario(usuario_id)
                         except:
                             pass
                     raise e
                     
-            except Exception as e:
-                print(f"Error en registro: {str(e)}")  # Debug
+            except Exception:
+                logger.exception("Error en registro")
                 self.error_mensaje = "Ocurrió un error al registrar el usuario. Por favor intenta nuevamente."
 
     @rx.event(background=True)
+    @medir_handler
     async def login(self):
         """Inicia sesión de usuario."""
-        print("Iniciando proceso de login...")  # Debug
-        
         async with self:
             # Validar campos usando el servicio
             validacion = validacion_service.validar_login(
@@ -343,26 +563,37 @@ class State(AppState):
             if not validacion.es_valido:
                 self.error_mensaje = validacion.mensaje_error
                 return
+            
+            email_login = self.email_login
+            password_login = self.password_login
+
+        # Búsqueda y verificación sin retener el lock del estado:
+        # bcrypt corre en su pool y no serializa otros eventos de la sesión
+        try:
+            usuario = await UsuarioRepositoryAsync.buscar_por_email(email_login)
+            
+            password_valido = bool(usuario) and await auth_service.verificar_password_async(
+                password_login,
+                usuario["password"]
+            )
+        except auth_service.ServicioSaturadoError:
+            async with self:
+                self.error_mensaje = "Hay muchos inicios de sesión en curso. Intenta de nuevo en unos segundos."
+            return
+        except Exception:
+            logger.exception("Error en login al verificar credenciales")
+            async with self:
+                self.error_mensaje = "Ocurrió un error al iniciar sesión"
+            return
+
+        async with self:
+            # Verificar si existe el usuario y la contraseña
+            if not password_valido:
+                logger.debug("login: credenciales inválidas")
+                self.error_mensaje = "Email o contraseña incorrectos"
+                return
 
             try:
-                # Buscar usuario por email usando repository
-                print(f"Buscando usuario con email: {self.email_login}")  # Debug
-                usuario = UsuarioRepository.buscar_por_email(self.email_login)
-                
-                # Verificar si existe el usuario
-                if not usuario:
-                    print("Usuario no encontrado")  # Debug
-                    self.error_mensaje = "Email o contraseña incorrectos"
-                    return
-                    
-                # Verificar la contraseña usando el servicio
-                if not auth_service.verificar_password(
-                    self.password_login,
-                    usuario["password"]
-                ):
-                    self.error_mensaje = "Email o contraseña incorrectos"
-                    return
-                    
                 # Actualizar estado con usuario encontrado
                 self.usuario_actual = Usuario(
                     id=str(usuario["_id"]),
@@ -374,7 +605,7 @@ class State(AppState):
                 self.guardar_sesion(str(usuario["_id"]))
                 
                 # Cargar balance del usuario usando helper
-                self._cargar_balance_usuario(str(usuario["_id"]))
+                await self._cargar_balance_usuario(str(usuario["_id"]))
                 
                 # Limpiar campos
                 self.email_login = ""
@@ -382,83 +613,102 @@ class State(AppState):
                 self.error_mensaje = ""
                 
                 # Cargar movimientos del usuario
-                self.cargar_movimientos()
-                print("Login exitoso, redirigiendo...")  # Debug
+                await self.cargar_movimientos()
+                logger.debug("login: sesión iniciada para %s", self.usuario_actual.id)
                 
                 # Forzar la actualización del estado y la redirección
                 return rx.redirect("/")
                 
-            except Exception as e:
-                print(f"Error en login: {str(e)}")  # Para debugging
+            except Exception:
+                logger.exception("Error en login al cargar la sesión")
                 self.error_mensaje = "Ocurrió un error al iniciar sesión"
 
     def get_token_from_storage(self) -> str:
         """Obtiene el token desde localStorage del navegador."""
         return self.get_token()
 
-    def cargar_usuario_por_id(self, usuario_id: str):
-        """Carga un usuario y sus datos por ID."""
+    @medir_handler
+    async def cargar_usuario_por_id(self, usuario_id: str):
+        """Carga un usuario y sus datos por ID en un solo round trip."""
         try:
-            # Buscar usuario por ID usando repository
-            usuario = UsuarioRepository.buscar_por_id(usuario_id)
-            print(f"🔍 Buscando usuario con ID: {usuario_id}")  # Debug
+            # Usuario, balance y primera página del feed en una agregación
+            sesion = await UsuarioRepositoryAsync.buscar_sesion_por_id(
+                usuario_id,
+                limit_movimientos=MOVIMIENTOS_POR_PAGINA + 1
+            )
             
-            if usuario:
-                print(f"👤 Usuario encontrado: {usuario['email']}")  # Debug
+            if sesion:
+                usuario = sesion["usuario"]
                 self.usuario_actual = Usuario(
                     id=str(usuario["_id"]),
                     email=usuario["email"],
                     nombre=usuario["nombre"]
                 )
                 
-                # Cargar balance del usuario usando helper
-                self._cargar_balance_usuario(str(usuario["_id"]))
+                # Balance del ledger (reconcilia si aún no existe) y deudas del mes
+                deudas = deudas_de_sesion(
+                    sesion["deuda_previa"], sesion["calendario_mes"], datetime.now()
+                )
+                await self._aplicar_balance_documento(str(usuario["_id"]), sesion["balance"], deudas)
                 
-                # Cargar movimientos del usuario
-                self.cargar_movimientos()
-                print(f"📊 Movimientos cargados: {len(self.movimientos)}")  # Debug
+                # Primera página de movimientos
+                self._cursor_fecha = ""
+                self._cursor_id = ""
+                self._mostrar_primera_pagina(
+                    self._procesar_pagina_movimientos(sesion["movimientos"])
+                )
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(
+                        "Sesión de %s cargada: %d movimientos",
+                        usuario_id,
+                        movimiento_service.contar_movimientos_agrupados(self.movimientos_agrupados)
+                    )
             else:
-                print(f"❌ No se encontró usuario con ID: {usuario_id}")  # Debug
-        except Exception as e:
-            print(f"💥 Error al cargar usuario: {str(e)}")  # Debug
+                logger.warning("No se encontró el usuario %s", usuario_id)
+        except Exception:
+            logger.exception("Error al cargar el usuario %s", usuario_id)
 
     def guardar_sesion(self, usuario_id: str):
         """Guarda el token en localStorage usando AppState."""
         try:
-            print(f"Generando token para usuario: {usuario_id}")  # Debug
             token = auth_service.generar_token(usuario_id)
             
             if not token:
-                print("Error: No se pudo generar el token")  # Debug
+                logger.error("No se pudo generar el token de %s", usuario_id)
                 return False
                 
-            print("Token generado correctamente")  # Debug
             # Guardar token en localStorage usando AppState
             self.set_auth_token(token)
-            print("Token guardado en localStorage")  # Debug
+            self._token_hidratado = token
             return True
             
-        except Exception as e:
-            print(f"Error al guardar sesión: {str(e)}")  # Debug
+        except Exception:
+            logger.exception("Error al guardar la sesión de %s", usuario_id)
             self.error_mensaje = "Error al iniciar sesión"
             return False
 
+    @medir_handler
     def logout(self):
         """Cerrar sesión y redirigir al login."""
-        print("🚪 Iniciando logout...")  # Debug
-        
         # Limpiar estado del usuario
         self.usuario_actual = None
-        print("👤 Usuario actual limpiado")  # Debug
         
         # Limpiar localStorage usando AppState
+        auth_service.invalidar_token(self.auth_token)
         self.auth_token = ""
-        print("🔑 Token eliminado de localStorage")  # Debug
+        self._token_hidratado = ""
         
         # Limpiar otros datos de sesión
         self.balance = Balance(usuario_id="", total=0.0, ultima_actualizacion=datetime.now().isoformat())
-        self.movimientos = []
-        print("📊 Datos de sesión limpiados")  # Debug
-        
-        print("✅ Logout completado, redirigiendo...\n")  # Debug
+        self.deuda_pendiente_hoy = 0.0
+        self.pagos_deuda_mes = 0.0
+        self.movimientos_agrupados = []
+        self.resumenes_mensuales = []
+        for _, ruta in self._importacion_pendiente:
+            importacion_service.borrar_temporal(ruta)
+        self._importacion_pendiente = []
+        self.hay_mas_movimientos = False
+        self._cursor_fecha = ""
+        self._cursor_id = ""
+        logger.debug("logout completado")
         return rx.redirect("/")
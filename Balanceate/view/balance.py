@@ -32,6 +32,15 @@ def balance() -> rx.Component:
                     Colors.ERROR.value
                 )
             ),
+            # Deudas según su calendario de pagos
+            rx.cond(
+                State.deuda_pendiente_hoy > 0,
+                rx.text(
+                    f"Deuda pendiente: ${State.deuda_pendiente_hoy} · Pagos este mes: ${State.pagos_deuda_mes}",
+                    font_size=[".8rem", ".9rem", "1rem"],
+                    color="gray",
+                ),
+            ),
             align="center",
             justify="center",
         ),
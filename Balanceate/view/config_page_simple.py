@@ -3,6 +3,9 @@ from Balanceate.state import State
 from Balanceate.styles.colors import Colors
 from Balanceate.styles.fonts import Font, FontWeight
 from Balanceate.view.navbar import navbar
+from Balanceate.Componentes.importar_movimientos import importar_movimientos
+from Balanceate.Componentes.exportar_movimientos import exportar_movimientos
+from Balanceate.Componentes.resumen_mensual import resumen_mensual
 
 __all__ = ["config_page"]
 
@@ -56,6 +59,15 @@ def config_page() -> rx.Component:
                             text_align="center",
                         ),
                         
+                        # Ingresos, gastos y deudas de los últimos meses
+                        resumen_mensual(),
+                        
+                        # Importación de extractos bancarios
+                        importar_movimientos(),
+                        
+                        # Exportación del historial completo
+                        exportar_movimientos(),
+                        
                         # Botón de cerrar sesión
                         rx.button(
                             "Cerrar sesión",
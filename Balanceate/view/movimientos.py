@@ -2,6 +2,57 @@ import reflex as rx
 from Balanceate.state import State
 from Balanceate.Componentes.movimiento import movimiento
 
+# Observa el botón "Cargar más" y lo pulsa cuando entra en pantalla,
+# convirtiendo la paginación en scroll infinito. El botón sigue siendo
+# usable a mano si el navegador no soporta IntersectionObserver.
+# IntersectionObserver solo avisa cuando cambia la visibilidad: si tras
+# llegar una página el botón sigue a la vista (página corta, pantalla alta),
+# se deja de observar y se vuelve a observar para forzar otra comprobación.
+# El botón marca en data-cargando la página que pidió; el flag se limpia
+# cuando State.cargas_feed (data-carga) cambia al terminar el handler, haya
+# llegado página o no (última página, error), o tras un timeout si la
+# respuesta nunca llega, para que el scroll no se quede bloqueado.
+SCROLL_INFINITO_JS = """
+(function () {
+    if (window.__balanceateScrollInfinito || !("IntersectionObserver" in window)) return;
+    window.__balanceateScrollInfinito = true;
+    const ESPERA_MAXIMA_MS = 10000;
+    const liberar = (boton) => {
+        // Volver a comprobar si el botón sigue a la vista
+        clearTimeout(Number(boton.dataset.timeout));
+        delete boton.dataset.cargando;
+        delete boton.dataset.timeout;
+        observer.unobserve(boton);
+        observer.observe(boton);
+    };
+    const observer = new IntersectionObserver((entradas) => {
+        entradas.forEach((entrada) => {
+            const boton = entrada.target;
+            if (entrada.isIntersecting && !boton.dataset.cargando) {
+                boton.dataset.cargando = boton.dataset.carga || "0";
+                boton.dataset.timeout = String(setTimeout(() => liberar(boton), ESPERA_MAXIMA_MS));
+                boton.click();
+            }
+        });
+    }, { rootMargin: "200px" });
+    const revisarBoton = () => {
+        const boton = document.getElementById("cargar-mas-movimientos");
+        if (!boton) return;
+        if (!boton.dataset.observado) {
+            boton.dataset.observado = "1";
+            observer.observe(boton);
+        } else if (boton.dataset.cargando && boton.dataset.cargando !== (boton.dataset.carga || "0")) {
+            // Terminó el handler (con página nueva o sin ella)
+            liberar(boton);
+        }
+    };
+    new MutationObserver(revisarBoton).observe(document.body, {
+        childList: true, subtree: true, attributes: true, attributeFilter: ["data-carga"]
+    });
+    revisarBoton();
+})();
+"""
+
 def movimientos() -> rx.Component:
     return rx.vstack(
         rx.text(
@@ -58,6 +109,19 @@ def movimientos() -> rx.Component:
             )
         ),
 
+        # Siguiente página del feed
+        rx.cond(
+            State.hay_mas_movimientos,
+            rx.button(
+                "Cargar más",
+                id="cargar-mas-movimientos",
+                on_click=State.cargar_mas_movimientos,
+                custom_attrs={"data-carga": State.cargas_feed},
+                variant="soft",
+            ),
+        ),
+        rx.script(SCROLL_INFINITO_JS),
+
         align="center",
         spacing="4",
         width=["100%", "100%", "900px"],
@@ -0,0 +1,490 @@
+"""
+Generador de carga: sesiones Reflex concurrentes contra la app en local.
+
+Cada usuario virtual abre un websocket (Socket.IO en /_event) como lo haría
+el navegador y recorre un flujo realista:
+
+    1. Carga de la página sin sesión (hydrate + on_load)
+    2. Login (set_email_login, set_password_login, login)
+    3. Varios agregar_movimiento (seleccionar_tipo, set_nombre, set_valor, ...)
+    4. Recarga con el token guardado: nueva sesión, update_vars_internal
+       con auth_token y on_load (restaura usuario, balance y feed)
+
+Igual que el frontend, el cliente envía un evento cada vez y espera su
+actualización final; los eventos encadenados que devuelve el servidor
+(p. ej. el on_load que dispara on_load_internal) se envían dentro del mismo
+paso. La latencia de cada paso va del primer emit a la última actualización.
+
+Esperas de lock: un monitor consulta en Redis el PTTL de la clave
+<token>_lock de cada sesión cada --muestreo-ms. Como el lock se toma con
+expiración fija (REFLEX_LOCK_EXPIRATION), el PTTL da el instante exacto en
+que se adquirió; la espera de un evento es el tiempo que el lock de su
+sesión siguió tomado por otro evento (p. ej. el login en background)
+después de enviarlo. Es una estimación con la resolución del muestreo.
+
+Requisitos: la app corriendo (reflex run) con su MongoDB y Redis locales, y
+python-socketio con cliente asyncio (pip install "python-socketio[asyncio_client]").
+
+Uso:
+    python -m benchmarks.carga --sembrar --usuarios 50
+    python -m benchmarks.carga --usuarios 200 --rampa 20 --movimientos 5
+    python -m benchmarks.carga --url http://localhost:8000 --redis-url redis://localhost:6379
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+import urllib.request
+import uuid
+from collections import defaultdict
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+EMAIL_CARGA = "carga-{indice}@balanceate.local"
+PASSWORD_CARGA = "Carga-Balanceate-1"
+
+# Sufijo de los nombres de var en los deltas de Reflex
+FIELD_MARKER = "_rx_state_"
+
+NAMESPACE = "/_event"
+RUTA_INICIO = "/"
+
+
+# ---------------------------------------------------------------------------
+# Preparación
+# ---------------------------------------------------------------------------
+
+def sembrar_usuarios(usuarios: int, historial: int) -> None:
+    """
+    Crea los usuarios de carga que aún no existen, con su ledger e historial.
+
+    Args:
+        usuarios: Número de usuarios (carga-0 ... carga-N-1)
+        historial: Movimientos iniciales por usuario nuevo
+    """
+    from datetime import datetime, timedelta
+    from Balanceate.db.balance_repository import BalanceRepository
+    from Balanceate.db.movimiento_repository import MovimientoRepository
+    from Balanceate.db.usuario_repository import UsuarioRepository
+    from Balanceate.services import auth_service, balance_service
+
+    password_hash = auth_service.hash_password(PASSWORD_CARGA)
+    creados = 0
+    for indice in range(usuarios):
+        email = EMAIL_CARGA.format(indice=indice)
+        if UsuarioRepository.existe_email(email):
+            continue
+
+        usuario_id = UsuarioRepository.crear(email, password_hash, f"Carga {indice}")
+        BalanceRepository.crear_balance_inicial(
+            balance_service.crear_balance_inicial(usuario_id).model_dump()
+        )
+        ahora = datetime.now()
+        MovimientoRepository.crear_movimientos_lote([
+            {
+                "tipo": "ingreso" if i % 4 == 0 else "gasto",
+                "nombre": f"Histórico {i}",
+                "fecha": ahora - timedelta(hours=6 * (historial - i)),
+                "valor": round(10 + (i % 50) * 3.1, 2),
+                "usuario_id": usuario_id,
+            }
+            for i in range(historial)
+        ])
+        creados += 1
+    print(f"🌱 Usuarios de carga: {creados} creados, {usuarios - creados} ya existían")
+
+
+def nombres_de_eventos() -> dict[str, str]:
+    """Nombres completos de los eventos que envía el frontend de Balanceate."""
+    import reflex as rx
+    from reflex.constants import CompileVars
+    from Balanceate.state import AppState, State
+
+    raiz = rx.State.get_full_name()
+    estado = State.get_full_name()
+    return {
+        "estado": estado,
+        "app_state": AppState.get_full_name(),
+        "hydrate": f"{raiz}.{CompileVars.HYDRATE}",
+        "on_load_internal": f"{raiz}.{CompileVars.ON_LOAD_INTERNAL}",
+        "update_vars_internal": f"{raiz}.{CompileVars.UPDATE_VARS_INTERNAL}",
+        **{
+            handler: f"{estado}.{handler}"
+            for handler in (
+                "set_email_login", "set_password_login", "login",
+                "seleccionar_tipo", "set_nombre", "set_valor", "agregar_movimiento",
+            )
+        },
+    }
+
+
+def _expiracion_lock_ms() -> int:
+    """Expiración del lock de estado configurada en rxconfig.py."""
+    return int(os.getenv("REFLEX_LOCK_EXPIRATION", "60000"))
+
+
+# ---------------------------------------------------------------------------
+# Métricas
+# ---------------------------------------------------------------------------
+
+class Metricas:
+    """Latencias, esperas de lock y errores por paso del flujo."""
+
+    def __init__(self):
+        self.latencias: dict[str, list[float]] = defaultdict(list)
+        self.esperas_lock: dict[str, list[float]] = defaultdict(list)
+        self.errores: dict[str, dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.flujos_completos = 0
+        self.inicio = time.monotonic()
+        self.fin = self.inicio
+
+    def registrar(self, paso: str, latencia: float, espera_lock: float | None) -> None:
+        self.latencias[paso].append(latencia)
+        if espera_lock is not None:
+            self.esperas_lock[paso].append(espera_lock)
+
+    def registrar_error(self, paso: str, motivo: str) -> None:
+        self.errores[paso][motivo] += 1
+
+
+class MonitorLocks:
+    """
+    Muestrea en Redis el lock de estado de cada sesión.
+
+    Nota:
+        Un PTTL de p ms significa que el lock se adquirió hace
+        (expiración - p) ms; cada adquisición se guarda como un intervalo
+        [inicio, fin] en reloj monotónico.
+    """
+
+    def __init__(self, redis_url: str, intervalo: float):
+        from redis.asyncio import Redis
+
+        self.redis = Redis.from_url(redis_url)
+        self.intervalo = intervalo
+        self.expiracion = _expiracion_lock_ms() / 1000
+        self.tokens: set[str] = set()
+        self.intervalos: dict[str, list[list[float]]] = defaultdict(list)
+        self._activo = True
+
+    def registrar(self, token: str) -> None:
+        self.tokens.add(token)
+
+    async def ejecutar(self) -> None:
+        tolerancia = self.intervalo + 0.005
+        while self._activo:
+            tokens = list(self.tokens)
+            if tokens:
+                pipe = self.redis.pipeline(transaction=False)
+                for token in tokens:
+                    pipe.pttl(f"{token}_lock")
+                try:
+                    pttls = await pipe.execute()
+                except Exception as e:
+                    print(f"⚠️ Monitor de locks detenido, Redis no responde: {e}")
+                    return
+                ahora = time.monotonic()
+                for token, pttl in zip(tokens, pttls):
+                    if pttl is None or pttl <= 0:
+                        continue
+                    inicio = ahora - (self.expiracion - pttl / 1000)
+                    intervalos = self.intervalos[token]
+                    if intervalos and abs(intervalos[-1][0] - inicio) <= tolerancia:
+                        intervalos[-1][1] = ahora
+                    else:
+                        intervalos.append([inicio, ahora])
+            await asyncio.sleep(self.intervalo)
+
+    def espera(self, token: str, enviado: float, completado: float) -> float:
+        """Tiempo que el lock de la sesión siguió tomado por otro evento tras enviar uno."""
+        espera = 0.0
+        for inicio, fin in self.intervalos.get(token, ()):
+            if inicio < enviado < fin:
+                espera += min(fin, completado) - enviado
+        return espera
+
+    async def detener(self) -> None:
+        self._activo = False
+        await self.redis.connection_pool.disconnect()
+
+
+# ---------------------------------------------------------------------------
+# Sesión virtual
+# ---------------------------------------------------------------------------
+
+class PasoFallido(Exception):
+    """Un paso del flujo terminó en timeout o con error de la app."""
+
+
+class SesionVirtual:
+    """
+    Una pestaña del navegador: un websocket y un token de cliente propios.
+
+    Replica el bucle de eventos del frontend: un evento cada vez, los
+    eventos de backend devueltos por el servidor se encadenan y los de
+    frontend (nombres con "_", p. ej. _redirect) se interpretan localmente.
+    """
+
+    def __init__(self, url: str, eventos: dict[str, str], metricas: Metricas,
+                 monitor: MonitorLocks | None, timeout: float):
+        import socketio
+
+        self.url = url
+        self.eventos = eventos
+        self.metricas = metricas
+        self.monitor = monitor
+        self.timeout = timeout
+        self.token = str(uuid.uuid4())
+        self.estado: dict[str, dict] = defaultdict(dict)
+        self._actualizaciones: asyncio.Queue = asyncio.Queue()
+        self._sio = socketio.AsyncClient(reconnection=False)
+        self._sio.on("event", self._al_recibir, namespace=NAMESPACE)
+
+    async def _al_recibir(self, actualizacion) -> None:
+        if isinstance(actualizacion, str):
+            actualizacion = json.loads(actualizacion)
+        await self._actualizaciones.put(actualizacion)
+
+    async def conectar(self) -> None:
+        await self._sio.connect(
+            f"{self.url}?token={self.token}",
+            socketio_path=NAMESPACE,
+            namespaces=[NAMESPACE],
+            transports=["websocket"],
+            wait_timeout=self.timeout,
+        )
+        if self.monitor:
+            self.monitor.registrar(self.token)
+
+    async def cerrar(self) -> None:
+        await self._sio.disconnect()
+
+    def var(self, estado: str, nombre: str):
+        """Último valor recibido de una var del estado."""
+        return self.estado[self.eventos[estado]].get(nombre + FIELD_MARKER)
+
+    async def _emitir(self, nombre: str, payload: dict, ruta: str) -> None:
+        await self._sio.emit("event", {
+            "token": self.token,
+            "name": nombre,
+            "router_data": {"pathname": ruta, "query": {}, "asPath": ruta},
+            "payload": payload,
+        }, namespace=NAMESPACE)
+
+    async def _esperar_final(self, pendientes: list) -> None:
+        """Aplica actualizaciones hasta la final del evento en curso."""
+        while True:
+            actualizacion = await self._actualizaciones.get()
+            for subestado, cambios in (actualizacion.get("delta") or {}).items():
+                self.estado[subestado].update(cambios)
+            for evento in actualizacion.get("events") or []:
+                nombre = evento.get("name", "")
+                if nombre == "_redirect":
+                    # El navegador navega y vuelve a lanzar on_load_internal
+                    pendientes.append((self.eventos["on_load_internal"], {}))
+                elif not nombre.startswith("_"):
+                    pendientes.append((nombre, evento.get("payload") or {}))
+            if actualizacion.get("final") is not False:
+                return
+
+    async def paso(self, etiqueta: str, eventos: list[tuple[str, dict]],
+                   ruta: str = RUTA_INICIO, hasta=None) -> None:
+        """
+        Envía uno o más eventos (y sus encadenados) como un paso medido.
+
+        Args:
+            etiqueta: Nombre del paso en el reporte
+            eventos: Lista de (nombre completo, payload)
+            ruta: Página desde la que se envían
+            hasta: Condición opcional sobre la sesión para dar el paso por
+                terminado (eventos en background, p. ej. login)
+
+        Raises:
+            PasoFallido: Si no termina dentro del timeout
+        """
+        pendientes = list(eventos)
+        enviado = time.monotonic()
+        try:
+            async with asyncio.timeout(self.timeout):
+                while pendientes or (hasta is not None and not hasta(self)):
+                    if pendientes:
+                        nombre, payload = pendientes.pop(0)
+                        await self._emitir(nombre, payload, ruta)
+                    await self._esperar_final(pendientes)
+        except TimeoutError:
+            self.metricas.registrar_error(etiqueta, "timeout")
+            raise PasoFallido(etiqueta)
+
+        completado = time.monotonic()
+        espera = self.monitor.espera(self.token, enviado, completado) if self.monitor else None
+        self.metricas.registrar(etiqueta, completado - enviado, espera)
+
+    async def cargar_pagina(self, etiqueta: str, auth_token: str = "") -> None:
+        """Eventos iniciales del frontend al abrir la página."""
+        eventos = [(self.eventos["hydrate"], {})]
+        if auth_token:
+            clave = f"{self.eventos['app_state']}.auth_token{FIELD_MARKER}"
+            eventos.append((self.eventos["update_vars_internal"], {"vars": {clave: auth_token}}))
+        eventos.append((self.eventos["on_load_internal"], {}))
+        await self.paso(etiqueta, eventos)
+
+
+# ---------------------------------------------------------------------------
+# Flujo
+# ---------------------------------------------------------------------------
+
+def _login_terminado(sesion: SesionVirtual) -> bool:
+    return bool(sesion.var("estado", "usuario_actual") or sesion.var("estado", "error_mensaje"))
+
+
+async def flujo_usuario(indice: int, args, eventos: dict[str, str], metricas: Metricas,
+                        monitor: MonitorLocks | None) -> None:
+    """Recorre el flujo completo de un usuario virtual."""
+    e = eventos
+    sesion = SesionVirtual(args.url, eventos, metricas, monitor, args.timeout)
+    try:
+        await sesion.conectar()
+        await sesion.cargar_pagina("on_load (sin sesión)")
+
+        await sesion.paso("set_email_login", [(e["set_email_login"], {"value": EMAIL_CARGA.format(indice=indice)})])
+        await sesion.paso("set_password_login", [(e["set_password_login"], {"value": PASSWORD_CARGA})])
+        await sesion.paso("login", [(e["login"], {})], hasta=_login_terminado)
+        if not sesion.var("estado", "usuario_actual"):
+            metricas.registrar_error("login", str(sesion.var("estado", "error_mensaje")))
+            return
+        auth_token = sesion.var("app_state", "auth_token")
+        if not auth_token:
+            metricas.registrar_error("login", "sin auth_token en el delta")
+            return
+
+        for numero in range(args.movimientos):
+            await sesion.paso("seleccionar_tipo", [(e["seleccionar_tipo"], {"tipo": "gasto"})])
+            await sesion.paso("set_nombre", [(e["set_nombre"], {"value": f"Carga {numero}"})])
+            await sesion.paso("set_valor", [(e["set_valor"], {"value": str(1 + numero % 20)})])
+            await sesion.paso("agregar_movimiento", [(e["agregar_movimiento"], {"tipo": "gasto"})])
+    except PasoFallido:
+        return
+    except Exception as error:
+        metricas.registrar_error("conexión", type(error).__name__)
+        return
+    finally:
+        await sesion.cerrar()
+
+    recarga = SesionVirtual(args.url, eventos, metricas, monitor, args.timeout)
+    try:
+        await recarga.conectar()
+        await recarga.cargar_pagina("on_load (recarga con token)", auth_token)
+        metricas.flujos_completos += 1
+    except PasoFallido:
+        return
+    except Exception as error:
+        metricas.registrar_error("conexión", type(error).__name__)
+    finally:
+        await recarga.cerrar()
+
+
+async def ejecutar_carga(args) -> Metricas:
+    eventos = nombres_de_eventos()
+    metricas = Metricas()
+
+    monitor = None
+    if args.redis_url:
+        monitor = MonitorLocks(args.redis_url, args.muestreo_ms / 1000)
+        tarea_monitor = asyncio.create_task(monitor.ejecutar())
+    else:
+        print("⚠️ Sin --redis-url (ni REDIS_URL): no se medirán esperas de lock")
+
+    separacion = args.rampa / args.usuarios if args.usuarios else 0
+
+    async def usuario_virtual(indice: int) -> None:
+        await asyncio.sleep(indice * separacion)
+        for _ in range(args.iteraciones):
+            await flujo_usuario(indice, args, eventos, metricas, monitor)
+
+    print(f"🚀 {args.usuarios} usuarios virtuales contra {args.url} (rampa {args.rampa:g} s)")
+    metricas.inicio = time.monotonic()
+    await asyncio.gather(*(usuario_virtual(indice) for indice in range(args.usuarios)))
+    metricas.fin = time.monotonic()
+
+    if monitor:
+        tarea_monitor.cancel()
+        await monitor.detener()
+    return metricas
+
+
+# ---------------------------------------------------------------------------
+# Reporte
+# ---------------------------------------------------------------------------
+
+def _percentil(valores: list[float], p: float) -> float:
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, max(0, round(p * len(ordenados)) - 1))]
+
+
+def reportar(metricas: Metricas, url: str) -> None:
+    duracion = metricas.fin - metricas.inicio
+    eventos = sum(len(latencias) for latencias in metricas.latencias.values())
+
+    print(f"\n📊 {metricas.flujos_completos} flujos completos en {duracion:,.1f} s "
+          f"({metricas.flujos_completos / duracion:,.2f} flujos/s, {eventos / duracion:,.1f} pasos/s)")
+    print(f"{'paso':<30} {'n':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}"
+          f" {'lock p50':>9} {'lock p99':>9} {'% espera':>9}")
+    for paso, latencias in metricas.latencias.items():
+        ms = [latencia * 1000 for latencia in latencias]
+        linea = (
+            f"{paso:<30} {len(ms):>6} {statistics.median(ms):>9.1f} {_percentil(ms, 0.95):>9.1f}"
+            f" {_percentil(ms, 0.99):>9.1f} {max(ms):>9.1f}"
+        )
+        esperas = [espera * 1000 for espera in metricas.esperas_lock.get(paso, [])]
+        if esperas:
+            con_espera = sum(1 for espera in esperas if espera > 0) / len(esperas)
+            linea += f" {statistics.median(esperas):>9.1f} {_percentil(esperas, 0.99):>9.1f} {con_espera:>9.0%}"
+        print(linea)
+
+    if metricas.errores:
+        print("\n❌ Errores:")
+        for paso, motivos in metricas.errores.items():
+            for motivo, cantidad in motivos.items():
+                print(f"   {paso}: {motivo} × {cantidad}")
+
+    try:
+        with urllib.request.urlopen(f"{url}/metrics", timeout=5) as respuesta:
+            cache = [
+                linea for linea in respuesta.read().decode().splitlines()
+                if linea.startswith("balanceate_cache_")
+            ]
+        print("\n🧮 Caché del servidor:")
+        for linea in cache:
+            print(f"   {linea}")
+    except Exception:
+        pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000", help="URL del backend de Reflex")
+    parser.add_argument("--usuarios", type=int, default=50, help="Usuarios virtuales concurrentes")
+    parser.add_argument("--iteraciones", type=int, default=1, help="Flujos por usuario virtual")
+    parser.add_argument("--movimientos", type=int, default=3, help="agregar_movimiento por flujo")
+    parser.add_argument("--rampa", type=float, default=5.0, help="Segundos para arrancar a todos los usuarios")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Timeout por paso (s)")
+    parser.add_argument("--redis-url", default=os.getenv("REDIS_URL", ""), help="Redis del state manager")
+    parser.add_argument("--muestreo-ms", type=float, default=10.0, help="Intervalo de muestreo de locks")
+    parser.add_argument("--sembrar", action="store_true", help="Crear antes los usuarios de carga")
+    parser.add_argument("--historial", type=int, default=500, help="Movimientos iniciales por usuario sembrado")
+    args = parser.parse_args()
+
+    try:
+        import socketio  # noqa: F401
+    except ImportError:
+        sys.exit('❌ Falta el cliente Socket.IO: pip install "python-socketio[asyncio_client]"')
+
+    if args.sembrar:
+        sembrar_usuarios(args.usuarios, args.historial)
+
+    reportar(asyncio.run(ejecutar_carga(args)), args.url)
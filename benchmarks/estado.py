@@ -0,0 +1,96 @@
+"""
+Mide el tamaño serializado del feed de movimientos en el State.
+
+Compara el modelo anterior (lista plana `movimientos` + `movimientos_agrupados`,
+con usuario_id en cada movimiento) con el actual (solo `movimientos_agrupados`).
+Se mide el JSON que Reflex envía al cliente y el pickle que guarda en Redis.
+
+Uso:
+    python -m benchmarks.estado
+    python -m benchmarks.estado --movimientos 50 500 5000
+"""
+import argparse
+import json
+import pickle
+from datetime import datetime, timedelta
+
+from Balanceate.models import GrupoMovimientos, Movimiento
+from Balanceate.services import movimiento_service
+
+USUARIO_SINTETICO = "65f0c0ffee0000000000beef"
+TIPOS = ("ingreso", "gasto", "deuda")
+
+
+class MovimientoAnterior(Movimiento):
+    """Movimiento tal como se guardaba antes (con usuario_id por fila)."""
+    usuario_id: str = ""
+
+
+def documentos_feed(cantidad: int) -> list[dict]:
+    """Documentos del feed, del más reciente al más antiguo (varios por día)."""
+    ahora = datetime.now()
+    docs = []
+    for i in range(cantidad):
+        tipo = TIPOS[i % 3]
+        docs.append({
+            "tipo": tipo,
+            "nombre": f"Movimiento {i}",
+            "fecha": ahora - timedelta(hours=5 * i),
+            "valor": round((i % 1000) * 1.37, 2),
+            "monto_total": 1200.0 if tipo == "deuda" else 0,
+            "mensualidad": 100.0 if tipo == "deuda" else 0,
+            "plazo": 12 if tipo == "deuda" else 0,
+        })
+    return docs
+
+
+def _tamanos(variables: dict) -> tuple[int, int]:
+    """Tamaño en bytes como JSON (delta al cliente) y como pickle (Redis)."""
+    como_json = {
+        nombre: [item.model_dump() for item in valor]
+        for nombre, valor in variables.items()
+    }
+    return (
+        len(json.dumps(como_json).encode("utf-8")),
+        len(pickle.dumps(variables)),
+    )
+
+
+def medir(cantidad: int) -> None:
+    movimientos = movimiento_service.convertir_documentos_a_movimientos(documentos_feed(cantidad))
+    grupos = movimiento_service.agrupar_movimientos_por_fecha(movimientos)
+    
+    # Modelo anterior: la lista plana y los grupos duplican cada movimiento
+    anteriores = [
+        MovimientoAnterior(**mov.model_dump(), usuario_id=USUARIO_SINTETICO)
+        for mov in movimientos
+    ]
+    grupos_anteriores = []
+    inicio = 0
+    for grupo in grupos:
+        fin = inicio + len(grupo.movimientos)
+        grupos_anteriores.append(GrupoMovimientos.model_construct(
+            etiqueta=grupo.etiqueta, movimientos=anteriores[inicio:fin]
+        ))
+        inicio = fin
+    
+    json_antes, pickle_antes = _tamanos({
+        "movimientos": anteriores,
+        "movimientos_agrupados": grupos_anteriores,
+    })
+    json_despues, pickle_despues = _tamanos({"movimientos_agrupados": grupos})
+    
+    print(f"📊 {cantidad:,} movimientos en {len(grupos)} grupos")
+    print(f"   JSON:   {json_antes / 1024:,.1f} KB -> {json_despues / 1024:,.1f} KB "
+          f"({100 * (1 - json_despues / json_antes):.0f}% menos)")
+    print(f"   pickle: {pickle_antes / 1024:,.1f} KB -> {pickle_despues / 1024:,.1f} KB "
+          f"({100 * (1 - pickle_despues / pickle_antes):.0f}% menos)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--movimientos", type=int, nargs="+", default=[50, 500, 5000])
+    args = parser.parse_args()
+    
+    for cantidad in args.movimientos:
+        medir(cantidad)
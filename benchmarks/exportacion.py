@@ -0,0 +1,112 @@
+"""
+Mide el rendimiento y la memoria de la exportación en streaming.
+
+Genera un usuario sintético de N movimientos (1M por defecto) y recorre la
+exportación completa descartando los fragmentos, como haría el navegador.
+
+Uso:
+    python -m benchmarks.exportacion                 # solo formateo, sin MongoDB
+    python -m benchmarks.exportacion --mongo         # cursor real contra MongoDB
+    python -m benchmarks.exportacion --filas 200000 --formato ndjson
+"""
+import argparse
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from Balanceate.services import exportacion_service
+
+USUARIO_SINTETICO = "benchmark-exportacion"
+TIPOS = ("ingreso", "gasto", "deuda")
+
+
+def documentos_sinteticos(filas: int, usuario_id: str = USUARIO_SINTETICO):
+    """Genera documentos de movimientos uno a uno, sin materializarlos."""
+    inicio = datetime(2020, 1, 1)
+    for i in range(filas):
+        tipo = TIPOS[i % 3]
+        yield {
+            "tipo": tipo,
+            "nombre": f"Movimiento {i}",
+            "fecha": inicio + timedelta(minutes=i),
+            "valor": round((i % 1000) * 1.37, 2),
+            "usuario_id": usuario_id,
+            "monto_total": 1200.0 if tipo == "deuda" else 0,
+            "mensualidad": 100.0 if tipo == "deuda" else 0,
+            "plazo": 12 if tipo == "deuda" else 0,
+        }
+
+
+def _reportar(etiqueta: str, filas: int, bytes_generados: int, segundos: float, pico: int) -> None:
+    print(f"📊 {etiqueta}")
+    print(f"   filas:       {filas:,}")
+    print(f"   tamaño:      {bytes_generados / 1e6:,.1f} MB")
+    print(f"   tiempo:      {segundos:,.2f} s")
+    print(f"   filas/s:     {filas / segundos:,.0f}")
+    print(f"   pico memoria (tracemalloc): {pico / 1e6:,.2f} MB")
+
+
+def medir_formateo(filas: int, formato: str) -> None:
+    """Mide solo el formateo, con documentos generados en memoria."""
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    total = 0
+    for fragmento in exportacion_service.generar_fragmentos(documentos_sinteticos(filas), formato):
+        total += len(fragmento.encode("utf-8"))
+    segundos = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    _reportar(f"Formateo {formato} (sin MongoDB)", filas, total, segundos, pico)
+
+
+def sembrar_usuario(filas: int, lote: int = 10_000) -> None:
+    """Inserta el usuario sintético en MongoDB (sin tocar balances ni resúmenes)."""
+    from Balanceate.db.db import movimientos_collection
+    
+    movimientos_collection.delete_many({"usuario_id": USUARIO_SINTETICO})
+    docs = []
+    for doc in documentos_sinteticos(filas):
+        docs.append(doc)
+        if len(docs) >= lote:
+            movimientos_collection.insert_many(docs, ordered=False)
+            docs = []
+    if docs:
+        movimientos_collection.insert_many(docs, ordered=False)
+
+
+def medir_mongo(filas: int, formato: str, conservar: bool) -> None:
+    """Mide la exportación completa leyendo del cursor de MongoDB."""
+    from Balanceate.db.db import movimientos_collection
+    from Balanceate.db.movimiento_repository import MovimientoRepository
+    
+    print(f"🌱 Sembrando {filas:,} movimientos para {USUARIO_SINTETICO}...")
+    sembrar_usuario(filas)
+    
+    try:
+        tracemalloc.start()
+        inicio = time.perf_counter()
+        total = 0
+        cursor = MovimientoRepository.iterar_movimientos_exportacion(USUARIO_SINTETICO)
+        for fragmento in exportacion_service.generar_fragmentos(cursor, formato):
+            total += len(fragmento.encode("utf-8"))
+        segundos = time.perf_counter() - inicio
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        _reportar(f"Exportación {formato} desde MongoDB", filas, total, segundos, pico)
+    finally:
+        if not conservar:
+            movimientos_collection.delete_many({"usuario_id": USUARIO_SINTETICO})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filas", type=int, default=1_000_000)
+    parser.add_argument("--formato", choices=sorted(exportacion_service.FORMATOS), default="csv")
+    parser.add_argument("--mongo", action="store_true", help="Leer desde MongoDB en lugar de memoria")
+    parser.add_argument("--conservar", action="store_true", help="No borrar el usuario sintético al terminar")
+    args = parser.parse_args()
+    
+    if args.mongo:
+        medir_mongo(args.filas, args.formato, args.conservar)
+    else:
+        medir_formateo(args.filas, args.formato)
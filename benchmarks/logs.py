@@ -0,0 +1,124 @@
+"""
+Mide el costo del logging en el camino de una request.
+
+Una "request" es la parte del on_load de una sesión viva que no toca la
+base: verificar_token con la caché de tokens caliente más los mensajes
+DEBUG que emiten on_load y login. Se compara:
+    - sin_logs: las mismas operaciones sin ninguna llamada de log (base)
+    - nivel_info: logging configurado como en producción (DEBUG filtrado)
+    - debug_cola: DEBUG habilitado, JSON escrito desde el hilo del listener
+    - debug_sincrono: DEBUG habilitado, JSON escrito en el hilo de la request
+    - print: los print con f-string que había antes, a /dev/null
+
+La salida va a /dev/null para medir el costo del logging y no el de la
+terminal. Con --escritura-lenta-us cada escritura espera ese tiempo, como
+un stderr redirigido a un pipe o a un disco ocupado. En debug_cola se mide
+el tiempo del hilo que registra; la escritura ocurre en el listener.
+
+Uso:
+    python -m benchmarks.logs
+    python -m benchmarks.logs --requests 200000 --repeticiones 7
+    python -m benchmarks.logs --requests 2000 --escritura-lenta-us 200
+"""
+import argparse
+import logging
+import os
+import statistics
+import sys
+import time
+
+from Balanceate.logs import configurar_logging, detener_logging
+from Balanceate.services import auth_service
+
+USUARIO_SINTETICO = "65f0c0ffee0000000000beef"
+
+logger = logging.getLogger("Balanceate.state")
+
+
+class SalidaLenta:
+    """Stream que descarta lo escrito tras esperar una latencia fija."""
+
+    def __init__(self, destino, latencia_us: int):
+        self.destino = destino
+        self.latencia = latencia_us / 1_000_000
+
+    def write(self, texto: str) -> int:
+        time.sleep(self.latencia)
+        return self.destino.write(texto)
+
+    def flush(self) -> None:
+        self.destino.flush()
+
+
+def request_sin_logs(token: str) -> None:
+    auth_service.verificar_token(token)
+
+
+def request_con_logs(token: str) -> None:
+    usuario_id = auth_service.verificar_token(token)
+    logger.debug("on_load: sesión restaurada para %s", usuario_id)
+    logger.debug("login: sesión iniciada para %s", usuario_id)
+    logger.debug("Movimientos cargados: %s", 50)
+
+
+def request_con_print(token: str, salida) -> None:
+    usuario_id = auth_service.verificar_token(token)
+    print(f"✅ Sesión restaurada desde localStorage: {usuario_id}", file=salida)
+    print(f"✅ Login exitoso: {usuario_id}", file=salida)
+    print(f"🔄 Movimientos cargados: {50}", file=salida)
+
+
+def medir(funcion, requests: int, repeticiones: int) -> float:
+    """Devuelve la mediana de ns por request entre las repeticiones."""
+    funcion()
+    muestras = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter_ns()
+        for _ in range(requests):
+            funcion()
+        muestras.append((time.perf_counter_ns() - inicio) / requests)
+    return statistics.median(muestras)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Costo del logging por request")
+    parser.add_argument("--requests", type=int, default=100_000, help="Requests por repetición")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument(
+        "--escritura-lenta-us", type=int, default=0,
+        help="Latencia de cada escritura de log en microsegundos (default 0)"
+    )
+    args = parser.parse_args()
+
+    token = auth_service.generar_token(USUARIO_SINTETICO)
+    devnull = open(os.devnull, "w", encoding="utf-8")
+    salida = SalidaLenta(devnull, args.escritura_lenta_us) if args.escritura_lenta_us else devnull
+
+    casos = [
+        ("sin_logs", None, lambda: request_sin_logs(token)),
+        ("nivel_info", {"nivel": "INFO"}, lambda: request_con_logs(token)),
+        ("debug_cola", {"nivel": "DEBUG", "asincrono": True}, lambda: request_con_logs(token)),
+        ("debug_sincrono", {"nivel": "DEBUG", "asincrono": False}, lambda: request_con_logs(token)),
+        ("print", None, lambda: request_con_print(token, salida)),
+    ]
+
+    resultados = {}
+    for nombre, configuracion, funcion in casos:
+        configurar_logging(formato="json", destino=salida, **(configuracion or {"nivel": "INFO"}))
+        resultados[nombre] = medir(funcion, args.requests, args.repeticiones)
+        detener_logging()
+
+    base = resultados["sin_logs"]
+    print(
+        f"Python {sys.version.split()[0]} · {args.requests} requests x {args.repeticiones}"
+        f" · escritura {args.escritura_lenta_us} us"
+    )
+    print(f"{'caso':<16} {'ns/request':>12} {'sobrecosto':>12}")
+    for nombre, ns in resultados.items():
+        print(f"{nombre:<16} {ns:>12.0f} {ns - base:>+12.0f}")
+
+    devnull.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,430 @@
+"""
+Suite de benchmarks de los caminos calientes de servicios y repositories.
+
+Genera usuarios sintéticos de 100 / 10k / 1M movimientos y mide:
+    - Servicios (en memoria): convertir_documentos_a_movimientos,
+      agrupar_movimientos_por_fecha, agrupar_documentos_por_fecha y
+      calcular_balance_completo
+    - Repositories (MovimientoRepository, BalanceRepository y
+      UsuarioRepository) contra un MongoDB de pruebas: mongomock en el
+      proceso (por defecto) o un mongod local
+
+Cada caso reporta ops/s, latencia p50/p99 y pico de memoria (tracemalloc).
+Los resultados pueden guardarse como baseline; una ejecución con --comparar
+termina con código 1 si algún caso empeora más que el umbral.
+
+Los repositories nunca tocan la base real: todas las colecciones apuntan a
+la base balanceate_benchmark del backend elegido, que se borra al terminar.
+La caché de Redis se desactiva para medir siempre el camino a MongoDB.
+Solo se miden los repositories sync; los async ejecutan las mismas queries.
+
+Uso:
+    python -m benchmarks.suite                              # mongomock, 100/10k/1M
+    python -m benchmarks.suite --tamanos 100 10000 --guardar-baseline
+    python -m benchmarks.suite --comparar --umbral 0.25
+    python -m benchmarks.suite --backend mongod --mongo-uri mongodb://localhost:27017
+    python -m benchmarks.suite --solo servicio
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, NamedTuple
+
+from bson import ObjectId
+
+from Balanceate.services import balance_service, movimiento_service
+
+TIPOS = ("ingreso", "gasto", "deuda")
+TAMANOS = (100, 10_000, 1_000_000)
+
+# Con mongomock cada query recorre la colección en Python: los tamaños
+# mayores solo tienen sentido contra un mongod real
+MAX_REPOSITORIO_MONGOMOCK = 10_000
+
+BASE_BENCHMARK = "balanceate_benchmark"
+BASELINE_POR_DEFECTO = Path(__file__).with_name("baseline.json")
+
+# Por debajo de esta latencia las diferencias son ruido del reloj
+P50_MINIMO_COMPARABLE_MS = 0.05
+
+
+class Resultado(NamedTuple):
+    """Métricas de un caso de benchmark."""
+    caso: str
+    repeticiones: int
+    ops_s: float
+    p50_ms: float
+    p99_ms: float
+    pico_mb: float
+
+
+def documentos_usuario(cantidad: int, usuario_id: str) -> list[dict]:
+    """
+    Genera el historial sintético de un usuario, del más antiguo al más reciente.
+
+    Nota:
+        Varios movimientos por día (uno cada 3 horas) terminando hoy, para
+        que el agrupado tenga grupos "Hoy", "Ayer" y fechas.
+    """
+    fin = datetime.now().replace(microsecond=0)
+    docs = []
+    for i in range(cantidad):
+        tipo = TIPOS[i % 3]
+        docs.append({
+            "tipo": tipo,
+            "nombre": f"Movimiento {i}",
+            "fecha": fin - timedelta(hours=3 * (cantidad - 1 - i)),
+            "valor": round((i % 1000) * 1.37, 2),
+            "usuario_id": usuario_id,
+            "monto_total": 1200.0 if tipo == "deuda" else 0,
+            "mensualidad": 100.0 if tipo == "deuda" else 0,
+            "plazo": 12 if tipo == "deuda" else 0,
+        })
+    return docs
+
+
+def _percentil(ordenadas: list[float], p: float) -> float:
+    """Percentil por rango más cercano de una lista ya ordenada."""
+    indice = min(len(ordenadas) - 1, max(0, round(p * len(ordenadas)) - 1))
+    return ordenadas[indice]
+
+
+def medir(
+    caso: str,
+    funcion: Callable[[], object],
+    segundos: float,
+    min_repeticiones: int,
+    max_repeticiones: int
+) -> Resultado:
+    """
+    Mide una función sin argumentos.
+
+    Args:
+        caso: Nombre del caso ("grupo/operacion/tamaño")
+        funcion: Operación a medir
+        segundos: Presupuesto de tiempo para las repeticiones
+        min_repeticiones: Repeticiones mínimas aunque se agote el presupuesto
+        max_repeticiones: Repeticiones máximas
+
+    Returns:
+        Resultado con ops/s y latencias de las repeticiones cronometradas
+
+    Nota:
+        Una llamada de calentamiento y otra con tracemalloc (para el pico de
+        memoria) se hacen aparte: tracemalloc ralentiza la ejecución y no
+        debe contaminar las latencias.
+    """
+    funcion()
+
+    tracemalloc.start()
+    funcion()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencias = []
+    inicio = time.perf_counter()
+    while len(latencias) < max_repeticiones:
+        t0 = time.perf_counter()
+        funcion()
+        latencias.append(time.perf_counter() - t0)
+        if len(latencias) >= min_repeticiones and time.perf_counter() - inicio >= segundos:
+            break
+    total = time.perf_counter() - inicio
+
+    latencias.sort()
+    return Resultado(
+        caso=caso,
+        repeticiones=len(latencias),
+        ops_s=len(latencias) / total,
+        p50_ms=_percentil(latencias, 0.50) * 1000,
+        p99_ms=_percentil(latencias, 0.99) * 1000,
+        pico_mb=pico / 1e6,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Casos de servicios (en memoria)
+# ---------------------------------------------------------------------------
+
+def casos_servicio(tamano: int) -> list[tuple[str, Callable[[], object]]]:
+    """Casos de los servicios sobre un usuario sintético de tamano movimientos."""
+    usuario_id = str(ObjectId())
+    docs = documentos_usuario(tamano, usuario_id)
+    feed = list(reversed(docs))
+    movimientos = movimiento_service.convertir_documentos_a_movimientos(feed)
+
+    return [
+        (f"servicio/convertir_documentos/{tamano}",
+         lambda: movimiento_service.convertir_documentos_a_movimientos(feed)),
+        (f"servicio/agrupar_por_fecha/{tamano}",
+         lambda: movimiento_service.agrupar_movimientos_por_fecha(movimientos)),
+        (f"servicio/agrupar_documentos/{tamano}",
+         lambda: movimiento_service.agrupar_documentos_por_fecha(feed)),
+        (f"servicio/balance_completo/{tamano}",
+         lambda: balance_service.calcular_balance_completo(iter(docs), usuario_id)),
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Casos de repositories (MongoDB de pruebas)
+# ---------------------------------------------------------------------------
+
+class _ClienteAislado:
+    """Cliente que redirige la base balanceate a la base de benchmarks."""
+
+    def __init__(self, cliente):
+        self._cliente = cliente
+
+    def __getitem__(self, nombre: str):
+        return self._cliente[BASE_BENCHMARK if nombre == "balanceate" else nombre]
+
+    def __getattr__(self, atributo):
+        return getattr(self._cliente, atributo)
+
+
+def preparar_backend(backend: str, mongo_uri: str):
+    """
+    Apunta las colecciones de los repositories al backend de pruebas.
+
+    Returns:
+        Cliente subyacente (para borrar la base al terminar)
+
+    Nota:
+        Debe llamarse antes de que cualquier repository use su colección:
+        ColeccionPerezosa crea la colección en el primer uso.
+    """
+    from Balanceate.db import cache, db, indices
+
+    if backend == "mongomock":
+        try:
+            import mongomock
+        except ImportError:
+            sys.exit("❌ mongomock no está instalado (pip install mongomock) o usa --backend mongod")
+        cliente = mongomock.MongoClient()
+    else:
+        from pymongo import MongoClient
+        cliente = MongoClient(mongo_uri, serverSelectionTimeoutMS=5000)
+
+    cliente.drop_database(BASE_BENCHMARK)
+    db._client = _ClienteAislado(cliente)
+    cache.CACHE_REDIS_URL = ""
+    indices.asegurar_indices()
+    return cliente
+
+
+def sembrar_usuario(tamano: int, lote: int = 10_000) -> str:
+    """
+    Inserta un usuario con su historial y su ledger de balance.
+
+    Returns:
+        ID del usuario sintético
+    """
+    from Balanceate.db.db import balances_collection, movimientos_collection, usuarios_collection
+
+    usuario_id = ObjectId()
+    usuarios_collection.insert_one({
+        "_id": usuario_id,
+        "email": f"benchmark-{usuario_id}@balanceate.local",
+        "password": "",
+        "nombre": f"Benchmark {tamano}",
+        "fecha_registro": datetime.now().isoformat(),
+    })
+    usuario_id = str(usuario_id)
+
+    docs = documentos_usuario(tamano, usuario_id)
+    for inicio in range(0, len(docs), lote):
+        movimientos_collection.insert_many(docs[inicio:inicio + lote], ordered=False)
+
+    balance = balance_service.calcular_balance_completo(iter(docs), usuario_id)
+    balances_collection.insert_one(balance.model_dump())
+    return usuario_id
+
+
+def casos_repositorio(tamano: int) -> list[tuple[str, Callable[[], object]]]:
+    """Casos de los tres repositories sobre un usuario sembrado de tamano movimientos."""
+    from Balanceate.db.balance_repository import BalanceRepository
+    from Balanceate.db.movimiento_repository import MovimientoRepository
+    from Balanceate.db.usuario_repository import UsuarioRepository
+
+    usuario_id = sembrar_usuario(tamano)
+
+    def crear_movimiento():
+        MovimientoRepository.crear_movimiento({
+            "tipo": "gasto",
+            "nombre": "Benchmark",
+            "fecha": datetime.now(),
+            "valor": 1.0,
+            "usuario_id": usuario_id,
+        })
+
+    casos = [
+        (f"repositorio/movimientos.primera_pagina/{tamano}",
+         lambda: MovimientoRepository.buscar_pagina_movimientos_por_usuario(usuario_id, limit=50)),
+        (f"repositorio/movimientos.crear/{tamano}", crear_movimiento),
+        (f"repositorio/movimientos.reconciliar_balance/{tamano}",
+         lambda: balance_service.calcular_balance_completo(
+             MovimientoRepository.iterar_movimientos_por_usuario(usuario_id), usuario_id
+         )),
+        (f"repositorio/balance.obtener/{tamano}",
+         lambda: BalanceRepository.obtener_balance_por_usuario(usuario_id)),
+        (f"repositorio/balance.aplicar_delta/{tamano}",
+         lambda: BalanceRepository.aplicar_delta(usuario_id, 1.0, 0.0, 0)),
+    ]
+
+    # buscar_sesion_por_id devuelve None si la agregación falla: mongomock
+    # no implementa $lookup con pipeline, así que el caso solo se mide si funciona
+    if UsuarioRepository.buscar_sesion_por_id(usuario_id, 50) is not None:
+        casos.append((f"repositorio/usuario.sesion/{tamano}",
+                      lambda: UsuarioRepository.buscar_sesion_por_id(usuario_id, 50)))
+    else:
+        print(f"   (usuario.sesion/{tamano} omitido: el backend no soporta la agregación de sesión)")
+    return casos
+
+
+# ---------------------------------------------------------------------------
+# Baselines
+# ---------------------------------------------------------------------------
+
+def _entorno(backend: str) -> dict:
+    return {
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "backend": backend,
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+    }
+
+
+def guardar_baseline(ruta: Path, resultados: list[Resultado], backend: str) -> None:
+    """Guarda (o actualiza) los resultados como baseline."""
+    baseline = json.loads(ruta.read_text()) if ruta.exists() else {"casos": {}}
+    baseline["entorno"] = _entorno(backend)
+    for resultado in resultados:
+        baseline["casos"][resultado.caso] = resultado._asdict()
+    ruta.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+    print(f"💾 Baseline guardada en {ruta} ({len(resultados)} casos)")
+
+
+def comparar_con_baseline(ruta: Path, resultados: list[Resultado], umbral: float, backend: str) -> list[str]:
+    """
+    Compara los resultados con la baseline.
+
+    Returns:
+        Descripciones de las regresiones (p50 o pico de memoria más de
+        umbral por encima de la baseline)
+    """
+    if not ruta.exists():
+        sys.exit(f"❌ No existe la baseline {ruta}; créala con --guardar-baseline")
+
+    baseline = json.loads(ruta.read_text())
+    if baseline.get("entorno", {}).get("backend") != backend:
+        print(f"⚠️ La baseline se midió con otro backend ({baseline.get('entorno', {}).get('backend')})")
+
+    regresiones = []
+    for resultado in resultados:
+        anterior = baseline["casos"].get(resultado.caso)
+        if anterior is None:
+            continue
+        if (
+            anterior["p50_ms"] >= P50_MINIMO_COMPARABLE_MS
+            and resultado.p50_ms > anterior["p50_ms"] * (1 + umbral)
+        ):
+            regresiones.append(
+                f"{resultado.caso}: p50 {anterior['p50_ms']:.3f} → {resultado.p50_ms:.3f} ms"
+            )
+        if anterior["pico_mb"] > 0 and resultado.pico_mb > anterior["pico_mb"] * (1 + umbral):
+            regresiones.append(
+                f"{resultado.caso}: memoria {anterior['pico_mb']:.2f} → {resultado.pico_mb:.2f} MB"
+            )
+    return regresiones
+
+
+# ---------------------------------------------------------------------------
+# Ejecución
+# ---------------------------------------------------------------------------
+
+def _imprimir_encabezado() -> None:
+    print(f"{'caso':<52} {'reps':>6} {'ops/s':>12} {'p50 ms':>10} {'p99 ms':>10} {'pico MB':>9}")
+
+
+def _imprimir(resultado: Resultado) -> None:
+    print(
+        f"{resultado.caso:<52} {resultado.repeticiones:>6} {resultado.ops_s:>12,.1f} "
+        f"{resultado.p50_ms:>10.3f} {resultado.p99_ms:>10.3f} {resultado.pico_mb:>9.2f}"
+    )
+
+
+def ejecutar(args: argparse.Namespace) -> list[Resultado]:
+    """Ejecuta los grupos de casos pedidos e imprime cada resultado."""
+    resultados = []
+    opciones = (args.segundos, args.min_repeticiones, args.max_repeticiones)
+
+    if args.solo in (None, "servicio"):
+        print("📊 Servicios (en memoria)")
+        _imprimir_encabezado()
+        for tamano in args.tamanos:
+            for caso, funcion in casos_servicio(tamano):
+                resultados.append(medir(caso, funcion, *opciones))
+                _imprimir(resultados[-1])
+
+    if args.solo in (None, "repositorio"):
+        maximo = args.max_repositorio
+        if maximo is None and args.backend == "mongomock":
+            maximo = MAX_REPOSITORIO_MONGOMOCK
+        tamanos = [tamano for tamano in args.tamanos if maximo is None or tamano <= maximo]
+
+        print(f"\n📊 Repositories ({args.backend})")
+        omitidos = sorted(set(args.tamanos) - set(tamanos))
+        if omitidos:
+            print(f"   (omitidos {omitidos}: usa --backend mongod o --max-repositorio)")
+        cliente = preparar_backend(args.backend, args.mongo_uri)
+        try:
+            _imprimir_encabezado()
+            for tamano in tamanos:
+                for caso, funcion in casos_repositorio(tamano):
+                    resultados.append(medir(caso, funcion, *opciones))
+                    _imprimir(resultados[-1])
+        finally:
+            if not args.conservar:
+                cliente.drop_database(BASE_BENCHMARK)
+
+    return resultados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tamanos", type=int, nargs="+", default=list(TAMANOS),
+                        help="Movimientos por usuario sintético")
+    parser.add_argument("--solo", choices=("servicio", "repositorio"), help="Ejecutar un solo grupo")
+    parser.add_argument("--backend", choices=("mongomock", "mongod"), default="mongomock")
+    parser.add_argument("--mongo-uri", default="mongodb://localhost:27017",
+                        help="mongod local para --backend mongod (se usa la base balanceate_benchmark)")
+    parser.add_argument("--max-repositorio", type=int,
+                        help=f"Tamaño máximo en repositories (default {MAX_REPOSITORIO_MONGOMOCK:,} con mongomock)")
+    parser.add_argument("--segundos", type=float, default=1.0, help="Presupuesto de tiempo por caso")
+    parser.add_argument("--min-repeticiones", type=int, default=3)
+    parser.add_argument("--max-repeticiones", type=int, default=1000)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_POR_DEFECTO)
+    parser.add_argument("--guardar-baseline", action="store_true", help="Guardar los resultados como baseline")
+    parser.add_argument("--comparar", action="store_true", help="Fallar si hay regresiones frente a la baseline")
+    parser.add_argument("--umbral", type=float, default=0.25, help="Regresión tolerada (0.25 = 25%%)")
+    parser.add_argument("--conservar", action="store_true", help="No borrar la base de benchmarks al terminar")
+    args = parser.parse_args()
+
+    resultados = ejecutar(args)
+
+    if args.guardar_baseline:
+        guardar_baseline(args.baseline, resultados, args.backend)
+
+    if args.comparar:
+        regresiones = comparar_con_baseline(args.baseline, resultados, args.umbral, args.backend)
+        if regresiones:
+            print(f"\n❌ {len(regresiones)} regresiones (umbral {args.umbral:.0%}):")
+            for regresion in regresiones:
+                print(f"   - {regresion}")
+            sys.exit(1)
+        print(f"\n✅ Sin regresiones frente a {args.baseline} (umbral {args.umbral:.0%})")
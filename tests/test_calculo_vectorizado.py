@@ -0,0 +1,132 @@
+"""
+Pruebas de propiedad: el cálculo vectorizado (calculo_vectorizado) debe dar
+lo mismo que las funciones escalares de referencia aplicadas documento a
+documento, para historiales aleatorios con datos válidos e inválidos.
+
+Los documentos siempre traen fecha: LoteMovimientos asigna la hora actual a
+los que no la tienen (para la UI), así que no son comparables.
+"""
+import math
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from Balanceate.services import calculo_vectorizado
+from Balanceate.services.balance_service import calcular_aporte_lote, calcular_aporte_movimiento
+from Balanceate.services.lote_movimientos import LoteMovimientos
+from Balanceate.services.resumen_service import (
+    calcular_aporte_resumen,
+    calcular_resumenes_lote,
+    clave_mes,
+)
+
+SEMILLAS = range(200)
+CAMPOS_RESUMEN = ("ingresos", "gastos", "deudas", "movimientos")
+AUSENTE = object()
+
+
+def _importe(rng: random.Random):
+    """Importe válido (float, int o string numérico) o inválido."""
+    opcion = rng.random()
+    if opcion < 0.6:
+        return round(rng.uniform(0, 5000), 2)
+    if opcion < 0.7:
+        return rng.randint(0, 1000)
+    if opcion < 0.8:
+        return f"{rng.uniform(0, 100):.2f}"
+    return rng.choice(["abc", None, "", [], AUSENTE])
+
+
+def _fecha(rng: random.Random):
+    """Fecha datetime, ISO string (con o sin zona) o inválida."""
+    base = datetime(2023, 1, 1) + timedelta(
+        days=rng.randint(0, 730), seconds=rng.randint(0, 86_399), milliseconds=rng.randint(0, 999)
+    )
+    opcion = rng.random()
+    if opcion < 0.5:
+        return base
+    if opcion < 0.7:
+        return base.isoformat()
+    zona = timezone(timedelta(hours=rng.randint(-12, 14)))
+    if opcion < 0.8:
+        return base.replace(tzinfo=zona)
+    if opcion < 0.9:
+        return base.replace(tzinfo=zona).isoformat()
+    return rng.choice(["no-es-fecha", "2024-13-45", 12345])
+
+
+def _documento(rng: random.Random) -> dict:
+    doc = {
+        "tipo": rng.choice(["ingreso", "gasto", "deuda", "otro", ""]),
+        "fecha": _fecha(rng),
+        "valor": _importe(rng),
+        "monto_total": _importe(rng),
+    }
+    return {campo: valor for campo, valor in doc.items() if valor is not AUSENTE}
+
+
+def _historial(semilla: int) -> list[dict]:
+    rng = random.Random(semilla)
+    return [_documento(rng) for _ in range(rng.randint(0, 300))]
+
+
+def _resumenes_escalares(docs: list[dict]) -> dict[str, dict[str, float]]:
+    """Resúmenes por mes aplicando calcular_aporte_resumen documento a documento."""
+    resumenes: dict[str, dict[str, float]] = {}
+    for doc in docs:
+        mes = clave_mes(doc.get("fecha"))
+        aporte = calcular_aporte_resumen(doc)
+        if not mes or not aporte:
+            continue
+        totales = resumenes.setdefault(mes, dict.fromkeys(CAMPOS_RESUMEN, 0.0))
+        for campo, valor in aporte.items():
+            totales[campo] += valor
+    return resumenes
+
+
+@pytest.mark.parametrize("semilla", SEMILLAS)
+def test_aporte_al_ledger_coincide(semilla):
+    docs = _historial(semilla)
+    disponible = sum(calcular_aporte_movimiento(doc)[0] for doc in docs)
+    deudas = sum(calcular_aporte_movimiento(doc)[1] for doc in docs)
+
+    lote = LoteMovimientos.desde_documentos(docs)
+    resultado = calculo_vectorizado.calcular_lote(lote)
+
+    assert resultado.delta_disponible == pytest.approx(disponible, abs=1e-6)
+    assert resultado.delta_deudas == pytest.approx(deudas, abs=1e-6)
+    assert resultado.movimientos == len(docs)
+    assert calcular_aporte_lote(lote) == (resultado.delta_disponible, resultado.delta_deudas)
+
+
+@pytest.mark.parametrize("semilla", SEMILLAS)
+def test_resumenes_por_mes_coinciden(semilla):
+    docs = _historial(semilla)
+    esperados = _resumenes_escalares(docs)
+
+    obtenidos = calcular_resumenes_lote(LoteMovimientos.desde_documentos(docs))
+
+    assert set(obtenidos) == set(esperados)
+    for mes, totales in esperados.items():
+        for campo in CAMPOS_RESUMEN:
+            assert obtenidos[mes].get(campo, 0.0) == pytest.approx(totales[campo], abs=1e-6), (mes, campo)
+
+
+@pytest.mark.parametrize("semilla", range(20))
+def test_historial_por_lotes_coincide_con_un_lote(semilla, monkeypatch):
+    docs = _historial(semilla)
+    completo = calculo_vectorizado.calcular_lote(LoteMovimientos.desde_documentos(docs))
+
+    en_lotes = LoteMovimientos.en_lotes
+    monkeypatch.setattr(LoteMovimientos, "en_lotes", lambda docs: en_lotes(docs, tamano=7))
+    por_lotes = calculo_vectorizado.calcular_historial(iter(docs))
+
+    assert por_lotes.delta_disponible == pytest.approx(completo.delta_disponible, abs=1e-6)
+    assert por_lotes.delta_deudas == pytest.approx(completo.delta_deudas, abs=1e-6)
+    assert por_lotes.movimientos == completo.movimientos
+    assert set(por_lotes.por_mes) == set(completo.por_mes)
+    for mes, totales in completo.por_mes.items():
+        for campo, valor in totales.items():
+            assert math.isclose(por_lotes.por_mes[mes][campo], valor, abs_tol=1e-6)
+
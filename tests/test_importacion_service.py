@@ -0,0 +1,81 @@
+"""
+Pruebas de la validación de filas importadas (importacion_service).
+"""
+import io
+import os
+import time
+from datetime import datetime
+
+import pytest
+
+from Balanceate.services.importacion_service import (
+    ResultadoImportacion,
+    _construir_desde_fila,
+    construir_lotes,
+    filas_de_archivo,
+    guardar_en_temporal,
+    parsear_fecha,
+)
+
+USUARIO = "65f0c0ffee0000000000beef"
+
+
+@pytest.mark.parametrize("campo", ["valor", "monto_total", "mensualidad", "plazo"])
+@pytest.mark.parametrize("importe", ["nan", "NaN", "inf", "-inf", "Infinity", "1e400"])
+def test_importe_no_finito_se_rechaza(campo, importe):
+    fila = {"fecha": "2024-01-01", "nombre": "x", "valor": "10", campo: importe}
+
+    documento, error = _construir_desde_fila(fila, USUARIO)
+
+    assert documento is None
+    assert error == "importe no numérico"
+
+
+def test_lote_no_incluye_filas_no_finitas():
+    filas = [
+        {"fecha": "2024-01-01", "nombre": "ok", "valor": "10,50"},
+        {"fecha": "2024-01-02", "nombre": "nan", "valor": "nan"},
+        {"fecha": "2024-01-03", "nombre": "inf", "valor": "-inf"},
+    ]
+    resultado = ResultadoImportacion()
+
+    lotes = list(construir_lotes(filas, USUARIO, resultado))
+
+    assert [doc["nombre"] for lote in lotes for doc in lote] == ["ok"]
+    assert lotes[0][0]["valor"] == 10.5
+    assert resultado.rechazados == 2
+
+
+@pytest.fixture
+def hora_local_bogota(monkeypatch):
+    """Fija la zona local del proceso en UTC-5 (sin horario de verano)."""
+    monkeypatch.setenv("TZ", "America/Bogota")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+@pytest.mark.parametrize("texto", [
+    "2024-02-01T04:30:00+00:00",
+    "2024-01-31T23:30:00-05:00",
+    "20240201043000[0:GMT]",
+    "20240131233000.000[-5:EST]",
+])
+def test_fecha_con_zona_se_guarda_en_hora_local(hora_local_bogota, texto):
+    assert parsear_fecha(texto) == datetime(2024, 1, 31, 23, 30)
+
+
+def test_fecha_sin_zona_no_cambia(hora_local_bogota):
+    assert parsear_fecha("2024-01-31T23:30:00") == datetime(2024, 1, 31, 23, 30)
+    assert parsear_fecha("31/01/2024") == datetime(2024, 1, 31)
+
+
+def test_extracto_temporal_se_lee_y_se_borra():
+    contenido = "fecha;concepto;importe\n2024-01-01;Sueldo;1.234,56\n2024-01-02;Café;-3,50\n"
+    ruta = guardar_en_temporal(io.BytesIO(("\ufeff" + contenido).encode("utf-8")))
+
+    filas = list(filas_de_archivo(ruta, "extracto.csv"))
+
+    assert [fila["valor"] for fila in filas] == ["1.234,56", "-3,50"]
+    assert not os.path.exists(ruta)